@@ -1,15 +1,172 @@
 import math
 
-from ntcore import NetworkTable, NetworkTableInstance
-from real import signum
+import numpy as np
+from ntcore import (
+    DoubleEntry,
+    DoublePublisher,
+    EventFlags,
+    NetworkTable,
+    NetworkTableInstance,
+    NetworkTableListenerPoller,
+)
+from real import clampArray, signum, signumArray
 
 createdControllers: list["PIDController"] = []
 pidTable: NetworkTable = NetworkTableInstance.getDefault().getTable("pid")
 
+# gain changes from the dashboard under the pid table are queued here and applied in updatePIDsInNT
+# only remote changes, the robot's own publishes would fill the queue every loop
+_gainPoller = NetworkTableListenerPoller(NetworkTableInstance.getDefault())
+_gainPoller.addListener([pidTable.getPath() + "/"], EventFlags.kValueRemote)
+# full topic name -> (controller, attribute) for every gain that has been published
+_gainTopics: dict[str, tuple["PIDController", str]] = {}
+
+
+# state and gains for many controllers stored as one row each in parallel arrays, so they can all be ticked at once
+# controllers keep their own float attributes and tick on their own with plain float math
+# load() copies every controller into its row and store() copies the integrals and errors back,
+# so call load() after adding controllers or changing gains (updatePIDsInNT included)
+# and store() before ticking a controller by itself
+# rows without an arm or cam term keep kg/ks at 0 so those terms vanish
+class PIDBank:
+    FIELDS: tuple[str, ...] = (
+        "kp",
+        "ki",
+        "kd",
+        "kff",
+        "ktest",
+        "kg",
+        "balanceAngle",
+        "ks",
+        "integral",
+        "prevErr",
+        "integralZone",
+    )
+
+    def __init__(self, capacity: int = 16) -> None:
+        self.size: int = 0
+        self.capacity: int = max(capacity, 1)
+        self.controllers: list["PIDController"] = []
+        for f in self.FIELDS:
+            setattr(self, f, np.zeros(self.capacity))
+        self._scratchA = np.zeros(self.capacity)
+        self._scratchB = np.zeros(self.capacity)
+        self._out = np.zeros(self.capacity)
+        self._sliceRows()
+
+    # views of the first size rows, made once per size instead of on every tick
+    def _sliceRows(self) -> None:
+        n = self.size
+        self._rows: dict[str, np.ndarray] = {
+            f: getattr(self, f)[:n] for f in self.FIELDS
+        }
+        self._rowsA = self._scratchA[:n]
+        self._rowsB = self._scratchB[:n]
+        self._rowsOut = self._out[:n]
+
+    # gives the controller the next row, growing the arrays if needed
+    def add(self, controller: "PIDController") -> int:
+        if self.size == self.capacity:
+            self.capacity *= 2
+            for f in self.FIELDS:
+                grown = np.zeros(self.capacity)
+                grown[: self.size] = getattr(self, f)
+                setattr(self, f, grown)
+            self._scratchA = np.zeros(self.capacity)
+            self._scratchB = np.zeros(self.capacity)
+            self._out = np.zeros(self.capacity)
+        self.controllers.append(controller)
+        self.size += 1
+        self._sliceRows()
+        return self.size - 1
+
+    # copies every controller's gains and state into the arrays
+    def load(self) -> None:
+        for f in self.FIELDS:
+            self._rows[f][:] = [getattr(c, f) for c in self.controllers]
+
+    # copies the state tick changed back to the controllers
+    def store(self) -> None:
+        for c, integral, prevErr in zip(
+            self.controllers,
+            self._rows["integral"].tolist(),
+            self._rows["prevErr"].tolist(),
+        ):
+            c.integral = integral
+            c.prevErr = prevErr
+
+    # ticks every row at once, targets and positions hold one value per row
+    # dt is handled like the scalar controllers, and the returned array is reused by the next call
+    def tick(self, targets: np.ndarray, positions: np.ndarray, dt: float) -> np.ndarray:
+        rows = self._rows
+        err = np.subtract(targets, positions, out=self._rowsA)
+        tmp = self._rowsB
+        out = self._rowsOut
+        integral = rows["integral"]
+        zone = rows["integralZone"]
+
+        # out = kp * error + kd * derivative
+        np.multiply(rows["kp"], err, out=out)
+        if dt > 0:
+            np.subtract(err, rows["prevErr"], out=tmp)
+            tmp *= rows["kd"]
+            tmp /= dt
+            out += tmp
+
+            np.multiply(rows["ki"], err, out=tmp)
+            tmp *= dt
+            integral += tmp
+        # integral zones are never negative, so clamping to +-zone matches the scalar version
+        clampArray(integral, np.negative(zone, out=tmp), zone, out=integral)
+        out += integral
+
+        np.multiply(rows["kff"], targets, out=tmp)
+        out += tmp
+        out += rows["ktest"]
+
+        # arm gravity term, kg * cos(position + balanceAngle)
+        kg = rows["kg"]
+        if kg.any():
+            np.add(positions, rows["balanceAngle"], out=tmp)
+            np.cos(tmp, out=tmp)
+            tmp *= kg
+            out += tmp
+
+        # cam static term, ks * signum(error)
+        ks = rows["ks"]
+        if ks.any():
+            signumArray(err, out=tmp)
+            tmp *= ks
+            out += tmp
+
+        rows["prevErr"][:] = err
+        return out
+
 
 class PIDController:
+    # NT key, attribute name for every tunable value of the controller
+    NT_GAINS: tuple[tuple[str, str], ...] = (
+        ("Kp", "kp"),
+        ("Ki", "ki"),
+        ("Kd", "kd"),
+        ("Kff", "kff"),
+        ("Ktest", "ktest"),
+        ("integralZone", "integralZone"),
+    )
+
+    # the arm and cam terms, only their subclasses use them
+    kg: float = 0
+    balanceAngle: float = 0
+    ks: float = 0
+
     def __init__(
-        self, name: str, kp: float = 0, ki: float = 0, kd: float = 0, kff: float = 0
+        self,
+        name: str,
+        kp: float = 0,
+        ki: float = 0,
+        kd: float = 0,
+        kff: float = 0,
+        bank: PIDBank | None = None,
     ) -> None:
         self.name = name
         self.kp: float = kp
@@ -20,7 +177,11 @@ class PIDController:
         self.integral: float = 0
         self.prevErr: float = 0
         self.integralZone: float = 0
+        self._integralPublisher: DoublePublisher | None = None
+        self._gainEntries: list[DoubleEntry] = []
         createdControllers.append(self)
+        self.bank = bank
+        self.row: int = -1 if bank is None else bank.add(self)
 
     # function returns the recommended force towards the target
     def tick(self, target: float, position: float, dt: float) -> float:
@@ -32,9 +193,13 @@ class PIDController:
         return self._tick(error, target, target - error, dt)
 
     # this is the funcion that inheriting classes should override, touching the other ones can cause problems
+    # pass TimeData.controlDt as dt, a dt of 0 (the first tick) leaves out the derivative and integral instead of dividing by it
     def _tick(self, error: float, target: float, position: float, dt: float) -> float:
-        derivative = (error - self.prevErr) / dt
-        self.integral += self.ki * error * dt
+        if dt > 0:
+            derivative = (error - self.prevErr) / dt
+            self.integral += self.ki * error * dt
+        else:
+            derivative = 0
         if abs(self.integral) > self.integralZone:
             self.integral = self.integralZone * signum(self.integral)
         out = (
@@ -51,26 +216,29 @@ class PIDController:
         self.integral = 0
         self.prevErr = 0
 
-    def _publish(self) -> None:
+    # creates the NT topics for this controller, gains already in NT (from a dashboard or a previous run) win
+    def _registerNT(self) -> None:
         t = pidTable.getSubTable(self.name)
-        t.putNumber("integral", self.integral)
-        if t.getNumber("Kp", None) is None:
-            t.putNumber("Kp", self.kp)
-            t.putNumber("Ki", self.ki)
-            t.putNumber("Kd", self.kd)
-            t.putNumber("Kff", self.kff)
-            t.putNumber("Ktest", self.ktest)
-            t.putNumber("integralZone", self.integralZone)
-        else:
-            self.kp = t.getNumber("Kp", 0)
-            self.ki = t.getNumber("Ki", 0)
-            self.kd = t.getNumber("Kd", 0)
-            self.kff = t.getNumber("Kff", 0)
-            self.ktest = t.getNumber("Ktest", 0)
-            self.integralZone = t.getNumber("integralZone", 0)
+        self._integralPublisher = t.getDoubleTopic("integral").publish()
+        for key, attr in self.NT_GAINS:
+            entry = t.getDoubleTopic(key).getEntry(getattr(self, attr))
+            if entry.exists():
+                setattr(self, attr, entry.get())
+            else:
+                entry.set(getattr(self, attr))
+            _gainTopics[entry.getTopic().getName()] = (self, attr)
+            # kept so the topics stay published, reads go through the poller instead
+            self._gainEntries.append(entry)
+
+    def _publish(self) -> None:
+        if self._integralPublisher is None:
+            self._registerNT()
+        self._integralPublisher.set(self.integral)  # type: ignore
 
 
 class PIDControllerForArm(PIDController):
+    NT_GAINS = PIDController.NT_GAINS + (("Kg", "kg"),)
+
     def __init__(
         self,
         name: str,
@@ -80,8 +248,9 @@ class PIDControllerForArm(PIDController):
         kff: float = 0,
         kg: float = 0,
         balanceAngle: float = 0.1,
+        bank: PIDBank | None = None,
     ) -> None:
-        super().__init__(name=name, kp=kp, ki=ki, kd=kd, kff=kff)
+        super().__init__(name=name, kp=kp, ki=ki, kd=kd, kff=kff, bank=bank)
         self.balanceAngle = balanceAngle
         self.kg = kg
 
@@ -90,16 +259,10 @@ class PIDControllerForArm(PIDController):
         out += self.kg * math.cos(position + self.balanceAngle)
         return out
 
-    def _publish(self) -> None:
-        t = pidTable.getSubTable(self.name)
-        if t.getNumber("Kp", None) is None:
-            t.putNumber("Kg", self.kg)
-        else:
-            self.kg = t.getNumber("Kg", 0)
-        super()._publish()
-
 
 class PIDControllerForCam(PIDController):
+    NT_GAINS = PIDController.NT_GAINS + (("Ks", "ks"),)
+
     def __init__(
         self,
         name: str,
@@ -107,8 +270,9 @@ class PIDControllerForCam(PIDController):
         ki: float = 0,
         ks: float = 0,
         intigralZone: float = 0,
+        bank: PIDBank | None = None,
     ) -> None:
-        super().__init__(name=name, kp=kp, ki=ki, kd=0, kff=0)
+        super().__init__(name=name, kp=kp, ki=ki, kd=0, kff=0, bank=bank)
         self.ks = ks
         self.integralZone = intigralZone
 
@@ -117,15 +281,17 @@ class PIDControllerForCam(PIDController):
         out += self.ks * signum(error)
         return out
 
-    def _publish(self) -> None:
-        t = pidTable.getSubTable(self.name)
-        if t.getNumber("Kp", None) is None:
-            t.putNumber("Ks", self.ks)
-        else:
-            self.ks = t.getNumber("Ks", 0)
-        super()._publish()
-
 
+# applies gain edits made through NT since the last call and publishes integrals
+# when nobody is tuning this is one empty queue read plus one publish per controller
 def updatePIDsInNT():
+    for event in _gainPoller.readQueue():
+        value = event.data.value  # type: ignore
+        if not value.isDouble():
+            continue
+        target = _gainTopics.get(event.data.topic.getName())  # type: ignore
+        if target is not None:
+            setattr(target[0], target[1], value.getDouble())
+
     for c in createdControllers:
         c._publish()
@@ -0,0 +1,55 @@
+import pathlib
+import sys
+import time
+import tracemalloc
+from typing import Callable
+
+# benchmarks are run as scripts from src/, make the robot modules importable the same way robot.py sees them
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parent.parent))
+
+
+class BenchResult:
+    def __init__(
+        self, name: str, iterations: int, seconds: float, allocBytes: float
+    ) -> None:
+        self.name = name
+        self.iterations = iterations
+        self.seconds = seconds
+        # mean of the peak bytes allocated during a single call, 0 for a call that reuses its storage
+        self.allocBytes = allocBytes
+
+    @property
+    def usPerCall(self) -> float:
+        return self.seconds / self.iterations * 1e6
+
+    def __str__(self) -> str:
+        return f"{self.name:<44} {self.usPerCall:10.3f} us/call {self.allocBytes:10.1f} B allocated/call"
+
+
+# times fn over iterations calls, then measures allocations over a separate traced run
+# tracing is kept out of the timed run because it slows every allocation down
+def bench(name: str, fn: Callable[[], object], iterations: int = 10000) -> BenchResult:
+    for _ in range(min(iterations, 100)):
+        fn()
+
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    seconds = time.perf_counter() - start
+
+    tracedCalls = min(iterations, 1000)
+    total = 0
+    tracemalloc.start()
+    for _ in range(tracedCalls):
+        base = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        fn()
+        total += tracemalloc.get_traced_memory()[1] - base
+    tracemalloc.stop()
+
+    return BenchResult(name, iterations, seconds, total / tracedCalls)
+
+
+def printResults(results: list[BenchResult]) -> None:
+    for r in results:
+        print(r)
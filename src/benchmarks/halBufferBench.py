@@ -0,0 +1,33 @@
+import copy
+
+from benchUtil import bench, printResults
+from robotHAL import RobotHALBuffer, RobotHALBufferPair
+from simHAL import RobotSimHAL
+from timing import TimeData
+
+# compares the old per tick deepcopy of the HAL buffer against the preallocated buffer pair
+# run from src/ with: python benchmarks/halBufferBench.py
+
+
+def main() -> None:
+    buf = RobotHALBuffer()
+    pair = RobotHALBufferPair()
+    holder = [RobotHALBuffer()]
+
+    def deepcopyUpdate() -> None:
+        holder[0] = copy.deepcopy(buf)
+
+    sim = RobotSimHAL()
+    time = TimeData(None)
+
+    printResults(
+        [
+            bench("snapshot: copy.deepcopy (before)", deepcopyUpdate),
+            bench("snapshot: RobotHALBufferPair.swap (after)", lambda: pair.swap(buf)),
+            bench("RobotSimHAL.update", lambda: sim.update(buf, time)),
+        ]
+    )
+
+
+if __name__ == "__main__":
+    main()
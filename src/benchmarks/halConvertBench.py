@@ -0,0 +1,62 @@
+import math
+
+from benchUtil import bench, printResults
+from robotHAL import RobotHAL, RobotHALBuffer
+
+# compares the old per field sensor conversions against the device table's one multiply
+# run from src/ with: python benchmarks/halConvertBench.py
+
+
+# the conversions as RobotHAL.update used to write them, reading from the same flat layout
+def legacyConvert(v: list[float], buf: RobotHALBuffer) -> None:
+    for i in range(2):
+        buf.leftDrivePositions[i] = (
+            math.radians((v[i] / RobotHAL.DRIVE_GEARING) * 360) * RobotHAL.WHEEL_RADIUS
+        )
+        buf.rightDrivePositions[i] = (
+            math.radians((v[2 + i] / RobotHAL.DRIVE_GEARING) * 360)
+            * RobotHAL.WHEEL_RADIUS
+        )
+        buf.leftDriveSpeedMeasured[i] = (
+            math.radians((v[10 + i] / RobotHAL.DRIVE_GEARING) * 360)
+            * RobotHAL.WHEEL_RADIUS
+            / 60
+        )
+        buf.rightDriveSpeedMeasured[i] = (
+            math.radians((v[12 + i] / RobotHAL.DRIVE_GEARING) * 360)
+            * RobotHAL.WHEEL_RADIUS
+            / 60
+        )
+    buf.intakePivotAngle = v[4] * math.pi * 2 / RobotHAL.INTAKE_PIVOT_GEARING
+    buf.intakeFeedAngle = v[5] * math.pi * 2 / RobotHAL.INTAKE_FEED_GEARING
+    buf.shooterFeedAngle = v[6] * math.pi * 2 / RobotHAL.SHOOTER_FEED_GEARING
+    buf.shooterAimAngle = v[7] * math.pi * 2 / RobotHAL.SHOOTER_AIM_GEARING
+    buf.shooterTopMotorAngle = v[8] * math.pi * 2 / RobotHAL.SHOOTER_TOP_MOTOR_GEARING
+    buf.shooterBottomMotorAngle = (
+        v[9] * math.pi * 2 / RobotHAL.SHOOTER_BOTTOM_MOTOR_GEARING
+    )
+    buf.yaw = math.radians(-v[14])
+
+
+def main() -> None:
+    hal = RobotHAL()
+    hal.sensorValues[:] = [i * 1.5 for i in range(len(hal.sensorValues))]
+    raw = hal.sensorValues.tolist()
+    buf = RobotHALBuffer()
+
+    printResults(
+        [
+            bench(
+                "sensor conversion: per field formulas (before)",
+                lambda: legacyConvert(raw, buf),
+            ),
+            bench(
+                "sensor conversion: device table (after)",
+                lambda: hal._convertSensors(buf),
+            ),
+        ]
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+import argparse
+import json
+import sys
+import time
+import tracemalloc
+from typing import Callable
+
+import benchUtil  # noqa: F401, puts src/ on the path
+import gcControl
+import numpy as np
+from robotHAL import RobotHALBuffer, RobotHALBufferPair
+from timing import setDefaultTimeSource, SteppedClock, TimeData
+
+# runs Robot's periodic methods headless for thousands of ticks of stepped time and reports their latency
+# no robot hardware or driver station needed, the HAL is replaced with StubHAL after robotInit
+# run from src/ with: python benchmarks/loopBench.py --save baseline.json
+# and later: python benchmarks/loopBench.py --baseline baseline.json, exits 1 if any p99 regressed
+
+MODES: tuple[str, ...] = ("disabled", "autonomous", "teleop")
+# fraction a method's p99 may grow over the baseline before the run fails
+DEFAULT_THRESHOLD: float = 0.25
+# ticks per mode that run under tracemalloc after the timed ticks
+TRACED_TICKS: int = 200
+
+
+# stands in for RobotHAL/RobotSimHAL, the encoders just integrate the commanded drive output
+class StubHAL:
+    def __init__(self) -> None:
+        self.history = RobotHALBufferPair()
+
+    def update(self, buf: RobotHALBuffer, time: TimeData) -> None:
+        self.history.swap(buf)
+        for i in range(2):
+            buf.leftDrivePositions[i] += buf.leftDriveVolts[i] * time.dt
+            buf.rightDrivePositions[i] += buf.rightDriveVolts[i] * time.dt
+        buf.yaw += (buf.rightDriveVolts[0] - buf.leftDriveVolts[0]) * time.dt
+
+
+class MethodStats:
+    def __init__(self, name: str, seconds: list[float], allocBytes: float) -> None:
+        self.name = name
+        us = np.array(seconds) * 1e6
+        self.mean = float(us.mean())
+        self.p50 = float(np.percentile(us, 50))
+        self.p95 = float(np.percentile(us, 95))
+        self.p99 = float(np.percentile(us, 99))
+        self.max = float(us.max())
+        self.allocBytes = allocBytes
+
+    def toJSON(self) -> dict[str, float]:
+        return {
+            "mean": self.mean,
+            "p50": self.p50,
+            "p95": self.p95,
+            "p99": self.p99,
+            "max": self.max,
+            "allocBytes": self.allocBytes,
+        }
+
+    def __str__(self) -> str:
+        return (
+            f"{self.name:<32} mean {self.mean:8.1f} p50 {self.p50:8.1f} p95 {self.p95:8.1f} "
+            f"p99 {self.p99:8.1f} max {self.max:9.1f} us {self.allocBytes:9.1f} B/tick"
+        )
+
+
+def makeRobot(clock: SteppedClock):
+    from robot import Robot
+
+    # everything robotInit creates reads time from the stepped clock
+    setDefaultTimeSource(clock)
+    robot = Robot()
+    robot.robotInit()
+    robot.hardware = StubHAL()  # type: ignore
+    robot.recorder = None
+    return robot
+
+
+# one tick of a mode in the order TimedRobot runs it, mode periodic then robotPeriodic, then the scheduled tasks
+def _tickMethods(robot, mode: str) -> list[tuple[str, Callable[[], None]]]:
+    return [
+        (f"{mode}.{mode}Periodic", getattr(robot, mode + "Periodic")),
+        (f"{mode}.robotPeriodic", robot.robotPeriodic),
+        (f"{mode}.scheduler", robot.scheduler.runDue),
+    ]
+
+
+def runMode(robot, clock: SteppedClock, mode: str, ticks: int) -> list[MethodStats]:
+    getattr(robot, mode + "Init")()
+    methods = _tickMethods(robot, mode)
+    seconds: list[list[float]] = [[0.0] * ticks for _ in methods]
+    for k in range(ticks):
+        clock.advance()
+        for j, (_, fn) in enumerate(methods):
+            start = time.perf_counter()
+            fn()
+            seconds[j][k] = time.perf_counter() - start
+
+    # allocations are measured on separate ticks, tracing slows every allocation down
+    traced = min(ticks, TRACED_TICKS)
+    allocs = [0] * len(methods)
+    tracemalloc.start()
+    for _ in range(traced):
+        clock.advance()
+        for j, (_, fn) in enumerate(methods):
+            base = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+            fn()
+            allocs[j] += tracemalloc.get_traced_memory()[1] - base
+    tracemalloc.stop()
+
+    return [
+        MethodStats(name, s, a / max(traced, 1))
+        for (name, _), s, a in zip(methods, seconds, allocs)
+    ]
+
+
+def runAll(ticks: int) -> list[MethodStats]:
+    clock = SteppedClock()
+    try:
+        robot = makeRobot(clock)
+        results = []
+        for mode in MODES:
+            results += runMode(robot, clock, mode, ticks)
+    finally:
+        setDefaultTimeSource(None)
+        gcControl.reset()
+    return results
+
+
+def toJSON(results: list[MethodStats], ticks: int) -> dict:
+    return {"ticks": ticks, "methods": {r.name: r.toJSON() for r in results}}
+
+
+# methods whose p99 grew past threshold over the baseline, as (name, baseline p99, new p99)
+def regressions(
+    results: list[MethodStats], baseline: dict, threshold: float = DEFAULT_THRESHOLD
+) -> list[tuple[str, float, float]]:
+    out = []
+    for r in results:
+        base = baseline["methods"].get(r.name)
+        if base is not None and r.p99 > base["p99"] * (1 + threshold):
+            out.append((r.name, base["p99"], r.p99))
+    return out
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="benchmark the robot loop headless")
+    parser.add_argument("--ticks", type=int, default=5000, help="timed ticks per mode")
+    parser.add_argument("--save", metavar="PATH", help="write the results as JSON")
+    parser.add_argument("--baseline", metavar="PATH", help="JSON from an earlier run")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    args = parser.parse_args()
+
+    results = runAll(args.ticks)
+    for r in results:
+        print(r)
+
+    if args.save is not None:
+        with open(args.save, "w") as f:
+            json.dump(toJSON(results, args.ticks), f, indent=2)
+
+    if args.baseline is not None:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        failed = regressions(results, baseline, args.threshold)
+        for name, before, after in failed:
+            print(f"REGRESSION {name}: p99 {before:.1f} us -> {after:.1f} us")
+        if len(failed) > 0:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+import random
+import time
+
+from benchUtil import bench, printResults
+from navgrid import NavGrid
+
+# random pathfinding queries over the real navgrid, cold and with the LRU cache warm
+# run from src/ with: python benchmarks/navgridBench.py
+
+
+def main() -> None:
+    start = time.perf_counter()
+    grid = NavGrid("deploy/pathplanner/navgrid.json", cacheSize=4096)
+    print(f"load and precompute: {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    rng = random.Random(4536)
+    free = [i for i, b in enumerate(grid.blocked) if not b]
+    queries = []
+    for _ in range(500):
+        a = grid.centerOf(*divmod(rng.choice(free), grid.cols))
+        b = grid.centerOf(*divmod(rng.choice(free), grid.cols))
+        queries.append((a, b))
+
+    times = []
+    for a, b in queries:
+        t = time.perf_counter()
+        grid.findPath(a, b)
+        times.append(time.perf_counter() - t)
+    times.sort()
+    print(
+        f"cold queries: mean {sum(times) / len(times) * 1e6:.0f} us, "
+        f"p50 {times[len(times) // 2] * 1e6:.0f} us, p99 {times[int(len(times) * 0.99)] * 1e6:.0f} us, "
+        f"max {times[-1] * 1e6:.0f} us"
+    )
+
+    it = iter(range(10**9))
+    printResults(
+        [
+            bench(
+                "cached query",
+                lambda: grid.findPath(*queries[next(it) % len(queries)]),
+                5000,
+            )
+        ]
+    )
+
+
+if __name__ == "__main__":
+    main()
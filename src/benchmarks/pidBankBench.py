@@ -0,0 +1,121 @@
+import math
+import random
+
+import numpy as np
+from benchUtil import bench, printResults
+from PIDController import PIDBank, PIDController, PIDControllerForArm
+from real import signum
+
+# compares ticking N controllers one object at a time against one PIDBank.tick call
+# controllers in a bank tick the same as ones outside it, the bank only changes how the batch tick works
+# run from src/ with: python benchmarks/pidBankBench.py
+
+
+# the per object controllers as they were before PIDBank, kept here as the baseline
+class LegacyPID:
+    def __init__(self, kp: float, ki: float, kd: float) -> None:
+        self.kp = kp
+        self.ki = ki
+        self.kd = kd
+        self.kff = 0.0
+        self.ktest = 0.0
+        self.integral = 0.0
+        self.prevErr = 0.0
+        self.integralZone = 0.5
+
+    def tick(self, target: float, position: float, dt: float) -> float:
+        error = target - position
+        return self.tickErr(error, target, dt)
+
+    def tickErr(self, error: float, target: float, dt: float) -> float:
+        return self._tick(error, target, target - error, dt)
+
+    def _tick(self, error: float, target: float, position: float, dt: float) -> float:
+        derivative = (error - self.prevErr) / dt
+        self.integral += self.ki * error * dt
+        if abs(self.integral) > self.integralZone:
+            self.integral = self.integralZone * signum(self.integral)
+        out = (
+            (self.kp * error)
+            + (self.integral)
+            + (self.kd * derivative)
+            + (self.kff * target)
+            + self.ktest
+        )
+        self.prevErr = error
+        return out
+
+
+class LegacyPIDForArm(LegacyPID):
+    def __init__(self, kp: float, ki: float, kd: float, kg: float) -> None:
+        super().__init__(kp, ki, kd)
+        self.balanceAngle = 0.1
+        self.kg = kg
+
+    def _tick(self, error: float, target: float, position: float, dt: float) -> float:
+        out = super()._tick(error, target, position, dt)
+        out += self.kg * math.cos(position + self.balanceAngle)
+        return out
+
+
+def main() -> None:
+    rng = random.Random(4536)
+    results = []
+    for n in (8, 32, 128):
+        gains = [
+            (
+                rng.uniform(0, 3),
+                rng.uniform(0, 1),
+                rng.uniform(0, 0.1),
+                rng.uniform(0, 1) * (i % 2),
+            )
+            for i in range(n)
+        ]
+        targets = [rng.uniform(-1, 1) for _ in range(n)]
+        positions = [rng.uniform(-1, 1) for _ in range(n)]
+        targetArray = np.array(targets)
+        positionArray = np.array(positions)
+
+        legacy = [
+            LegacyPIDForArm(kp, ki, kd, kg) if kg else LegacyPID(kp, ki, kd)
+            for kp, ki, kd, kg in gains
+        ]
+        bank = PIDBank(n)
+        controllers = [
+            (
+                PIDControllerForArm(f"bench{n}_{i}", kp, ki, kd, 0, kg, bank=bank)
+                if kg
+                else PIDController(f"bench{n}_{i}", kp, ki, kd, bank=bank)
+            )
+            for i, (kp, ki, kd, kg) in enumerate(gains)
+        ]
+        for c in controllers:
+            c.integralZone = 0.5
+        bank.load()
+
+        def tickLegacy() -> None:
+            for c, t, p in zip(legacy, targets, positions):
+                c.tick(t, p, 0.02)
+
+        def tickControllers() -> None:
+            for c, t, p in zip(controllers, targets, positions):
+                c.tick(t, p, 0.02)
+
+        iterations = 20000 // n
+        results.append(bench(f"N={n} per object loop (before)", tickLegacy, iterations))
+        results.append(
+            bench(f"N={n} PIDController.tick loop", tickControllers, iterations)
+        )
+        results.append(
+            bench(
+                f"N={n} PIDBank.tick",
+                lambda: bank.tick(targetArray, positionArray, 0.02),
+                iterations,
+            )
+        )
+
+    printResults(results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+import math
+
+import numpy as np
+from benchUtil import bench, printResults
+from real import angleWrap, angleWrapArray, clampArray
+
+# compares the old looping angleWrap against remainder arithmetic, and a python loop against the array versions
+# run from src/ with: python benchmarks/realBench.py
+
+
+def loopWrap(a: float) -> float:
+    while a > math.pi:
+        a -= math.pi * 2
+    while a < -math.pi:
+        a += math.pi * 2
+    return a
+
+
+def main() -> None:
+    # a gyro that has spun a few dozen turns over a match
+    spun = 40 * math.pi * 2 + 1
+    angles = np.linspace(-100, 100, 1000)
+    out = np.zeros(len(angles))
+
+    printResults(
+        [
+            bench("angleWrap 0.5 rad: loop (before)", lambda: loopWrap(0.5)),
+            bench("angleWrap 0.5 rad: remainder (after)", lambda: angleWrap(0.5)),
+            bench("angleWrap 40 turns: loop (before)", lambda: loopWrap(spun)),
+            bench("angleWrap 40 turns: remainder (after)", lambda: angleWrap(spun)),
+            bench(
+                "1000 angles: python loop over angleWrap",
+                lambda: [angleWrap(a) for a in angles],
+            ),
+            bench(
+                "1000 angles: angleWrapArray", lambda: angleWrapArray(angles, out=out)
+            ),
+            bench("1000 values: np.clip", lambda: np.clip(angles, -1, 1, out=out)),
+            bench(
+                "1000 values: clampArray", lambda: clampArray(angles, -1, 1, out=out)
+            ),
+        ]
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+import math
+
+import numpy
+from benchUtil import bench, printResults
+from utils import CircularScalar, Scalar, expoCurve
+from wpimath.geometry import Rotation2d, Translation2d
+
+# compares the old Translation2d/Rotation2d stick shaping against the direct magnitude rescale
+# run from src/ with: python benchmarks/scalarBench.py
+
+
+def legacyCircular(scalar: Scalar, x: float, y: float) -> tuple[float, float]:
+    mag = math.sqrt(x**2 + y**2)
+    angle = math.atan2(y, x)
+    stickXY = Translation2d(scalar.scale(mag), 0).rotateBy(Rotation2d(angle))
+    return stickXY.x, stickXY.y
+
+
+def main() -> None:
+    circular = CircularScalar(0.06, 1)
+    shaped = CircularScalar(0.06, 1)
+    shaped.scalar.setCurve(expoCurve(0.5))
+    squared = Scalar(0.1, 2)
+    xs = numpy.linspace(-1, 1, 1000)
+    ys = xs[::-1].copy()
+
+    printResults(
+        [
+            bench(
+                "CircularScalar: Translation2d rotate (before)",
+                lambda: legacyCircular(circular.scalar, 0.3, -0.6),
+            ),
+            bench(
+                "CircularScalar: magnitude rescale (after)",
+                lambda: circular.Scale(0.3, -0.6),
+            ),
+            bench(
+                "CircularScalar: lookup table curve", lambda: shaped.Scale(0.3, -0.6)
+            ),
+            bench("Scalar: exponent 2", lambda: squared(0.5)),
+            bench(
+                "CircularScalar.scaleArrays: 1000 sticks",
+                lambda: circular.scaleArrays(xs, ys),
+            ),
+        ]
+    )
+
+
+if __name__ == "__main__":
+    main()
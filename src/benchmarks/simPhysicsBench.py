@@ -0,0 +1,34 @@
+import time
+
+from benchUtil import bench, printResults
+from simPhysics import RobotPhysics
+
+# simulated seconds per wall clock second for batches of headless robots
+# run from src/ with: python benchmarks/simPhysicsBench.py
+
+
+def main() -> None:
+    dt = 0.005
+    results = []
+    for count in (1, 100, 1000):
+        p = RobotPhysics(count)
+        p.driveDuty[:] = 0.5
+        p.mechVolts[:] = 6
+        r = bench(f"RobotPhysics.step N={count}", lambda: p.step(dt), 2000)
+        results.append(r)
+
+    printResults(results)
+    for r, count in zip(results, (1, 100, 1000)):
+        perSecond = dt / (r.seconds / r.iterations)
+        print(
+            f"N={count:<5} {perSecond:12.0f} sim s per wall s per robot, {perSecond * count:12.0f} in total"
+        )
+
+    p = RobotPhysics()
+    start = time.perf_counter()
+    p.run(600)
+    print(f"one 10 minute headless run took {time.perf_counter() - start:.3f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+# startup profile: time spent importing each of robot.py's imports, in robotInit and until the first robotPeriodic
+# everything is measured in a fresh interpreter, so nothing is already imported
+# run from src/ with: python benchmarks/startupBench.py
+
+SRC_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# vendor libraries that are slow to import and should only load with a device that needs them
+LAZY_MODULES: tuple[str, ...] = ("phoenix5", "phoenix6", "pathplannerlib")
+
+_CHILD = """
+import json, sys, time
+start = time.perf_counter()
+import robot
+imported = time.perf_counter()
+r = robot.Robot()
+r.robotInit()
+initDone = time.perf_counter()
+r.disabledInit()
+r.robotPeriodic()
+firstPeriodic = time.perf_counter()
+print(json.dumps({
+    "importSeconds": imported - start,
+    "robotInitSeconds": initDone - imported,
+    "firstPeriodicSeconds": firstPeriodic - start,
+    "lazyLoaded": sorted({m.split(".")[0] for m in sys.modules if m.startswith(LAZY)}),
+}))
+"""
+
+
+class StartupProfile:
+    def __init__(self, child: dict, imports: list[tuple[str, float]]) -> None:
+        self.importSeconds: float = child["importSeconds"]
+        self.robotInitSeconds: float = child["robotInitSeconds"]
+        # from the start of import robot until the first robotPeriodic returned
+        self.firstPeriodicSeconds: float = child["firstPeriodicSeconds"]
+        # LAZY_MODULES that were imported anyway
+        self.lazyLoaded: list[str] = child["lazyLoaded"]
+        # robot.py's direct imports and their cumulative import seconds, slowest first
+        self.imports = imports
+
+    def __str__(self) -> str:
+        lines = [
+            f"{name:<40} {seconds * 1000:8.1f} ms" for name, seconds in self.imports
+        ]
+        lines += [
+            f"{'import robot':<40} {self.importSeconds * 1000:8.1f} ms",
+            f"{'robotInit':<40} {self.robotInitSeconds * 1000:8.1f} ms",
+            f"{'time to first robotPeriodic':<40} {self.firstPeriodicSeconds * 1000:8.1f} ms",
+        ]
+        if len(self.lazyLoaded) > 0:
+            lines.append("loaded at startup: " + ", ".join(self.lazyLoaded))
+        return "\n".join(lines)
+
+
+# the modules -X importtime shows directly under robot, with their cumulative times
+def _directImports(importtime: str) -> list[tuple[str, float]]:
+    rows = []
+    for line in importtime.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        parts = line[len("import time:") :].split("|")
+        if not parts[0].strip().isdigit():
+            continue  # the header
+        name = parts[2].rstrip()
+        depth = (len(name) - len(name.lstrip())) // 2
+        rows.append((depth, name.strip(), int(parts[1]) / 1e6))
+
+    # a module's line comes after everything it imported, so robot's children are the depth 1 lines before it
+    out = []
+    for depth, name, seconds in rows:
+        if depth == 1:
+            out.append((name, seconds))
+        elif depth == 0:
+            if name == "robot":
+                break
+            out = []
+    return sorted(out, key=lambda row: row[1], reverse=True)
+
+
+def measureStartup() -> StartupProfile:
+    child = _CHILD.replace("LAZY", repr(LAZY_MODULES))
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", child],
+        cwd=SRC_DIR,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    report = next(
+        line for line in reversed(result.stdout.splitlines()) if line.startswith("{")
+    )
+    return StartupProfile(json.loads(report), _directImports(result.stderr))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="profile robot startup")
+    parser.add_argument("--json", action="store_true", help="print JSON instead")
+    args = parser.parse_args()
+
+    profile = measureStartup()
+    if args.json:
+        print(
+            json.dumps(
+                {
+                    "imports": dict(profile.imports),
+                    "importSeconds": profile.importSeconds,
+                    "robotInitSeconds": profile.robotInitSeconds,
+                    "firstPeriodicSeconds": profile.firstPeriodicSeconds,
+                    "lazyLoaded": profile.lazyLoaded,
+                },
+                indent=2,
+            )
+        )
+    else:
+        print(profile)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,39 @@
+import os
+import time
+
+import benchUtil
+import numpy as np
+import trajectories
+
+# compiling a path against looking samples up in the compiled file
+# run from src/ with: python benchmarks/trajectoryBench.py
+
+
+def main() -> None:
+    source = os.path.join(trajectories.PATHPLANNER_DIR, "sideFar-upper.path")
+    start = time.perf_counter()
+    samples = trajectories.compilePath(trajectories.readPath(source))
+    print(
+        f"compile: {(time.perf_counter() - start) * 1000:.1f} ms, {len(samples)} samples"
+    )
+
+    start = time.perf_counter()
+    traj = trajectories.Trajectory(trajectories.outputPath(source))
+    print(f"open: {(time.perf_counter() - start) * 1e6:.0f} us")
+
+    out = np.empty(len(trajectories.SAMPLE_FIELDS))
+    times = np.random.default_rng(4536).uniform(0, traj.duration, 1000).tolist()
+    it = iter(range(10**9))
+    benchUtil.printResults(
+        [
+            benchUtil.bench(
+                "sample into out", lambda: traj.sample(times[next(it) % 1000], out)
+            ),
+            benchUtil.bench("pose", lambda: traj.pose(times[next(it) % 1000])),
+        ]
+    )
+    traj.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,9 @@
 import pathlib
+import time
 
+import gcControl
+import pytest
+from ntcore import NetworkTableInstance
 from pyfrc.test_support.pytest_plugin import PyFrcPlugin
 
 from robot import Robot
@@ -7,3 +11,61 @@ from robot import Robot
 
 def pytest_runtest_setup(item):
     item.config.pluginmanager.register(PyFrcPlugin(Robot, pathlib.Path("robot.py")))
+
+
+# robotInit freezes the heap and the mode inits turn automatic collection off, put it back between tests
+@pytest.fixture(autouse=True)
+def resetGC():
+    yield
+    gcControl.reset()
+
+
+REMOTE_NT_PORT = 5820
+
+
+# a second NT instance connected to the default one, what it writes arrives as remote values like a dashboard's
+class RemoteNT:
+    def __init__(self, tmp_path: pathlib.Path) -> None:
+        self.server = NetworkTableInstance.getDefault()
+        self.inst = NetworkTableInstance.create()
+        # RobotBase starts a server on the default ports, that one would make startServer do nothing
+        self.server.stopServer()
+        self.server.startServer(
+            str(tmp_path / "networktables.json"),
+            "127.0.0.1",
+            port3=REMOTE_NT_PORT + 1,
+            port4=REMOTE_NT_PORT,
+        )
+        self.inst.startClient4("remoteNT")
+        self.inst.setServer("127.0.0.1", REMOTE_NT_PORT)
+        self._syncCount = 0
+        self._wait(self.inst.isConnected)
+
+    def getTable(self, name: str):
+        return self.inst.getTable(name)
+
+    # returns once the server has everything written so far, the connection keeps it in order
+    def sync(self) -> None:
+        self._syncCount += 1
+        self.inst.getTable("remoteNT").putNumber("sync", self._syncCount)
+        self.inst.flush()
+        table = self.server.getTable("remoteNT")
+        self._wait(lambda: table.getNumber("sync", 0) == self._syncCount)
+
+    def _wait(self, condition) -> None:
+        deadline = time.monotonic() + 5
+        while not condition():
+            assert time.monotonic() < deadline, "remote NT timed out"
+            time.sleep(0.005)
+
+    def close(self) -> None:
+        self.inst.stopClient()
+        NetworkTableInstance.destroy(self.inst)
+        self.server.stopServer()
+
+
+@pytest.fixture
+def remoteNT(tmp_path):
+    remote = RemoteNT(tmp_path)
+    yield remote
+    remote.close()
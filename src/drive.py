@@ -1,12 +1,181 @@
+import math
+
+from real import angleDiff, angleWrap
+
+# differential drive odometry with a pose history so late vision measurements can be applied when they were taken
+# poses are field meters and CCW radians
+
+HISTORY_SIZE = 100  # 2 seconds of loops
+
+
 class Drive:
-    def __init__(self):
-        pass
+    def __init__(self, historySize: int = HISTORY_SIZE):
+        # ring buffer of timestamped poses plus the odometry step that led to each one
+        # the steps are what gets replayed on top of a vision correction
+        self.size = historySize
+        self.times: list[float] = [0.0] * historySize
+        self.xs: list[float] = [0.0] * historySize
+        self.ys: list[float] = [0.0] * historySize
+        self.headings: list[float] = [0.0] * historySize
+        self.distSteps: list[float] = [0.0] * historySize
+        self.headingSteps: list[float] = [0.0] * historySize
+        self.start = 0
+        self.count = 0
 
-    def resetOdom(self):
-        pass
+        self.x: float = 0
+        self.y: float = 0
+        self.heading: float = 0
+
+        self.prevLeft: float = 0
+        self.prevRight: float = 0
+        self.prevYaw: float = 0
+        self.hasSensors = False
+
+        self.visionApplied: int = 0
+        self.visionRejected: int = 0
+
+    def resetOdom(self, x: float = 0, y: float = 0, heading: float = 0):
+        self.x = x
+        self.y = y
+        self.heading = heading
+        self.count = 0
 
     def update(self):
         pass
 
-    def updateOdom(self, hal):
-        pass
+    def updateOdom(self, hal, timestamp: float):
+        left = (hal.leftDrivePositions[0] + hal.leftDrivePositions[1]) / 2
+        right = (hal.rightDrivePositions[0] + hal.rightDrivePositions[1]) / 2
+        if not self.hasSensors:
+            # the encoders may not start at 0, the first reading only sets the reference
+            self.prevLeft = left
+            self.prevRight = right
+            self.prevYaw = hal.yaw
+            self.hasSensors = True
+
+        dist = ((left - self.prevLeft) + (right - self.prevRight)) / 2
+        # the gyro is better at heading than the difference between the wheels
+        headingStep = angleDiff(hal.yaw, self.prevYaw)
+        self.prevLeft = left
+        self.prevRight = right
+        self.prevYaw = hal.yaw
+
+        self.x, self.y, self.heading = _advance(
+            self.x, self.y, self.heading, dist, headingStep
+        )
+        self._push(timestamp, dist, headingStep)
+
+    def _push(self, timestamp: float, dist: float, headingStep: float) -> None:
+        if self.count < self.size:
+            i = (self.start + self.count) % self.size
+            self.count += 1
+        else:
+            i = self.start
+            self.start = (self.start + 1) % self.size
+        self.times[i] = timestamp
+        self.xs[i] = self.x
+        self.ys[i] = self.y
+        self.headings[i] = self.heading
+        self.distSteps[i] = dist
+        self.headingSteps[i] = headingStep
+
+    def _index(self, k: int) -> int:
+        return (self.start + k) % self.size
+
+    # pose at a past timestamp, interpolated between history entries, None if it's older than the history
+    def poseAt(self, timestamp: float) -> tuple[float, float, float] | None:
+        k = self._find(timestamp)
+        if k is None:
+            return None
+        if k == self.count - 1:
+            return self.x, self.y, self.heading
+        a = self._index(k)
+        b = self._index(k + 1)
+        f = (timestamp - self.times[a]) / (self.times[b] - self.times[a])
+        return (
+            self.xs[a] + (self.xs[b] - self.xs[a]) * f,
+            self.ys[a] + (self.ys[b] - self.ys[a]) * f,
+            angleWrap(
+                self.headings[a] + angleDiff(self.headings[b], self.headings[a]) * f
+            ),
+        )
+
+    # last logical entry at or before timestamp, binary search since the history is time ordered
+    def _find(self, timestamp: float) -> int | None:
+        if self.count == 0 or timestamp < self.times[self.start]:
+            return None
+        lo = 0
+        hi = self.count - 1
+        while lo < hi:
+            mid = (lo + hi + 1) // 2
+            if self.times[self._index(mid)] <= timestamp:
+                lo = mid
+            else:
+                hi = mid - 1
+        return lo
+
+    # pulls the pose at the measurement's timestamp towards the measurement by trust (0 to 1)
+    # then replays the odometry steps taken since, rewriting only the newer part of the history
+    # returns False if the measurement is older than the history
+    def addVisionMeasurement(
+        self,
+        x: float,
+        y: float,
+        heading: float,
+        timestamp: float,
+        trust: float = 0.2,
+        headingTrust: float = 0.05,
+    ) -> bool:
+        k = self._find(timestamp)
+        if k is None:
+            self.visionRejected += 1
+            return False
+        past = self.poseAt(timestamp)
+        assert past is not None
+        px, py, ph = past
+        cx = px + (x - px) * trust
+        cy = py + (y - py) * trust
+        ch = angleWrap(ph + angleDiff(heading, ph) * headingTrust)
+
+        # the part of the step after the measurement, then every newer step
+        if k < self.count - 1:
+            a = self._index(k)
+            b = self._index(k + 1)
+            rest = (self.times[b] - timestamp) / (self.times[b] - self.times[a])
+            cx, cy, ch = _advance(
+                cx, cy, ch, self.distSteps[b] * rest, self.headingSteps[b] * rest
+            )
+            self.xs[b] = cx
+            self.ys[b] = cy
+            self.headings[b] = ch
+            for j in range(k + 2, self.count):
+                i = self._index(j)
+                cx, cy, ch = _advance(
+                    cx, cy, ch, self.distSteps[i], self.headingSteps[i]
+                )
+                self.xs[i] = cx
+                self.ys[i] = cy
+                self.headings[i] = ch
+        else:
+            i = self._index(k)
+            self.xs[i] = cx
+            self.ys[i] = cy
+            self.headings[i] = ch
+
+        self.x = cx
+        self.y = cy
+        self.heading = ch
+        self.visionApplied += 1
+        return True
+
+
+# moves a pose along an arc of length dist that turns by headingStep
+def _advance(
+    x: float, y: float, heading: float, dist: float, headingStep: float
+) -> tuple[float, float, float]:
+    mid = heading + headingStep / 2
+    return (
+        x + dist * math.cos(mid),
+        y + dist * math.sin(mid),
+        angleWrap(heading + headingStep),
+    )
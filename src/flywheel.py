@@ -0,0 +1,125 @@
+import math
+
+import numpy as np
+from simPhysics import Mechanism
+from timing import LOOP_PERIOD
+
+# velocity and acceleration of a flywheel from its encoder position and commanded volts
+# the Spark's own velocity is averaged over a window and lags by tens of ms, this follows the position instead
+# a Kalman filter on the DC motor plant dw/dt = a * V - b * w + d, where d is an unknown load acceleration
+# the gains are the filter's steady state for LOOP_PERIOD, worked out once, so a tick is a few multiplies
+
+# one count of the Spark's hall sensor, quantization noise of a uniform error over a count
+POSITION_STD: float = math.tau / 42 / math.sqrt(12)
+# how far the plant model's velocity is trusted to drift per second, rad/s
+MODEL_VELOCITY_STD: float = 2.0
+# how fast the load acceleration can change per second, rad/s^2, large enough to follow a note going through
+DISTURBANCE_STD: float = 2000.0
+
+# rad/s from the target that still counts as at speed, 3% of free speed at 10 V
+# about twice what a count of quantization at 20 ms can throw the estimate by
+AT_SPEED_TOLERANCE: float = 15.0
+# how sure the estimator has to be that the true speed is within tolerance
+AT_SPEED_CONFIDENCE: float = 0.95
+
+
+# iterates the Riccati equation until the covariance settles, returns the gain and the posterior covariance
+def steadyStateGain(
+    A: np.ndarray, Q: np.ndarray, C: np.ndarray, R: float, iterations: int = 10000
+) -> tuple[np.ndarray, np.ndarray]:
+    P = Q.copy()
+    for _ in range(iterations):
+        prior = A @ P @ A.T + Q
+        K = prior @ C / (C @ prior @ C + R)
+        posterior = prior - np.outer(K, C @ prior)
+        if np.allclose(posterior, P, rtol=1e-12, atol=1e-15):
+            break
+        P = posterior
+    return K, posterior
+
+
+class FlywheelEstimator:
+    def __init__(
+        self,
+        mech: Mechanism,
+        period: float = LOOP_PERIOD,
+        positionStd: float = POSITION_STD,
+        modelVelocityStd: float = MODEL_VELOCITY_STD,
+        disturbanceStd: float = DISTURBANCE_STD,
+    ) -> None:
+        self.name = mech.name
+        self.a = mech.a
+        self.b = mech.b
+
+        # state: position rad, velocity rad/s, load acceleration rad/s^2
+        self.position: float = 0
+        self.velocity: float = 0
+        self.disturbance: float = 0
+        self.acceleration: float = 0
+        # set by whatever spins the flywheel up, rad/s
+        self.target: float = 0
+        self.initialized: bool = False
+
+        self._coefficientDt: float = -1
+        self._updateCoefficients(period)
+        A = np.array(
+            [[1, self._g, self._h], [0, self._e, self._g], [0, 0, 1]], dtype=float
+        )
+        Q = np.diag([0, (modelVelocityStd**2) * period, (disturbanceStd**2) * period])
+        C = np.array([1.0, 0, 0])
+        K, P = steadyStateGain(A, Q, C, positionStd**2)
+        self.kPosition: float = K[0]
+        self.kVelocity: float = K[1]
+        self.kDisturbance: float = K[2]
+        # standard deviation of the velocity estimate once the filter has settled
+        self.velocityStd: float = math.sqrt(P[1, 1])
+
+    # exact discretization of the plant over dt, holding the volts and load acceleration
+    def _updateCoefficients(self, dt: float) -> None:
+        self._coefficientDt = dt
+        self._e = math.exp(-self.b * dt)
+        self._g = (1 - self._e) / self.b
+        self._h = (dt - self._g) / self.b
+
+    # angle in rad at the flywheel, volts is the command that was applied over the last dt
+    def update(self, angle: float, volts: float, dt: float) -> None:
+        if not self.initialized:
+            self.position = angle
+            self.initialized = True
+            return
+        if dt <= 0:
+            return
+        if dt != self._coefficientDt:
+            self._updateCoefficients(dt)
+
+        # predict
+        push = self.a * volts + self.disturbance
+        position = self.position + self._g * self.velocity + self._h * push
+        velocity = self._e * self.velocity + self._g * push
+
+        # correct with the measured position
+        err = angle - position
+        self.position = position + self.kPosition * err
+        self.velocity = velocity + self.kVelocity * err
+        self.disturbance += self.kDisturbance * err
+        self.acceleration = self.a * volts - self.b * self.velocity + self.disturbance
+
+    # probability that the true velocity is within AT_SPEED_TOLERANCE of target
+    @property
+    def atSpeedConfidence(self) -> float:
+        err = self.velocity - self.target
+        s = self.velocityStd * math.sqrt(2)
+        return 0.5 * (
+            math.erf((AT_SPEED_TOLERANCE - err) / s)
+            - math.erf((-AT_SPEED_TOLERANCE - err) / s)
+        )
+
+    @property
+    def atSpeed(self) -> bool:
+        return self.atSpeedConfidence >= AT_SPEED_CONFIDENCE
+
+    def reset(self) -> None:
+        self.velocity = 0
+        self.disturbance = 0
+        self.acceleration = 0
+        self.initialized = False
@@ -0,0 +1,136 @@
+import gc
+
+import profiler
+from ntcore import NetworkTableInstance
+
+# keeps the garbage collector out of the enabled control loop
+# freeze() after robotInit moves everything built at startup out of the collector's reach
+# while enabled automatic collection is off and collectStep runs young collections where the loop has slack
+# once disabled automatic collection is back on and collectStep catches up on the full collection that was held off
+
+# the oldest generation collectStep will collect while enabled, a full collection is never worth an overrun
+ENABLED_MAX_GENERATION: int = 1
+
+enabled: bool = False
+# a full collection is owed from the time spent enabled
+fullPending: bool = False
+
+# filled by the gc.callbacks hook, per generation
+collections: list[int] = [0, 0, 0]
+totalTime: list[float] = [0.0, 0.0, 0.0]
+maxTime: list[float] = [0.0, 0.0, 0.0]
+# collections that started on their own while enabled, should stay 0
+automaticWhileEnabled: int = 0
+lastGeneration: int = -1
+lastTime: float = 0
+
+_start: float = 0
+# true while collectStep is collecting, so the hook can tell its collections from automatic ones
+_manual: bool = False
+
+
+def _onCollect(phase: str, info: dict) -> None:
+    global _start, lastGeneration, lastTime, automaticWhileEnabled
+    if phase == "start":
+        _start = profiler.clock()
+        return
+    duration = profiler.clock() - _start
+    gen = info["generation"]
+    collections[gen] += 1
+    totalTime[gen] += duration
+    if duration > maxTime[gen]:
+        maxTime[gen] = duration
+    lastGeneration = gen
+    lastTime = duration
+    if enabled and not _manual:
+        automaticWhileEnabled += 1
+
+
+# call once at the end of robotInit
+def freeze() -> None:
+    if _onCollect not in gc.callbacks:
+        gc.callbacks.append(_onCollect)
+    gc.collect()
+    gc.freeze()
+
+
+# call from the mode inits, true for autonomous and teleop
+def setEnabled(isEnabled: bool) -> None:
+    global enabled, fullPending
+    if isEnabled and not enabled:
+        gc.disable()
+        fullPending = True
+    elif not isEnabled and enabled:
+        gc.enable()
+    enabled = isEnabled
+
+
+# the oldest generation due for a collection by the collector's own thresholds, -1 for none
+def _dueGeneration(limit: int) -> int:
+    counts = gc.get_count()
+    thresholds = gc.get_threshold()
+    gen = -1
+    for i in range(limit + 1):
+        if counts[i] > thresholds[i]:
+            gen = i
+    return gen
+
+
+def _collect(gen: int) -> None:
+    global _manual
+    _manual = True
+    try:
+        gc.collect(gen)
+    finally:
+        _manual = False
+
+
+# one bounded collection, run it where the loop has slack, e.g. as a low priority scheduler task
+# the scheduler only defers it MAX_DEFERRALS times, so the young generations can't grow without bound
+def collectStep() -> None:
+    global fullPending
+    if enabled:
+        gen = _dueGeneration(ENABLED_MAX_GENERATION)
+        if gen >= 0:
+            _collect(gen)
+    elif fullPending:
+        fullPending = False
+        _collect(2)
+
+
+# collections, mean ms and max ms for each generation, then automaticWhileEnabled and the last collection
+def stats() -> list[float]:
+    out: list[float] = []
+    for gen in range(3):
+        n = collections[gen]
+        out += [
+            float(n),
+            totalTime[gen] / n * 1000 if n > 0 else 0,
+            maxTime[gen] * 1000,
+        ]
+    out += [float(automaticWhileEnabled), float(lastGeneration), lastTime * 1000]
+    return out
+
+
+def publish() -> None:
+    table = NetworkTableInstance.getDefault().getTable("gc")
+    table.putNumberArray("stats", stats())
+    table.putBoolean("enabled", enabled)
+
+
+# puts the collector back to normal, for tests and anything else that builds robots in one process
+def reset() -> None:
+    global enabled, fullPending, automaticWhileEnabled, lastGeneration, lastTime
+    gc.enable()
+    gc.unfreeze()
+    if _onCollect in gc.callbacks:
+        gc.callbacks.remove(_onCollect)
+    enabled = False
+    fullPending = False
+    for gen in range(3):
+        collections[gen] = 0
+        totalTime[gen] = 0
+        maxTime[gen] = 0
+    automaticWhileEnabled = 0
+    lastGeneration = -1
+    lastTime = 0
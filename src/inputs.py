@@ -0,0 +1,119 @@
+import wpilib
+from utils import CircularScalar, Scalar
+
+# every axis and button the robot uses, read from the driver station once per loop
+# the snapshot is one int of button bits and a list of axes, which is also what the match log records
+# everything after update() in the loop sees the same values, no matter how often it asks
+
+DRIVE_PORT: int = 0
+ARM_PORT: int = 1
+PANEL_PORT: int = 4
+
+# where each controller's buttons start in the packed bits, 16 per xbox controller and 32 for the panel
+DRIVE_SHIFT: int = 0
+ARM_SHIFT: int = 16
+PANEL_SHIFT: int = 32
+
+_Axis = wpilib.XboxController.Axis
+_Button = wpilib.XboxController.Button
+
+# name, port, axis for each slot of RobotInputs.axes
+AXES: tuple[tuple[str, int, int], ...] = (
+    ("driveLeftX", DRIVE_PORT, _Axis.kLeftX),
+    ("driveLeftY", DRIVE_PORT, _Axis.kLeftY),
+    ("driveRightX", DRIVE_PORT, _Axis.kRightX),
+    ("driveRightY", DRIVE_PORT, _Axis.kRightY),
+    ("driveLeftTrigger", DRIVE_PORT, _Axis.kLeftTrigger),
+    ("driveRightTrigger", DRIVE_PORT, _Axis.kRightTrigger),
+    ("armLeftX", ARM_PORT, _Axis.kLeftX),
+    ("armLeftY", ARM_PORT, _Axis.kLeftY),
+    ("armRightX", ARM_PORT, _Axis.kRightX),
+    ("armRightY", ARM_PORT, _Axis.kRightY),
+    ("armLeftTrigger", ARM_PORT, _Axis.kLeftTrigger),
+    ("armRightTrigger", ARM_PORT, _Axis.kRightTrigger),
+)
+AXIS_NAMES: tuple[str, ...] = tuple(a[0] for a in AXES)
+AXIS_INDEX: dict[str, int] = {name: i for i, name in enumerate(AXIS_NAMES)}
+
+_DRIVE_LEFT_X = AXIS_INDEX["driveLeftX"]
+_DRIVE_LEFT_Y = AXIS_INDEX["driveLeftY"]
+_DRIVE_RIGHT_X = AXIS_INDEX["driveRightX"]
+_DRIVE_RIGHT_Y = AXIS_INDEX["driveRightY"]
+_DRIVE_RIGHT_TRIGGER = AXIS_INDEX["driveRightTrigger"]
+_ARM_LEFT_Y = AXIS_INDEX["armLeftY"]
+
+
+# the bit of a button in the packed buttons, buttons are numbered from 1 like the driver station does
+def buttonBit(shift: int, button: int) -> int:
+    return 1 << (shift + button - 1)
+
+
+GYRO_RESET: int = buttonBit(DRIVE_SHIFT, _Button.kStart)
+ABS_TOGGLE: int = buttonBit(DRIVE_SHIFT, _Button.kBack)
+
+
+class RobotInputs:
+    def __init__(self) -> None:
+        self.driveScalar = CircularScalar(0.06, 1)
+        self.turningScalar = CircularScalar(0.1, 1)
+        self.manualAimScalar = Scalar(deadZone=0.1)
+
+        # the snapshot
+        self.buttons: int = 0
+        self.axes: list[float] = [0.0] * len(AXES)
+
+        # buttons that went down or up since the last update
+        self.pressed: int = 0
+        self.released: int = 0
+        self.prevButtons: int = 0
+
+        # worked out from the snapshot in update, with the scalars applied
+        self.driveX: float = 0.0
+        self.driveY: float = 0.0
+        self.turningX: float = 0.0
+        self.turningY: float = 0.0
+        self.speedCtrl: float = 0.0
+        self.manualAim: float = 0.0
+        self.gyroReset: bool = False
+        self.absToggle: bool = False
+
+    # fills the snapshot from the driver station, one call for each controller's buttons and one per axis
+    def read(self) -> None:
+        ds = wpilib.DriverStation
+        self.buttons = (
+            (ds.getStickButtons(DRIVE_PORT) & 0xFFFF) << DRIVE_SHIFT
+            | (ds.getStickButtons(ARM_PORT) & 0xFFFF) << ARM_SHIFT
+            | (ds.getStickButtons(PANEL_PORT) & 0xFFFFFFFF) << PANEL_SHIFT
+        )
+        axes = self.axes
+        for i, (_, port, axis) in enumerate(AXES):
+            axes[i] = ds.getStickAxis(port, axis)
+
+    def update(self) -> None:
+        self.prevButtons = self.buttons
+        self.read()
+        changed = self.buttons ^ self.prevButtons
+        self.pressed = changed & self.buttons
+        self.released = changed & self.prevButtons
+
+        # sticks are negative pushed forward and left, x is forward and y is left on the field
+        a = self.axes
+        self.driveX, self.driveY = self.driveScalar.Scale(
+            -a[_DRIVE_LEFT_Y], -a[_DRIVE_LEFT_X]
+        )
+        self.turningX, self.turningY = self.turningScalar.Scale(
+            -a[_DRIVE_RIGHT_Y], -a[_DRIVE_RIGHT_X]
+        )
+        self.speedCtrl = a[_DRIVE_RIGHT_TRIGGER]
+        self.manualAim = self.manualAimScalar.scale(-a[_ARM_LEFT_Y])
+        self.gyroReset = self.pressed & GYRO_RESET != 0
+        self.absToggle = self.pressed & ABS_TOGGLE != 0
+
+    def isDown(self, bit: int) -> bool:
+        return self.buttons & bit != 0
+
+    def wasPressed(self, bit: int) -> bool:
+        return self.pressed & bit != 0
+
+    def wasReleased(self, bit: int) -> bool:
+        return self.released & bit != 0
@@ -0,0 +1,163 @@
+import math
+
+import ntcore
+import wpilib
+from ntcore import NetworkTable, NetworkTableInstance
+
+# queued limelight pose ingestion, every frame the camera publishes is seen once with its capture time
+# capture times are in the same time base as the robot clock passed to poll()
+
+# pipelines in apriltag files/*.vpr
+PIPELINE_ODOM_RESET = 0
+PIPELINE_SUBWOOFER_RED = 1
+PIPELINE_SUBWOOFER_BLUE = 2
+PIPELINE_NAMES: dict[int, str] = {
+    PIPELINE_ODOM_RESET: "odomReset",
+    PIPELINE_SUBWOOFER_RED: "subwooferLineupRed",
+    PIPELINE_SUBWOOFER_BLUE: "subwooferLineupBlue",
+}
+
+STATS_WINDOW = 50  # frames
+
+
+class VisionFrame:
+    __slots__ = ("x", "y", "heading", "timestamp", "tagCount", "pipeline", "latency")
+
+    def __init__(
+        self,
+        x: float,
+        y: float,
+        heading: float,
+        timestamp: float,
+        tagCount: int,
+        pipeline: int,
+        latency: float,
+    ) -> None:
+        # field pose on the blue origin, meters and CCW radians
+        self.x = x
+        self.y = y
+        self.heading = heading
+        # when the image was captured, robot clock seconds
+        self.timestamp = timestamp
+        self.tagCount = tagCount
+        self.pipeline = pipeline
+        # capture to being handed to the robot code, seconds
+        self.latency = latency
+
+
+class Limelight:
+    def __init__(
+        self,
+        name: str = "limelight-front",
+        maxAge: float = 0.5,
+        queueSize: int = 10,
+    ) -> None:
+        self.name = name
+        self.table = NetworkTableInstance.getDefault().getTable(name)
+        # frames older than this when polled are dropped
+        self.maxAge = maxAge
+        options = ntcore.PubSubOptions(
+            sendAll=True, keepDuplicates=True, pollStorage=queueSize
+        )
+        # x, y, z, roll, pitch, yaw in degrees, total latency ms, tag count, ...
+        self.botposeSub = self.table.getDoubleArrayTopic("botpose_wpiblue").subscribe(
+            [], options
+        )
+        self.tidSub = self.table.getDoubleTopic("tid").subscribe(-1)
+        self.pipelineSub = self.table.getDoubleTopic("getpipe").subscribe(-1)
+        self.pipelinePub = self.table.getDoubleTopic("pipeline").publish()
+
+        self.lastTimestamp: float = -1
+        self.accepted: int = 0
+        self.duplicates: int = 0
+        self.stale: int = 0
+        self.noTarget: int = 0
+
+        # capture timestamps and latencies of the last STATS_WINDOW accepted frames
+        self._times: list[float] = [0.0] * STATS_WINDOW
+        self._latencies: list[float] = [0.0] * STATS_WINDOW
+        self._statsIndex = 0
+
+    def setPipeline(self, pipeline: int) -> None:
+        self.pipelinePub.set(pipeline)
+
+    @property
+    def pipeline(self) -> int:
+        return int(self.pipelineSub.get())
+
+    @property
+    def tid(self) -> int:
+        return int(self.tidSub.get())
+
+    # every frame that arrived since the last call and is new, has a target and isn't stale, oldest first
+    def poll(self, now: float) -> list[VisionFrame]:
+        updates = self.botposeSub.readQueue()
+        if len(updates) == 0:
+            return []
+
+        # NT stamps arrivals with the FPGA clock, line that up with the robot clock now
+        offset = now - wpilib.RobotController.getFPGATime() * 1e-6
+        pipeline = self.pipeline
+        frames = []
+        for u in updates:
+            pose = u.value
+            if len(pose) < 8 or pose[7] < 1:
+                self.noTarget += 1
+                continue
+            timestamp = u.time * 1e-6 + offset - pose[6] / 1000
+            if now - timestamp > self.maxAge:
+                self.stale += 1
+                continue
+            if timestamp <= self.lastTimestamp:
+                self.duplicates += 1
+                continue
+            self.lastTimestamp = timestamp
+            frame = VisionFrame(
+                pose[0],
+                pose[1],
+                math.radians(pose[5]),
+                timestamp,
+                int(pose[7]),
+                pipeline,
+                now - timestamp,
+            )
+            frames.append(frame)
+            self._record(frame)
+        return frames
+
+    def _record(self, frame: VisionFrame) -> None:
+        self._times[self._statsIndex] = frame.timestamp
+        self._latencies[self._statsIndex] = frame.latency
+        self._statsIndex = (self._statsIndex + 1) % STATS_WINDOW
+        self.accepted += 1
+
+    # accepted frames per second over the stats window
+    @property
+    def fps(self) -> float:
+        n = min(self.accepted, STATS_WINDOW)
+        if n < 2:
+            return 0
+        newest = self._times[(self._statsIndex - 1) % STATS_WINDOW]
+        oldest = self._times[(self._statsIndex - n) % STATS_WINDOW]
+        return (n - 1) / (newest - oldest) if newest > oldest else 0
+
+    # mean and max capture to robot code latency over the stats window, seconds
+    @property
+    def latencyStats(self) -> tuple[float, float]:
+        n = min(self.accepted, STATS_WINDOW)
+        if n == 0:
+            return 0, 0
+        recent = (
+            self._latencies[:n] if self.accepted <= STATS_WINDOW else self._latencies
+        )
+        return sum(recent) / n, max(recent)
+
+    def publish(self, table: NetworkTable) -> None:
+        mean, worst = self.latencyStats
+        table.putNumber(self.name + "Fps", self.fps)
+        table.putNumber(self.name + "LatencyMean", mean)
+        table.putNumber(self.name + "LatencyMax", worst)
+        table.putNumberArray(
+            self.name + "Counts",
+            [self.accepted, self.duplicates, self.stale, self.noTarget],
+        )
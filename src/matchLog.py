@@ -0,0 +1,324 @@
+import mmap
+import os
+import queue
+import struct
+import threading
+from typing import Any
+
+import wpilib
+from inputs import AXIS_NAMES, RobotInputs
+from robotHAL import RobotHALBuffer
+from timing import SteppedClock, TimeData
+
+# binary match log: a header, then one fixed size record per robot loop
+# records are written from a background thread so disk I/O never blocks the loop
+
+# where the robot keeps its logs, on the roboRIO
+LOG_DIR = "/home/lvuser/logs"
+
+MAGIC = b"MATCHLOG"
+VERSION = 2
+HEADER = struct.Struct("<8sII")  # magic, version, record size
+
+MODE_DISABLED = 0
+MODE_AUTO = 1
+MODE_TELEOP = 2
+MODE_TEST = 3
+
+TIME_FIELDS: tuple[str, ...] = ("prevTime", "dt", "timeSinceInit")
+# RobotHALBuffer list fields, each holds two values
+HAL_LIST_FIELDS: tuple[str, ...] = (
+    "leftDriveVolts",
+    "rightDriveVolts",
+    "leftDrivePositions",
+    "rightDrivePositions",
+    "leftDriveSpeedMeasured",
+    "rightDriveSpeedMeasured",
+)
+HAL_SCALAR_FIELDS: tuple[str, ...] = tuple(
+    f for f in RobotHALBuffer.__slots__ if f not in HAL_LIST_FIELDS
+)
+# the raw axes of the RobotInputs snapshot, its buttons are the record's packed button bits
+INPUT_FIELDS: tuple[str, ...] = AXIS_NAMES
+
+# names of the doubles in a record, in order, lists are written as name[i]
+VALUE_NAMES: tuple[str, ...] = (
+    TIME_FIELDS
+    + tuple(f"{f}[{i}]" for f in HAL_LIST_FIELDS for i in range(2))
+    + HAL_SCALAR_FIELDS
+    + INPUT_FIELDS
+)
+# mode, input buttons, then every value in VALUE_NAMES
+RECORD = struct.Struct("<BQ" + "d" * len(VALUE_NAMES))
+
+_TIME_START = 0
+_HAL_START = len(TIME_FIELDS)
+_HAL_SCALAR_START = _HAL_START + 2 * len(HAL_LIST_FIELDS)
+_INPUT_START = _HAL_SCALAR_START + len(HAL_SCALAR_FIELDS)
+
+
+LOG_PREFIX = "match"
+LOG_SUFFIX = ".log"
+# the newest logs kept in LOG_DIR, older ones are deleted when a new one starts
+KEEP_LOGS: int = 20
+# a log stops growing here, about 8 minutes at 50 Hz, a match with the time before it fits in half that
+MAX_LOG_BYTES: int = 8_000_000
+
+
+# the number in a log's file name, None for anything else in the directory
+def logNumber(name: str) -> int | None:
+    if not (name.startswith(LOG_PREFIX) and name.endswith(LOG_SUFFIX)):
+        return None
+    digits = name[len(LOG_PREFIX) : -len(LOG_SUFFIX)]
+    return int(digits) if digits.isdigit() else None
+
+
+# deletes all but the newest keep logs in logDir
+def pruneLogs(logDir: str = LOG_DIR, keep: int = KEEP_LOGS) -> None:
+    numbered = sorted(
+        (n, name) for name in os.listdir(logDir) if (n := logNumber(name)) is not None
+    )
+    for _, name in numbered[: max(len(numbered) - keep, 0)]:
+        try:
+            os.remove(os.path.join(logDir, name))
+        except OSError:
+            pass
+
+
+# a fresh file name in LOG_DIR, numbered since the rio clock isn't set until the DS connects
+# one past the highest number there, and only the newest keep - 1 old logs are left beside it
+def newLogPath(logDir: str = LOG_DIR, keep: int = KEEP_LOGS) -> str:
+    os.makedirs(logDir, exist_ok=True)
+    numbers = [n for name in os.listdir(logDir) if (n := logNumber(name)) is not None]
+    n = max(numbers) + 1 if len(numbers) > 0 else 0
+    pruneLogs(logDir, keep - 1)
+    return os.path.join(logDir, f"{LOG_PREFIX}{n:04}{LOG_SUFFIX}")
+
+
+def currentMode() -> int:
+    if wpilib.DriverStation.isDisabled():
+        return MODE_DISABLED
+    if wpilib.DriverStation.isAutonomous():
+        return MODE_AUTO
+    if wpilib.DriverStation.isTest():
+        return MODE_TEST
+    return MODE_TELEOP
+
+
+def packRecord(
+    mode: int, time: TimeData, hal: RobotHALBuffer, inputs: RobotInputs
+) -> bytes:
+    return RECORD.pack(
+        mode,
+        inputs.buttons,
+        time.prevTime,
+        time.dt,
+        time.timeSinceInit,
+        *hal.leftDriveVolts,
+        *hal.rightDriveVolts,
+        *hal.leftDrivePositions,
+        *hal.rightDrivePositions,
+        *hal.leftDriveSpeedMeasured,
+        *hal.rightDriveSpeedMeasured,
+        *[getattr(hal, f) for f in HAL_SCALAR_FIELDS],
+        *inputs.axes,
+    )
+
+
+# one unpacked record
+class LogRecord:
+    def __init__(self, raw: tuple) -> None:
+        self.mode: int = raw[0]
+        self.buttons: int = raw[1]
+        self.values: tuple[float, ...] = raw[2:]
+
+    @property
+    def time(self) -> float:
+        return self.values[_TIME_START]
+
+    def get(self, name: str) -> float:
+        return self.values[VALUE_NAMES.index(name)]
+
+    # writes the logged HAL fields into buf, pass sensorsOnly to leave the commanded volts alone
+    def loadHAL(self, buf: RobotHALBuffer, sensorsOnly: bool = False) -> None:
+        v = self.values
+        i = _HAL_START
+        for f in HAL_LIST_FIELDS:
+            if not (sensorsOnly and f.endswith("Volts")):
+                dest = getattr(buf, f)
+                dest[0] = v[i]
+                dest[1] = v[i + 1]
+            i += 2
+        for f in HAL_SCALAR_FIELDS:
+            if not (sensorsOnly and f.endswith("Volts")):
+                setattr(buf, f, v[i])
+            i += 1
+
+    # the logged snapshot, RobotInputs.update works everything else out from it
+    def loadInputs(self, inputs: RobotInputs) -> None:
+        inputs.buttons = self.buttons
+        inputs.axes[:] = self.values[_INPUT_START:]
+
+
+class MatchRecorder:
+    def __init__(
+        self, path: str, queueSize: int = 500, maxBytes: int = MAX_LOG_BYTES
+    ) -> None:
+        self.path = path
+        # records past this many are counted as dropped
+        self.maxRecords: int = max((maxBytes - HEADER.size) // RECORD.size, 0)
+        self.queued: int = 0
+        self.file = open(path, "wb")
+        self.file.write(HEADER.pack(MAGIC, VERSION, RECORD.size))
+        self.queue: queue.Queue[bytes | None] = queue.Queue(queueSize)
+        # records thrown away because the writer fell behind, the loop never waits on it
+        self.dropped: int = 0
+        self.written: int = 0
+        self.error: OSError | None = None
+        self.thread = threading.Thread(
+            target=self._writeLoop, name="match log writer", daemon=True
+        )
+        self.thread.start()
+
+    def record(
+        self, mode: int, time: TimeData, hal: RobotHALBuffer, inputs: RobotInputs
+    ) -> None:
+        if self.queued >= self.maxRecords:
+            self.dropped += 1
+            return
+        try:
+            self.queue.put_nowait(packRecord(mode, time, hal, inputs))
+            self.queued += 1
+        except queue.Full:
+            self.dropped += 1
+
+    def close(self) -> None:
+        self.queue.put(None)
+        self.thread.join()
+
+    def _writeLoop(self) -> None:
+        done = False
+        while not done:
+            batch = [self.queue.get()]
+            # grab everything else already waiting so a slow disk gets fewer, larger writes
+            while True:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            if None in batch:
+                done = True
+                batch = batch[: batch.index(None)]
+            if self.error is None and len(batch) > 0:
+                try:
+                    self.file.write(b"".join(batch))  # type: ignore
+                    self.file.flush()
+                    self.written += len(batch)
+                except OSError as e:
+                    self.error = e
+        self.file.close()
+
+
+# memory maps a log for reading
+class MatchLog:
+    def __init__(self, path: str) -> None:
+        self.path = path
+        with open(path, "rb") as f:
+            self.map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, size = HEADER.unpack_from(self.map, 0)
+        if magic != MAGIC or version != VERSION or size != RECORD.size:
+            self.map.close()
+            raise ValueError(f"{path} is not a version {VERSION} match log")
+        # a record cut off by a brownout is ignored
+        self.count: int = (len(self.map) - HEADER.size) // RECORD.size
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __getitem__(self, i: int) -> LogRecord:
+        if i < 0:
+            i += self.count
+        if not 0 <= i < self.count:
+            raise IndexError(i)
+        return LogRecord(RECORD.unpack_from(self.map, HEADER.size + i * RECORD.size))
+
+    def close(self) -> None:
+        self.map.close()
+
+
+# stands in for RobotHAL/RobotSimHAL during replay
+# update() checks the commands the robot code produced against the log, then hands back the logged sensors
+class ReplayHAL:
+    def __init__(self, log: MatchLog, tolerance: float = 1e-6) -> None:
+        self.log = log
+        self.tolerance = tolerance
+        self.tick: int = 0
+        # tick, command field, logged value, replayed value
+        self.mismatches: list[tuple[int, str, float, float]] = []
+        self._logged = RobotHALBuffer()
+
+    def update(self, buf: RobotHALBuffer, time: TimeData) -> None:
+        rec = self.log[self.tick]
+        rec.loadHAL(self._logged)
+        for f in HAL_LIST_FIELDS:
+            if f.endswith("Volts"):
+                for i, (a, b) in enumerate(
+                    zip(getattr(self._logged, f), getattr(buf, f))
+                ):
+                    if abs(a - b) > self.tolerance:
+                        self.mismatches.append((self.tick, f"{f}[{i}]", a, b))
+        for f in HAL_SCALAR_FIELDS:
+            if f.endswith("Volts"):
+                a = getattr(self._logged, f)
+                b = getattr(buf, f)
+                if abs(a - b) > self.tolerance:
+                    self.mismatches.append((self.tick, f, a, b))
+        rec.loadHAL(buf, sensorsOnly=True)
+
+    def resetGyroToAngle(self, angleRads: float) -> None:
+        pass
+
+
+# RobotInputs with the snapshot read from the log instead of the driver station
+# edges, scaling and everything else derived from the snapshot run the same as in the match
+class ReplayInputs(RobotInputs):
+    def __init__(self, log: MatchLog) -> None:
+        super().__init__()
+        self.log = log
+        self.tick: int = 0
+
+    def read(self) -> None:
+        self.log[self.tick].loadInputs(self)
+
+
+# runs every logged tick through an initialized Robot as fast as possible
+# returns the commands that differ from the log
+def replay(robot: Any, log: MatchLog) -> list[tuple[int, str, float, float]]:
+    hal = ReplayHAL(log)
+    inputs = ReplayInputs(log)
+    clock = SteppedClock(log[0].time if len(log) > 0 else 0)
+    robot.hardware = hal
+    robot.input = inputs
+    robot.time = TimeData(timeSource=clock)
+    robot.recorder = None
+    robot.recordMatch = False
+
+    modes = {
+        MODE_DISABLED: (robot.disabledInit, robot.disabledPeriodic),
+        MODE_AUTO: (robot.autonomousInit, robot.autonomousPeriodic),
+        MODE_TELEOP: (robot.teleopInit, robot.teleopPeriodic),
+        MODE_TEST: (robot.testInit, robot.testPeriodic),
+    }
+    mode = -1
+    for i in range(len(log)):
+        rec = log[i]
+        hal.tick = i
+        inputs.tick = i
+        clock.now = rec.time
+        init, periodic = modes[rec.mode]
+        if rec.mode != mode:
+            mode = rec.mode
+            init()
+        periodic()
+        robot.robotPeriodic()
+    return hal.mismatches
@@ -0,0 +1,242 @@
+import functools
+import heapq
+import json
+import math
+import os
+
+import numpy as np
+import wpilib
+
+# pathfinding on the PathPlanner navgrid, loaded once and inflated for the robot's footprint
+# queries run A* over 8 connected cells and return waypoints in field meters
+
+# the footprint configured on the limelights
+BOT_WIDTH: float = 0.7112
+BOT_LENGTH: float = 0.7112
+
+# nodes a search may expand before giving up, counted rather than timed so a query always ends the same way
+# every reachable pair on the current navgrid takes under 800, a few ms on the rio
+MAX_EXPANDED: int = 1000
+
+
+# raised out of a search that ran past its budget, so lru_cache doesn't remember the failure
+class _OverBudget(Exception):
+    pass
+
+
+def defaultPath() -> str:
+    return os.path.join(wpilib.getDeployDirectory(), "pathplanner", "navgrid.json")
+
+
+class NavGrid:
+    def __init__(
+        self,
+        path: str | None = None,
+        inflation: float | None = None,
+        cacheSize: int = 256,
+    ) -> None:
+        with open(defaultPath() if path is None else path) as f:
+            data = json.load(f)
+        self.nodeSize: float = data["nodeSizeMeters"]
+        self.fieldLength: float = data["field_size"]["x"]
+        self.fieldWidth: float = data["field_size"]["y"]
+
+        grid = np.array(data["grid"], dtype=bool)
+        self.rows: int = grid.shape[0]
+        self.cols: int = grid.shape[1]
+        # one bit per node, rows padded to whole bytes
+        self.obstacleBits: np.ndarray = np.packbits(grid, axis=1)
+
+        self.clearance: np.ndarray = self._clearance(grid)
+        # a robot that can spin in place needs its circumscribed circle clear
+        self.inflation: float = (
+            math.hypot(BOT_WIDTH, BOT_LENGTH) / 2 if inflation is None else inflation
+        )
+        blocked = self.clearance < self.inflation
+        self.blocked: list[bool] = blocked.ravel().tolist()
+
+        self.neighbors: list[list[tuple[int, float]]] = self._buildNeighbors()
+        self._cachedSearch = functools.lru_cache(cacheSize)(self._search)
+        self.overBudget: int = 0
+        self._budget: int = MAX_EXPANDED
+
+    # for every node, the free nodes one of the 8 moves away and the cost of getting there
+    # diagonal moves that would clip the corner of a blocked node are left out
+    def _buildNeighbors(self) -> list[list[tuple[int, float]]]:
+        rows = self.rows
+        cols = self.cols
+        blocked = self.blocked
+        neighbors: list[list[tuple[int, float]]] = []
+        for i in range(rows * cols):
+            r, c = divmod(i, cols)
+            out = []
+            if not blocked[i]:
+                for dr in (-1, 0, 1):
+                    for dc in (-1, 0, 1):
+                        nr = r + dr
+                        nc = c + dc
+                        if (dr == 0 and dc == 0) or not (
+                            0 <= nr < rows and 0 <= nc < cols
+                        ):
+                            continue
+                        if blocked[nr * cols + nc]:
+                            continue
+                        if (
+                            dr != 0
+                            and dc != 0
+                            and (blocked[r * cols + nc] or blocked[nr * cols + c])
+                        ):
+                            continue
+                        out.append((nr * cols + nc, math.hypot(dr, dc)))
+            neighbors.append(out)
+        return neighbors
+
+    def isObstacle(self, row: int, col: int) -> bool:
+        return bool(self.obstacleBits[row, col >> 3] & (0x80 >> (col & 7)))
+
+    # meters from every node center to the nearest obstacle node edge or the field wall
+    # an exact distance transform in two passes, so nothing bigger than the grid is ever built
+    def _clearance(self, grid: np.ndarray) -> np.ndarray:
+        rows, cols = grid.shape
+        half = self.nodeSize / 2
+        r = np.arange(rows)
+        c = np.arange(cols)
+
+        # along each row, columns to the nearest obstacle in that row, inf for a row without one
+        left = np.maximum.accumulate(np.where(grid, c, -np.inf), axis=1)
+        right = np.minimum.accumulate(np.where(grid, c, np.inf)[:, ::-1], axis=1)
+        rowDistSq = np.minimum(c - left, right[:, ::-1] - c) ** 2
+
+        # down each column, the nearest of every row's distance, one output row at a time
+        nearest = np.empty(grid.shape)
+        for i in range(rows):
+            dr = (r - i) ** 2
+            np.sqrt((rowDistSq + dr[:, None]).min(axis=0), out=nearest[i])
+        nearest = np.maximum(nearest * self.nodeSize - half, 0)
+
+        wallRows = np.minimum(r, rows - 1 - r) * self.nodeSize + self.nodeSize
+        wallCols = np.minimum(c, cols - 1 - c) * self.nodeSize + self.nodeSize
+        wall = np.minimum(wallRows[:, None], wallCols[None, :]) - half
+        return np.minimum(nearest, wall)
+
+    def cellOf(self, x: float, y: float) -> tuple[int, int]:
+        col = min(max(int(x / self.nodeSize), 0), self.cols - 1)
+        row = min(max(int(y / self.nodeSize), 0), self.rows - 1)
+        return row, col
+
+    def centerOf(self, row: int, col: int) -> tuple[float, float]:
+        return ((col + 0.5) * self.nodeSize, (row + 0.5) * self.nodeSize)
+
+    # the free node closest to the given one, so a pose inside an inflated obstacle still gets a path out
+    def nearestFree(self, row: int, col: int) -> tuple[int, int] | None:
+        if not self.blocked[row * self.cols + col]:
+            return row, col
+        best = None
+        bestDist = math.inf
+        for i, b in enumerate(self.blocked):
+            if not b:
+                r, c = divmod(i, self.cols)
+                d = (r - row) ** 2 + (c - col) ** 2
+                if d < bestDist:
+                    best = (r, c)
+                    bestDist = d
+        return best
+
+    # waypoints in field meters from start to goal, or None if there is no path or the budget ran out
+    # the first and last waypoints are the exact start and goal
+    def findPath(
+        self,
+        start: tuple[float, float],
+        goal: tuple[float, float],
+        budget: int = MAX_EXPANDED,
+    ) -> list[tuple[float, float]] | None:
+        s = self.nearestFree(*self.cellOf(*start))
+        g = self.nearestFree(*self.cellOf(*goal))
+        if s is None or g is None:
+            return None
+        self._budget = budget
+        try:
+            cells = self._cachedSearch(s, g)
+        except _OverBudget:
+            self.overBudget += 1
+            return None
+        if cells is None:
+            return None
+        points = [self.centerOf(*divmod(i, self.cols)) for i in cells[1:-1]]
+        return [start] + points + [goal]
+
+    def cacheInfo(self):
+        return self._cachedSearch.cache_info()
+
+    def _search(
+        self, start: tuple[int, int], goal: tuple[int, int]
+    ) -> tuple[int, ...] | None:
+        cols = self.cols
+        neighbors = self.neighbors
+        startIndex = start[0] * cols + start[1]
+        goalIndex = goal[0] * cols + goal[1]
+        gr, gc = goal
+        diagonalExtra = math.sqrt(2) - 1
+        budget = self._budget
+
+        cost = {startIndex: 0.0}
+        parent = {startIndex: -1}
+        frontier = [(0.0, startIndex)]
+        expanded = 0
+        while frontier:
+            _, i = heapq.heappop(frontier)
+            if i == goalIndex:
+                return self._simplify(self._walk(parent, i))
+            expanded += 1
+            if expanded > budget:
+                raise _OverBudget()
+            base = cost[i]
+            for n, step in neighbors[i]:
+                newCost = base + step
+                if newCost < cost.get(n, math.inf):
+                    cost[n] = newCost
+                    parent[n] = i
+                    # octile distance, exact on an empty 8 connected grid
+                    r, c = divmod(n, cols)
+                    dr = abs(r - gr)
+                    dc = abs(c - gc)
+                    if dr > dc:
+                        h = dr + diagonalExtra * dc
+                    else:
+                        h = dc + diagonalExtra * dr
+                    heapq.heappush(frontier, (newCost + h, n))
+        return None
+
+    def _walk(self, parent: dict[int, int], i: int) -> list[int]:
+        cells = []
+        while i != -1:
+            cells.append(i)
+            i = parent[i]
+        cells.reverse()
+        return cells
+
+    # drops nodes that the robot can skip by driving straight past them
+    def _simplify(self, cells: list[int]) -> tuple[int, ...]:
+        if len(cells) <= 2:
+            return tuple(cells)
+        out = [cells[0]]
+        anchor = cells[0]
+        for prev, cell in zip(cells[1:-1], cells[2:]):
+            if not self._lineOfSight(anchor, cell):
+                out.append(prev)
+                anchor = prev
+        out.append(cells[-1])
+        return tuple(out)
+
+    # samples the segment between two node centers at a quarter node spacing
+    def _lineOfSight(self, a: int, b: int) -> bool:
+        ar, ac = divmod(a, self.cols)
+        br, bc = divmod(b, self.cols)
+        steps = int(max(abs(br - ar), abs(bc - ac)) * 4) + 1
+        for k in range(steps + 1):
+            t = k / steps
+            r = round(ar + (br - ar) * t)
+            c = round(ac + (bc - ac) * t)
+            if self.blocked[r * self.cols + c]:
+                return False
+        return True
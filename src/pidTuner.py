@@ -0,0 +1,327 @@
+import argparse
+import concurrent.futures
+import itertools
+import os
+import random
+import sys
+import time
+
+import numpy as np
+from ntcore import NetworkTableInstance
+from PIDController import (
+    PIDBank,
+    PIDController,
+    PIDControllerForArm,
+    PIDControllerForCam,
+    createdControllers,
+    pidTable,
+)
+from real import signumArray
+from simPhysics import (
+    BATTERY_VOLTAGE,
+    MECHANISM_INDEX,
+    MECHANISMS,
+    Mechanism,
+    RobotPhysics,
+)
+
+# offline PID tuning against the simulator, candidates are scored on a step response
+# each worker process simulates its whole share of candidates as one batch, one PIDBank row and one RobotPhysics robot per candidate
+
+# seconds the client stays connected after writing, NT clients send queued values every 100 ms
+WRITE_LINGER: float = 0.5
+
+
+# a mechanism of the simulator plus the disturbances the PID has to fight, accelerations in rad/s^2
+class Plant:
+    def __init__(
+        self, mechanism: Mechanism, gravity: float = 0, staticFriction: float = 0
+    ) -> None:
+        # the column of the mechanism in RobotPhysics
+        self.index = MECHANISM_INDEX[mechanism.name]
+        # pulls the mechanism down with gravity * cos(position), for arms measured from horizontal
+        self.gravity = gravity
+        self.staticFriction = staticFriction
+
+
+class StepTest:
+    def __init__(
+        self,
+        target: float = 1.0,
+        duration: float = 3.0,
+        dt: float = 0.02,
+        substeps: int = 4,
+        band: float = 0.02,
+        overshootWeight: float = 2.0,
+        errorWeight: float = 10.0,
+    ) -> None:
+        self.target = target
+        self.duration = duration
+        # controller period, the plant is stepped substeps times per controller tick
+        self.dt = dt
+        self.substeps = substeps
+        # settled once the error stays inside band * target
+        self.band = band
+        self.overshootWeight = overshootWeight
+        self.errorWeight = errorWeight
+
+
+class TuneResult:
+    def __init__(
+        self,
+        gains: dict[str, float],
+        score: float,
+        settlingTime: float,
+        overshoot: float,
+        steadyStateError: float,
+    ) -> None:
+        self.gains = gains
+        self.score = score
+        self.settlingTime = settlingTime
+        self.overshoot = overshoot
+        self.steadyStateError = steadyStateError
+
+    def __str__(self) -> str:
+        gains = ", ".join(f"{k}={v:.4g}" for k, v in self.gains.items())
+        return (
+            f"score {self.score:.4f}: settle {self.settlingTime:.3f} s, overshoot {self.overshoot * 100:.1f}%, "
+            f"steady state error {self.steadyStateError:.4f} ({gains})"
+        )
+
+
+# simulates a step response for every candidate at once, returns a TuneResult per candidate
+def evaluate(
+    controllerType: type[PIDController],
+    plant: Plant,
+    candidates: list[dict[str, float]],
+    test: StepTest,
+) -> list[TuneResult]:
+    n = len(candidates)
+    bank = PIDBank(n)
+    for i, gains in enumerate(candidates):
+        c = controllerType(f"tune{i}", bank=bank)
+        for attr, value in gains.items():
+            setattr(c, attr, value)
+    bank.load()
+    # these are throwaway controllers, keep them off the pid table
+    createdControllers[:] = [c for c in createdControllers if c.bank is not bank]
+
+    # the same plant the robot sim runs, it clamps the commands to the battery
+    physics = RobotPhysics(n)
+    m = plant.index
+    steps = round(test.duration / test.dt)
+    h = test.dt / test.substeps
+    targets = np.full(n, test.target)
+    pos = np.zeros(n)
+    vel = np.zeros(n)
+    accel = np.zeros(n)
+    errors = np.zeros((steps, n))
+    peak = np.zeros(n)
+    for k in range(steps):
+        physics.mechVolts[:, m] = bank.tick(targets, pos, test.dt)
+        # the disturbances depend on the state, so they're updated every substep
+        for _ in range(test.substeps):
+            np.cos(pos, out=accel)
+            accel *= -plant.gravity
+            accel -= plant.staticFriction * signumArray(vel)
+            physics.mechAccel[:, m] = accel
+            physics.step(h)
+            pos[:] = physics.mechPos[:, m]
+            vel[:] = physics.mechVel[:, m]
+        errors[k] = test.target - pos
+        np.maximum(peak, pos, out=peak)
+
+    # settling time is the end of the last tick spent outside the band
+    outside = np.abs(errors) > test.band * abs(test.target)
+    lastOutside = np.where(
+        outside.any(axis=0), steps - np.argmax(outside[::-1], axis=0), 0
+    )
+    settlingTime = lastOutside * test.dt
+    overshoot = np.maximum(peak - test.target, 0) / abs(test.target)
+    tail = max(steps // 10, 1)
+    steadyStateError = np.abs(errors[-tail:]).mean(axis=0)
+    score = (
+        settlingTime
+        + test.overshootWeight * overshoot
+        + test.errorWeight * steadyStateError
+    )
+    score = np.where(np.isfinite(score), score, np.inf)
+
+    return [
+        TuneResult(
+            candidates[i],
+            float(score[i]),
+            float(settlingTime[i]),
+            float(overshoot[i]),
+            float(steadyStateError[i]),
+        )
+        for i in range(n)
+    ]
+
+
+def _evaluateParallel(
+    controllerType: type[PIDController],
+    plant: Plant,
+    candidates: list[dict[str, float]],
+    test: StepTest,
+    pool: concurrent.futures.Executor,
+    workers: int,
+) -> list[TuneResult]:
+    size = max(1, -(-len(candidates) // workers))
+    chunks = [candidates[i : i + size] for i in range(0, len(candidates), size)]
+    futures = [pool.submit(evaluate, controllerType, plant, c, test) for c in chunks]
+    return [r for f in futures for r in f.result()]
+
+
+# grid search over ranges, then random search shrinking around the best candidate so far
+# ranges maps controller attribute names to (low, high), attributes left out keep their defaults
+def tune(
+    controllerType: type[PIDController],
+    plant: Plant,
+    ranges: dict[str, tuple[float, float]],
+    test: StepTest | None = None,
+    gridSize: int = 5,
+    refineRounds: int = 3,
+    refineSamples: int = 64,
+    workers: int | None = None,
+    seed: int = 4536,
+) -> TuneResult:
+    test = StepTest() if test is None else test
+    workers = (os.cpu_count() or 1) if workers is None else workers
+    rng = random.Random(seed)
+    names = list(ranges)
+
+    axes = [np.linspace(lo, hi, gridSize) for lo, hi in ranges.values()]
+    candidates = [
+        {n: float(v) for n, v in zip(names, values)}
+        for values in itertools.product(*axes)
+    ]
+
+    with concurrent.futures.ProcessPoolExecutor(workers) as pool:
+        results = _evaluateParallel(
+            controllerType, plant, candidates, test, pool, workers
+        )
+        best = min(results, key=lambda r: r.score)
+
+        span = {n: (hi - lo) / (gridSize - 1 or 1) for n, (lo, hi) in ranges.items()}
+        for _ in range(refineRounds):
+            candidates = []
+            for _ in range(refineSamples):
+                candidates.append(
+                    {
+                        n: min(
+                            max(
+                                best.gains[n] + rng.uniform(-span[n], span[n]),
+                                ranges[n][0],
+                            ),
+                            ranges[n][1],
+                        )
+                        for n in names
+                    }
+                )
+            results = _evaluateParallel(
+                controllerType, plant, candidates, test, pool, workers
+            )
+            best = min(results + [best], key=lambda r: r.score)
+            span = {n: s / 2 for n, s in span.items()}
+
+    return best
+
+
+# sets the gains on the named controller through its pid table, the robot picks them up in updatePIDsInNT
+def writeGains(
+    controllerType: type[PIDController], name: str, gains: dict[str, float]
+) -> None:
+    keys = {attr: key for key, attr in controllerType.NT_GAINS}
+    t = pidTable.getSubTable(name)
+    for attr, value in gains.items():
+        t.putNumber(keys[attr], value)
+
+
+# polls until inst connects to a server, returns whether it did within timeout seconds
+def waitForConnection(inst: NetworkTableInstance, timeout: float) -> bool:
+    deadline = time.monotonic() + timeout
+    while not inst.isConnected():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.05)
+    return True
+
+
+CONTROLLER_TYPES: dict[str, type[PIDController]] = {
+    "pid": PIDController,
+    "arm": PIDControllerForArm,
+    "cam": PIDControllerForCam,
+}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="tune a PID controller in simulation")
+    parser.add_argument("type", choices=CONTROLLER_TYPES)
+    parser.add_argument("mechanism", choices=[m.name for m in MECHANISMS])
+    parser.add_argument("--kp", type=float, nargs=2, default=(0, 20))
+    parser.add_argument("--ki", type=float, nargs=2, default=(0, 5))
+    parser.add_argument("--kd", type=float, nargs=2, default=(0, 1))
+    parser.add_argument("--kg", type=float, nargs=2)
+    parser.add_argument("--ks", type=float, nargs=2)
+    parser.add_argument("--gravity", type=float, default=0)
+    parser.add_argument("--static-friction", type=float, default=0)
+    parser.add_argument("--workers", type=int)
+    parser.add_argument("--grid", type=int, default=5)
+    parser.add_argument(
+        "--write", metavar="NAME", help="write the result to this controller over NT"
+    )
+    parser.add_argument("--team", type=int, default=4536)
+    parser.add_argument(
+        "--server", help="connect to this address instead of the team's robot"
+    )
+    parser.add_argument("--port", type=int, default=0, help="with --server")
+    parser.add_argument(
+        "--timeout", type=float, default=10, help="seconds to wait for the robot"
+    )
+    args = parser.parse_args()
+
+    controllerType = CONTROLLER_TYPES[args.type]
+    plant = Plant(
+        MECHANISMS[MECHANISM_INDEX[args.mechanism]],
+        args.gravity,
+        args.static_friction,
+    )
+    ranges = {"kp": args.kp, "ki": args.ki, "kd": args.kd}
+    # the integral is clamped to the zone, without one the ki search does nothing
+    ranges["integralZone"] = (0, BATTERY_VOLTAGE)
+    if args.kg is not None:
+        ranges["kg"] = args.kg
+    if args.ks is not None:
+        ranges["ks"] = args.ks
+
+    best = tune(controllerType, plant, ranges, gridSize=args.grid, workers=args.workers)
+    print(best)
+
+    if args.write is not None:
+        inst = NetworkTableInstance.getDefault()
+        inst.startClient4("pidTuner")
+        if args.server is not None:
+            inst.setServer(args.server, args.port)
+        else:
+            inst.setServerTeam(args.team)
+        if not waitForConnection(inst, args.timeout):
+            inst.stopClient()
+            print(
+                f"no connection to the robot after {args.timeout} s, gains not written"
+            )
+            sys.exit(1)
+        writeGains(controllerType, args.write, best.gains)
+        # flush only queues the values, the client has to stay up until they're sent
+        inst.flush()
+        time.sleep(WRITE_LINGER)
+        connected = inst.isConnected()
+        inst.stopClient()
+        if not connected:
+            print("lost the connection to the robot while writing the gains")
+            sys.exit(1)
+        print(f"wrote the gains to {args.write}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,15 +1,201 @@
-import wpilib
-from ntcore import NetworkTableInstance
+import functools
+import time
+from typing import Callable, TypeVar
+
+import numpy as np
+from ntcore import DoubleArrayPublisher, NetworkTableInstance
+from timing import LOOP_PERIOD
+
+# how often section statistics are sent to NT
+PUBLISH_PERIOD: float = 1.0
+# samples kept per section for the percentiles
+HISTORY_SIZE: int = 256
+
+# monotonic clock in seconds, swap with setClock for simulated time
+clock: Callable[[], float] = time.perf_counter
+
+
+# one named profiling section, timed with "with profiler.scope(name):"
+# keeps the last HISTORY_SIZE durations in a ring buffer
+class Section:
+    # order of the values in each section's published array
+    STAT_NAMES: tuple[str, ...] = (
+        "min",
+        "mean",
+        "p50",
+        "p95",
+        "p99",
+        "max",
+        "count",
+        "overruns",
+    )
+
+    def __init__(self, path: str, size: int = HISTORY_SIZE) -> None:
+        self.path = path
+        self.samples: list[float] = [0.0] * size
+        self.index: int = 0
+        self.count: int = 0
+        # loops over LOOP_PERIOD that were blamed on this section, see endLoop
+        self.overruns: int = 0
+        self.lastLoop: int = -1
+        # time spent in this section during loop lastLoop
+        self.loopTime: float = 0
+        self.children: dict[str, "Section"] = {}
+        self.publisher: DoubleArrayPublisher | None = None
+
+    def add(self, duration: float) -> None:
+        self.samples[self.index] = duration
+        self.index += 1
+        if self.index == len(self.samples):
+            self.index = 0
+        self.count += 1
+        if self.lastLoop != loopCount:
+            self.lastLoop = loopCount
+            self.loopTime = 0
+        self.loopTime += duration
+
+    # min, mean, p50, p95, p99, max in seconds over the buffered samples, then count and overruns
+    def stats(self) -> list[float]:
+        n = min(self.count, len(self.samples))
+        if n == 0:
+            return [0.0] * 6 + [0.0, float(self.overruns)]
+        s = np.array(self.samples[:n])
+        p50, p95, p99 = np.percentile(s, (50, 95, 99))
+        return [
+            float(s.min()),
+            float(s.mean()),
+            float(p50),
+            float(p95),
+            float(p99),
+            float(s.max()),
+            float(self.count),
+            float(self.overruns),
+        ]
+
+    def __enter__(self) -> "Section":
+        _stack.append(self)
+        _starts.append(clock())
+        return self
+
+    def __exit__(self, *args) -> None:
+        duration = clock() - _starts.pop()
+        _stack.pop()
+        self.add(duration)
+        if len(_stack) == 1:
+            global loopTime
+            loopTime += duration
+
+
+_root = Section("")
+_stack: list[Section] = [_root]
+_starts: list[float] = []
+sections: dict[str, Section] = {}
+
+loopCount: int = 0
+# time spent in top level sections during the current loop
+loopTime: float = 0
+loopOverruns: int = 0
+_nextPublishTime: float = 0
 
 startTime: float = 0
 
 
+# returns the section for name nested under whatever section is currently open
+# sections are created once and reused, so this is a dict lookup on every call after the first
+def scope(name: str) -> Section:
+    parent = _stack[-1]
+    s = parent.children.get(name)
+    if s is None:
+        path = name if parent is _root else parent.path + "/" + name
+        s = Section(path)
+        parent.children[name] = s
+        sections[path] = s
+    return s
+
+
+F = TypeVar("F", bound=Callable)
+
+
+# decorator that times every call of the function as a section, named after the function by default
+def profiled(name: str | None = None) -> Callable[[F], F]:
+    def decorator(fn: F) -> F:
+        sectionName = fn.__name__ if name is None else name
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with scope(sectionName):
+                return fn(*args, **kwargs)
+
+        return wrapper  # type: ignore
+
+    return decorator
+
+
+def setClock(newClock: Callable[[], float]) -> None:
+    global clock
+    clock = newClock
+
+
+# charges an overrun to the child of parent that took the most time this loop, then to that child's biggest child
+# stops where the section's own code outside its children took longer than its biggest child
+def _blame(parent: Section, ownTime: float) -> None:
+    worst = None
+    childTime = 0.0
+    for s in parent.children.values():
+        if s.lastLoop == loopCount:
+            childTime += s.loopTime
+            if worst is None or s.loopTime > worst.loopTime:
+                worst = s
+    if worst is None or worst.loopTime <= ownTime - childTime:
+        return
+    worst.overruns += 1
+    _blame(worst, worst.loopTime)
+
+
+# call once at the end of every robot loop
+# an overrun is counted against the sections that used up the loop, not everything that happened to run in it
+def endLoop() -> None:
+    global loopCount, loopTime, loopOverruns
+    if loopTime > LOOP_PERIOD:
+        loopOverruns += 1
+        _blame(_root, 0)
+    loopTime = 0
+    loopCount += 1
+
+
+# sends every section's stats as one array per section, at most once per PUBLISH_PERIOD
+def publish(force: bool = False) -> None:
+    global _nextPublishTime
+    now = clock()
+    if not force and now < _nextPublishTime:
+        return
+    _nextPublishTime = now + PUBLISH_PERIOD
+
+    table = NetworkTableInstance.getDefault().getTable("profiling")
+    for s in sections.values():
+        if s.publisher is None:
+            s.publisher = table.getDoubleArrayTopic(s.path).publish()
+        s.publisher.set(s.stats())
+    table.putNumber("loopOverruns", loopOverruns)
+
+
+def reset() -> None:
+    global loopCount, loopTime, loopOverruns, _nextPublishTime
+    _root.children.clear()
+    sections.clear()
+    del _stack[1:]
+    _starts.clear()
+    loopCount = 0
+    loopTime = 0
+    loopOverruns = 0
+    _nextPublishTime = 0
+
+
+# the original flat profiling calls, end records the time since start as a section
 def start():
     global startTime
-    startTime = wpilib.getTime()
+    startTime = clock()
 
 
 def end(title: str):
-    NetworkTableInstance.getDefault().getTable("profiling").putNumber(
-        title, wpilib.getTime() - startTime
-    )
+    scope(title).add(clock() - startTime)
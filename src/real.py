@@ -2,6 +2,10 @@ from __future__ import annotations
 
 import math
 
+import numpy as np
+
+TAU = math.pi * 2
+
 
 def lerp(a: float, b: float, t: float) -> float:
     return a + (b - a) * t
@@ -11,15 +15,56 @@ def invLerp(a, b, pt):
     return (pt - a) / (b - a)
 
 
-# CLEANUP: this
-# returns input angle between -180 and 180
+# returns input angle between -pi and pi
+# remainder is exact and takes the same time no matter how many turns the gyro has accumulated
 def angleWrap(a: float) -> float:
-    while a > math.pi:
-        a -= math.pi * 2
-    while a < -math.pi:
-        a += math.pi * 2
-    return a
+    return math.remainder(a, TAU)
+
+
+# shortest signed angle from b to a, between -pi and pi
+def angleDiff(a: float, b: float) -> float:
+    return math.remainder(a - b, TAU)
 
 
 def signum(x: float) -> float:
     return float((x > 0) - (x < 0))
+
+
+def clamp(x: float, lo: float, hi: float) -> float:
+    return min(max(x, lo), hi)
+
+
+# array versions of the helpers above, elementwise with no python loop
+# the ones that take out write into it instead of allocating, so they can run every tick
+
+
+def lerpArray(a, b, t) -> np.ndarray:
+    a = np.asarray(a, dtype=float)
+    return a + (np.asarray(b) - a) * t
+
+
+def invLerpArray(a, b, pt) -> np.ndarray:
+    a = np.asarray(a, dtype=float)
+    return (np.asarray(pt) - a) / (np.asarray(b) - a)
+
+
+# between -pi and pi, like angleWrap except an odd multiple of pi can land on either end
+def angleWrapArray(a, out: np.ndarray | None = None) -> np.ndarray:
+    out = np.add(a, math.pi, out=out)
+    np.remainder(out, TAU, out=out)
+    out -= math.pi
+    return out
+
+
+def angleDiffArray(a, b, out: np.ndarray | None = None) -> np.ndarray:
+    return angleWrapArray(np.subtract(a, b, out=out), out=out)
+
+
+def signumArray(x, out: np.ndarray | None = None) -> np.ndarray:
+    return np.sign(x, out=out)
+
+
+# minimum then maximum, np.clip has a lot of overhead on small arrays
+def clampArray(x, lo, hi, out: np.ndarray | None = None) -> np.ndarray:
+    out = np.minimum(x, hi, out=out)
+    return np.maximum(out, lo, out=out)
@@ -1,42 +1,42 @@
 import math
 
+import gcControl
+import matchLog
 import profiler
 import robotHAL
+import timing
 import wpilib
+from drive import Drive
+from flywheel import FlywheelEstimator
+from inputs import RobotInputs
+from limelight import Limelight
 from ntcore import NetworkTableInstance
-from pathplannerlib.controller import PIDConstants, PPHolonomicDriveController
 from PIDController import PIDController, PIDControllerForArm, updatePIDsInNT
 from real import angleWrap, lerp
+from scheduler import PRIORITY_LOW, Scheduler
 from simHAL import RobotSimHAL
+from simPhysics import MECHANISM_INDEX, MECHANISMS
 from timing import TimeData
-from utils import CircularScalar, Scalar
 from wpimath.geometry import Pose2d, Rotation2d, Translation2d
-from wpimath.kinematics import ChassisSpeeds, SwerveModulePosition
 
+# write a match log of every loop to the rio, see matchLog.py for replaying one
+RECORD_MATCHES = True
+# read the gyro and encoders on a background thread instead of inside the loop
+BACKGROUND_SENSORS = False
 
-class RobotInputs:
-    def __init__(self) -> None:
-        self.driveCtrlr = wpilib.XboxController(0)
-        self.armCtrlr = wpilib.XboxController(1)
-        self.buttonPanel = wpilib.Joystick(4)
 
-        self.driveScalar = CircularScalar(0.06, 1)
-        self.turningScalar = CircularScalar(0.1, 1)
-        self.manualAimScalar = Scalar(deadZone=0.1)
-
-        self.driveX: float = 0.0
-        self.driveY: float = 0.0
-        self.turningX: float = 0.0
-        self.turningY: float = 0.0
-        self.speedCtrl: float = 0.0
-        self.gyroReset: bool = False
-        self.absToggle: bool = False
-
-    def update(self) -> None:
-        pass
+class Robot(wpilib.TimedRobot):
+    def __init__(self, period: float = timing.LOOP_PERIOD) -> None:
+        super().__init__(period)
+        # TimedRobot's loops and addPeriodic callbacks are on a grid that starts here
+        self.loopStartTime = timing.now()
+        self.competitionLoop: bool = False
 
+    # only the real loop runs the scheduled tasks from addPeriodic, SimMatch and loopBench call runDue themselves
+    def startCompetition(self) -> None:
+        self.competitionLoop = True
+        super().startCompetition()
 
-class Robot(wpilib.TimedRobot):
     def robotInit(self) -> None:
         self.time = TimeData(None)
         self.hal = robotHAL.RobotHALBuffer()
@@ -44,14 +44,18 @@ class Robot(wpilib.TimedRobot):
         if self.isSimulation():
             self.hardware = RobotSimHAL()
         else:
-            self.hardware = robotHAL.RobotHAL()
+            self.hardware = robotHAL.RobotHAL(sampleInBackground=BACKGROUND_SENSORS)
         self.hardware.update(self.hal, self.time)
 
         self.table = NetworkTableInstance.getDefault().getTable("telemetry")
 
+        # the log is started once the DS connects, so power-ons in the pit don't fill the disk
+        self.recorder: matchLog.MatchRecorder | None = None
+        self.recordMatch: bool = RECORD_MATCHES and not self.isSimulation()
+
         self.input = RobotInputs()
 
-        self.drive = None
+        self.drive = Drive()
 
         self.driveGyroYawOffset = (
             0.0  # the last angle that drivers reset the field oriented drive to zero at
@@ -68,23 +72,149 @@ class Robot(wpilib.TimedRobot):
 
         self.ang = 0
 
-        self.frontLimelightTable = NetworkTableInstance.getDefault().getTable(
-            "limelight-front"
+        self.shooterTop = FlywheelEstimator(
+            MECHANISMS[MECHANISM_INDEX["shooterTopMotor"]]
         )
+        self.shooterBottom = FlywheelEstimator(
+            MECHANISMS[MECHANISM_INDEX["shooterBottomMotor"]]
+        )
+        # the commands sent last loop, what the flywheels were driven with until this loop's went out
+        self.shooterTopPrevVolts: float = 0.0
+        self.shooterBottomPrevVolts: float = 0.0
+        self.shooterTable = NetworkTableInstance.getDefault().getTable("shooter")
+
+        self.frontLimelight = Limelight("limelight-front")
+        self.visionTable = NetworkTableInstance.getDefault().getTable("vision")
         self.robotPoseTable = NetworkTableInstance.getDefault().getTable("robot pose")
 
-    def robotPeriodic(self) -> None:
-        profiler.start()
+        # work that doesn't need to run every loop, offset so the tasks land in different slots
+        # all of it is low priority and waits when the next loop is close
+        # the scheduler owns these rates, so the publishers are called with no rate limit of their own
+        self.scheduler = Scheduler(self.loopStartTime, self.getPeriod())
+        self.scheduler.add(
+            "halTelemetry",
+            lambda: self.hal.publish(self.table, period=0),
+            0.1,
+            offset=0.005,
+            priority=PRIORITY_LOW,
+            budget=0.002,
+        )
+        self.scheduler.add(
+            "shooterTelemetry",
+            self.publishShooter,
+            0.05,
+            offset=0.0075,
+            priority=PRIORITY_LOW,
+            budget=0.001,
+        )
+        self.scheduler.add(
+            "visionTelemetry",
+            lambda: self.frontLimelight.publish(self.visionTable),
+            0.5,
+            offset=0.0025,
+            priority=PRIORITY_LOW,
+            budget=0.001,
+        )
+        self.scheduler.add(
+            "pidGains",
+            updatePIDsInNT,
+            0.2,
+            offset=0.01,
+            priority=PRIORITY_LOW,
+            budget=0.002,
+        )
+        self.scheduler.add(
+            "profiler",
+            lambda: profiler.publish(force=True),
+            profiler.PUBLISH_PERIOD,
+            offset=0.015,
+            priority=PRIORITY_LOW,
+            budget=0.003,
+        )
+        # right after the main loop, deferred when the loop left too little time before the next one
+        self.scheduler.add(
+            "gc",
+            gcControl.collectStep,
+            self.getPeriod(),
+            priority=PRIORITY_LOW,
+            budget=0.001,
+        )
+        self.scheduler.add(
+            "gcTelemetry",
+            gcControl.publish,
+            1.0,
+            offset=0.0125,
+            priority=PRIORITY_LOW,
+        )
+        if self.competitionLoop:
+            self.scheduler.attach(self)
 
-        self.time = TimeData(self.time)
+        # everything built so far lives for the whole match, the collector never needs to look at it again
+        gcControl.freeze()
 
-        self.hal.publish(self.table)
+    def robotPeriodic(self) -> None:
+        with profiler.scope("robotPeriodic"):
+            self.time.update()
+
+            # the hardware was updated by the mode periodic, which runs before this
+            self.drive.updateOdom(self.hal, self.time.prevTime)
+            # the angles moved under last loop's commands, this loop's were only just sent
+            self.shooterTop.update(
+                self.hal.shooterTopMotorAngle,
+                self.shooterTopPrevVolts,
+                self.time.dt,
+            )
+            self.shooterBottom.update(
+                self.hal.shooterBottomMotorAngle,
+                self.shooterBottomPrevVolts,
+                self.time.dt,
+            )
+            self.shooterTopPrevVolts = self.hal.shooterTopMotorVolts
+            self.shooterBottomPrevVolts = self.hal.shooterBottomMotorVolts
+            self.updateVision()
+            self.odomField.setRobotPose(
+                Pose2d(self.drive.x, self.drive.y, Rotation2d(self.drive.heading))
+            )
+
+            if self.recorder is None and self.recordMatch:
+                self.startRecording()
+            if self.recorder is not None:
+                self.recorder.record(
+                    matchLog.currentMode(), self.time, self.hal, self.input
+                )
+
+        # robotPeriodic runs after the mode periodic, so this closes out the whole loop
+        profiler.endLoop()
+
+    def startRecording(self) -> None:
+        if not wpilib.DriverStation.isDSAttached():
+            return
+        # one attempt, a rio that can't write its logs shouldn't retry every loop
+        self.recordMatch = False
+        try:
+            self.recorder = matchLog.MatchRecorder(matchLog.newLogPath())
+        except OSError as e:
+            wpilib.reportWarning(f"match logging disabled: {e}")
+
+    def publishShooter(self) -> None:
+        for est in (self.shooterTop, self.shooterBottom):
+            self.shooterTable.putNumber(est.name + "Velocity", est.velocity)
+            self.shooterTable.putNumber(est.name + "Acceleration", est.acceleration)
+            self.shooterTable.putNumber(
+                est.name + "AtSpeedConfidence", est.atSpeedConfidence
+            )
+        self.shooterTable.putBoolean(
+            "atSpeed", self.shooterTop.atSpeed and self.shooterBottom.atSpeed
+        )
 
-        updatePIDsInNT()
+    def updateVision(self) -> None:
+        for f in self.frontLimelight.poll(self.time.prevTime):
+            self.drive.addVisionMeasurement(f.x, f.y, f.heading, f.timestamp)
 
     def teleopInit(self) -> None:
-        pass
+        gcControl.setEnabled(True)
 
+    @profiler.profiled()
     def teleopPeriodic(self) -> None:
         self.input.update()
         self.hal.stopMotors()
@@ -100,22 +230,29 @@ class Robot(wpilib.TimedRobot):
             self.input.turningY, self.input.turningX
         )  # for pid only
 
-        self.hardware.update(self.hal, self.time)
+        with profiler.scope("hardware.update"):
+            self.hardware.update(self.hal, self.time)
 
     def autonomousInit(self) -> None:
+        gcControl.setEnabled(True)
         # when simulating, initalize sim to have a preloaded ring
         if isinstance(self.hardware, RobotSimHAL):
 
             pass
 
+    @profiler.profiled()
     def autonomousPeriodic(self) -> None:
         self.hal.stopMotors()
-        self.hardware.update(self.hal, self.time)
+        with profiler.scope("hardware.update"):
+            self.hardware.update(self.hal, self.time)
 
     def disabledInit(self) -> None:
+        gcControl.setEnabled(False)
         self.disabledPeriodic()
 
+    @profiler.profiled()
     def disabledPeriodic(self) -> None:
         self.hal.stopMotors()
 
-        self.hardware.update(self.hal, self.time)
+        with profiler.scope("hardware.update"):
+            self.hardware.update(self.hal, self.time)
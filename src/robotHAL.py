@@ -1,17 +1,45 @@
-import copy
 import math
+import threading
+import time as _time
+from typing import Callable
 
 import navx
 import ntcore
+import numpy as np
 import profiler
 import rev
+import timing
 import wpilib
-from phoenix5.led import CANdle
-from phoenix6.hardware import CANcoder
 from timing import TimeData
 
+# default rate limit for RobotHALBuffer.publish
+TELEMETRY_PERIOD: float = 0.1
+
 
 class RobotHALBuffer:
+    # fixed layout so a snapshot can be copied field by field instead of going through deepcopy
+    __slots__ = (
+        "leftDriveVolts",
+        "rightDriveVolts",
+        "leftDrivePositions",
+        "rightDrivePositions",
+        "leftDriveSpeedMeasured",
+        "rightDriveSpeedMeasured",
+        "intakePivotVolts",
+        "intakePivotAngle",
+        "intakeFeedVolts",
+        "intakeFeedAngle",
+        "shooterFeedVolts",
+        "shooterFeedAngle",
+        "shooterAimVolts",
+        "shooterAimAngle",
+        "shooterTopMotorVolts",
+        "shooterTopMotorAngle",
+        "shooterBottomMotorVolts",
+        "shooterBottomMotorAngle",
+        "yaw",
+    )
+
     def __init__(self) -> None:
         self.leftDriveVolts: list[float] = [0, 0]
         self.rightDriveVolts: list[float] = [0, 0]
@@ -41,8 +69,10 @@ class RobotHALBuffer:
         self.yaw: float = 0
 
     def stopMotors(self) -> None:
-        self.leftDriveVolts = [0, 0]
-        self.rightDriveVolts = [0, 0]
+        self.leftDriveVolts[0] = 0
+        self.leftDriveVolts[1] = 0
+        self.rightDriveVolts[0] = 0
+        self.rightDriveVolts[1] = 0
 
         self.intakePivotVolts = 0
         self.intakeFeedVolts = 0
@@ -51,8 +81,306 @@ class RobotHALBuffer:
         self.shooterTopMotorVolts = 0
         self.shooterBottomMotorVolts = 0
 
-    def publish(self, table: ntcore.NetworkTable) -> None:
-        pass
+    # copies every field of other into this buffer without allocating
+    # list fields are written in place so references held elsewhere stay valid
+    def copyFrom(self, other: "RobotHALBuffer") -> None:
+        self.leftDriveVolts[:] = other.leftDriveVolts
+        self.rightDriveVolts[:] = other.rightDriveVolts
+        self.leftDrivePositions[:] = other.leftDrivePositions
+        self.rightDrivePositions[:] = other.rightDrivePositions
+        self.leftDriveSpeedMeasured[:] = other.leftDriveSpeedMeasured
+        self.rightDriveSpeedMeasured[:] = other.rightDriveSpeedMeasured
+
+        self.intakePivotVolts = other.intakePivotVolts
+        self.intakePivotAngle = other.intakePivotAngle
+        self.intakeFeedVolts = other.intakeFeedVolts
+        self.intakeFeedAngle = other.intakeFeedAngle
+        self.shooterFeedVolts = other.shooterFeedVolts
+        self.shooterFeedAngle = other.shooterFeedAngle
+        self.shooterAimVolts = other.shooterAimVolts
+        self.shooterAimAngle = other.shooterAimAngle
+        self.shooterTopMotorVolts = other.shooterTopMotorVolts
+        self.shooterTopMotorAngle = other.shooterTopMotorAngle
+        self.shooterBottomMotorVolts = other.shooterBottomMotorVolts
+        self.shooterBottomMotorAngle = other.shooterBottomMotorAngle
+
+        self.yaw = other.yaw
+
+    # sends the buffer as telemetry, rate limited to period and only sending values that changed
+    # pass period=0 when the caller already runs this at its own rate
+    def publish(
+        self,
+        table: ntcore.NetworkTable,
+        now: float | None = None,
+        period: float = TELEMETRY_PERIOD,
+    ) -> None:
+        path = table.getPath()
+        publisher = _halPublishers.get(path)
+        if publisher is None:
+            publisher = RobotHALBufferPublisher(table, period)
+            _halPublishers[path] = publisher
+        publisher.period = period
+        publisher.publish(self, timing.now() if now is None else now)
+
+
+# previous/current snapshots for a HAL, two preallocated buffers trade places every tick
+class RobotHALBufferPair:
+    def __init__(self) -> None:
+        self.prev: RobotHALBuffer = RobotHALBuffer()
+        self._back: RobotHALBuffer = RobotHALBuffer()
+
+    # stores a snapshot of buf as the new prev and returns the one it replaced
+    # the returned buffer is only valid until the next call
+    def swap(self, buf: RobotHALBuffer) -> RobotHALBuffer:
+        older = self.prev
+        self.prev = self._back
+        self._back = older
+        self.prev.copyFrom(buf)
+        return older
+
+
+# publishes a RobotHALBuffer through typed publishers that are created once
+# each value is only sent when it moved more than its epsilon from the last value sent
+class RobotHALBufferPublisher:
+    # topic name, buffer list fields joined into one array, epsilon
+    ARRAY_GROUPS: tuple[tuple[str, tuple[str, ...], float], ...] = (
+        ("driveVolts", ("leftDriveVolts", "rightDriveVolts"), 0.01),
+        ("drivePositions", ("leftDrivePositions", "rightDrivePositions"), 0.001),
+        ("driveSpeeds", ("leftDriveSpeedMeasured", "rightDriveSpeedMeasured"), 0.001),
+    )
+    # buffer scalar field (also the topic name), epsilon
+    SCALARS: tuple[tuple[str, float], ...] = (
+        ("intakePivotVolts", 0.01),
+        ("intakePivotAngle", 0.001),
+        ("intakeFeedVolts", 0.01),
+        ("intakeFeedAngle", 0.01),
+        ("shooterFeedVolts", 0.01),
+        ("shooterFeedAngle", 0.01),
+        ("shooterAimVolts", 0.01),
+        ("shooterAimAngle", 0.001),
+        ("shooterTopMotorVolts", 0.01),
+        ("shooterTopMotorAngle", 0.01),
+        ("shooterBottomMotorVolts", 0.01),
+        ("shooterBottomMotorAngle", 0.01),
+        ("yaw", 0.001),
+    )
+
+    def __init__(self, table: ntcore.NetworkTable, period: float = 0) -> None:
+        self.period = period
+        self.nextPublishTime: float = 0
+        self.valuesSent: int = 0
+        self.valuesSkipped: int = 0
+
+        self.arrayPublishers: list[ntcore.DoubleArrayPublisher] = [
+            table.getDoubleArrayTopic(name).publish()
+            for name, _, _ in self.ARRAY_GROUPS
+        ]
+        # NaN never compares as within epsilon, so the first publish always sends everything
+        self.arrayLastSent: list[list[float]] = [
+            [math.nan] * (2 * len(fields)) for _, fields, _ in self.ARRAY_GROUPS
+        ]
+        self.arrayValues: list[list[float]] = [
+            [0.0] * (2 * len(fields)) for _, fields, _ in self.ARRAY_GROUPS
+        ]
+
+        self.scalarPublishers: list[ntcore.DoublePublisher] = [
+            table.getDoubleTopic(name).publish() for name, _ in self.SCALARS
+        ]
+        self.scalarLastSent: list[float] = [math.nan] * len(self.SCALARS)
+
+    def publish(self, buf: RobotHALBuffer, now: float) -> None:
+        if now < self.nextPublishTime:
+            return
+        self.nextPublishTime = now + self.period
+
+        for i, (_, fields, epsilon) in enumerate(self.ARRAY_GROUPS):
+            values = self.arrayValues[i]
+            last = self.arrayLastSent[i]
+            j = 0
+            for field in fields:
+                for v in getattr(buf, field):
+                    values[j] = v
+                    j += 1
+
+            changed = False
+            for v, l in zip(values, last):
+                if not abs(v - l) <= epsilon:
+                    changed = True
+                    break
+            if changed:
+                self.arrayPublishers[i].set(values)
+                last[:] = values
+                self.valuesSent += 1
+            else:
+                self.valuesSkipped += 1
+
+        last = self.scalarLastSent
+        for i, (field, epsilon) in enumerate(self.SCALARS):
+            v = getattr(buf, field)
+            if not abs(v - last[i]) <= epsilon:
+                self.scalarPublishers[i].set(v)
+                last[i] = v
+                self.valuesSent += 1
+            else:
+                self.valuesSkipped += 1
+
+
+_halPublishers: dict[str, RobotHALBufferPublisher] = {}
+
+# commands within this of the last one sent to a controller are not sent again, duty cycle or volts
+OUTPUT_TOLERANCE: float = 0.001
+# every controller gets a frame at least this often, well inside the 0.1 s motor safety timeout
+OUTPUT_REFRESH_PERIOD: float = 0.05
+
+
+# remembers the last command sent to each motor controller so repeated commands don't cost a CAN frame
+class MotorOutputCache:
+    def __init__(
+        self,
+        count: int,
+        tolerance: float = OUTPUT_TOLERANCE,
+        refreshPeriod: float = OUTPUT_REFRESH_PERIOD,
+    ) -> None:
+        self.tolerance = tolerance
+        self.refreshPeriod = refreshPeriod
+        # NaN is never within tolerance, so the first command always goes out
+        self.lastSent: list[float] = [math.nan] * count
+        self.lastSentTime: list[float] = [-math.inf] * count
+        self.framesSent: int = 0
+        self.framesSuppressed: int = 0
+        self.nextPublishTime: float = 0
+
+    # True if value should be written to device i, and records it as sent
+    def shouldSend(self, i: int, value: float, now: float) -> bool:
+        last = self.lastSent[i]
+        # a stop always goes out exactly, instead of leaving a tiny command running until the refresh
+        if (
+            abs(value - last) <= self.tolerance
+            and (value != 0 or last == 0)
+            and now - self.lastSentTime[i] < self.refreshPeriod
+        ):
+            self.framesSuppressed += 1
+            return False
+        self.lastSent[i] = value
+        self.lastSentTime[i] = now
+        self.framesSent += 1
+        return True
+
+    # forgets what was sent, the next command to every device goes out
+    def invalidate(self) -> None:
+        for i in range(len(self.lastSent)):
+            self.lastSent[i] = math.nan
+
+    def publish(self, table: ntcore.NetworkTable, now: float) -> None:
+        if now < self.nextPublishTime:
+            return
+        self.nextPublishTime = now + TELEMETRY_PERIOD
+        table.putNumber("framesSent", self.framesSent)
+        table.putNumber("framesSuppressed", self.framesSuppressed)
+
+
+# how often the sensor thread samples when RobotHAL runs one
+SAMPLE_PERIOD: float = 0.005
+
+
+# samples a set of sensors on its own thread so blocking reads stay out of the robot loop
+# the latest sample of every sensor and when it was taken are kept behind a lock
+class SensorSampler:
+    def __init__(
+        self,
+        readers: list[Callable[[], float]],
+        period: float = SAMPLE_PERIOD,
+        clock: Callable[[], float] | None = None,
+    ) -> None:
+        self.readers = readers
+        self.period = period
+        # must be the same time base as the TimeData the ages are measured against
+        self.clock: Callable[[], float] = (
+            timing.defaultTimeSource if clock is None else clock
+        )
+        n = len(readers)
+        self.lock = threading.Lock()
+        # shared latest sample, only touched with the lock held
+        self.values: list[float] = [0.0] * n
+        self.times: list[float] = [-math.inf] * n
+        # the sampling thread's working copy
+        self._values: list[float] = [0.0] * n
+        self._times: list[float] = [-math.inf] * n
+        self.samples: int = 0
+        # reads that raised, the sensor keeps its last value and its age keeps growing
+        self.errors: int = 0
+
+        self._stop = threading.Event()
+        self.thread = threading.Thread(
+            target=self._sampleLoop, name="sensor sampler", daemon=True
+        )
+        self.thread.start()
+
+    def sampleOnce(self) -> None:
+        values = self._values
+        times = self._times
+        clock = self.clock
+        for i, read in enumerate(self.readers):
+            try:
+                values[i] = read()
+                times[i] = clock()
+            except Exception:
+                self.errors += 1
+        with self.lock:
+            self.values[:] = values
+            self.times[:] = times
+        self.samples += 1
+
+    # copies the latest sample into the given lists, the lock is held only for the copy
+    def copyInto(self, values: list[float], times: list[float]) -> None:
+        with self.lock:
+            values[:] = self.values
+            times[:] = self.times
+
+    def close(self) -> None:
+        self._stop.set()
+        self.thread.join()
+
+    def _sampleLoop(self) -> None:
+        while not self._stop.is_set():
+            start = _time.perf_counter()
+            self.sampleOnce()
+            self._stop.wait(max(self.period - (_time.perf_counter() - start), 0))
+
+
+# a RobotHALBuffer field, plus the element for list fields
+BufferSlot = tuple[str, int | None]
+
+
+# one motor controller and where its command and encoder readings live in RobotHALBuffer
+class MotorDevice:
+    def __init__(
+        self,
+        name: str,
+        canId: int,
+        gearing: float,
+        command: BufferSlot,
+        position: BufferSlot,
+        velocity: BufferSlot | None = None,
+        wheelRadius: float | None = None,
+        dutyCycle: bool = False,
+        motorType: rev.CANSparkMax.MotorType = rev.CANSparkMax.MotorType.kBrushless,
+    ) -> None:
+        self.name = name
+        self.canId = canId
+        self.gearing = gearing
+        self.command = command
+        self.position = position
+        self.velocity = velocity
+        # commands are -1 to 1 instead of volts
+        self.dutyCycle = dutyCycle
+        self.motorType = motorType
+        # encoder rotations to radians at the output, or meters at the wheel
+        self.positionFactor: float = (
+            math.pi * 2 / gearing * (1 if wheelRadius is None else wheelRadius)
+        )
+        # encoder rpm to radians or meters per second
+        self.velocityFactor: float = self.positionFactor / 60
 
 
 class RobotHAL:
@@ -67,72 +395,169 @@ class RobotHAL:
     SHOOTER_TOP_MOTOR_GEARING: int = 1
     SHOOTER_BOTTOM_MOTOR_GEARING: int = 1
 
-    def __init__(self) -> None:
-        self.prev: RobotHALBuffer = RobotHALBuffer()
-
-        self.leftDriveMotors: list[rev.CANSparkMax] = [
-            rev.CANSparkMax(0, rev.CANSparkMax.MotorType.kBrushless),
-            rev.CANSparkMax(1, rev.CANSparkMax.MotorType.kBrushless),
-        ]
-        self.rightDriveMotors: list[rev.CANSparkMax] = [
-            rev.CANSparkMax(2, rev.CANSparkMax.MotorType.kBrushless),
-            rev.CANSparkMax(3, rev.CANSparkMax.MotorType.kBrushless),
+    # every motor controller on the robot, adding a mechanism is one more row
+    DEVICES: tuple[MotorDevice, ...] = (
+        MotorDevice(
+            "leftDrive0",
+            0,
+            DRIVE_GEARING,
+            ("leftDriveVolts", 0),
+            ("leftDrivePositions", 0),
+            ("leftDriveSpeedMeasured", 0),
+            WHEEL_RADIUS,
+            dutyCycle=True,
+        ),
+        MotorDevice(
+            "leftDrive1",
+            1,
+            DRIVE_GEARING,
+            ("leftDriveVolts", 1),
+            ("leftDrivePositions", 1),
+            ("leftDriveSpeedMeasured", 1),
+            WHEEL_RADIUS,
+            dutyCycle=True,
+        ),
+        MotorDevice(
+            "rightDrive0",
+            2,
+            DRIVE_GEARING,
+            ("rightDriveVolts", 0),
+            ("rightDrivePositions", 0),
+            ("rightDriveSpeedMeasured", 0),
+            WHEEL_RADIUS,
+            dutyCycle=True,
+        ),
+        MotorDevice(
+            "rightDrive1",
+            3,
+            DRIVE_GEARING,
+            ("rightDriveVolts", 1),
+            ("rightDrivePositions", 1),
+            ("rightDriveSpeedMeasured", 1),
+            WHEEL_RADIUS,
+            dutyCycle=True,
+        ),
+        MotorDevice(
+            "intakePivot",
+            4,
+            INTAKE_PIVOT_GEARING,
+            ("intakePivotVolts", None),
+            ("intakePivotAngle", None),
+        ),
+        MotorDevice(
+            "intakeFeed",
+            5,
+            INTAKE_FEED_GEARING,
+            ("intakeFeedVolts", None),
+            ("intakeFeedAngle", None),
+        ),
+        MotorDevice(
+            "shooterFeed",
+            6,
+            SHOOTER_FEED_GEARING,
+            ("shooterFeedVolts", None),
+            ("shooterFeedAngle", None),
+        ),
+        MotorDevice(
+            "shooterAim",
+            7,
+            SHOOTER_AIM_GEARING,
+            ("shooterAimVolts", None),
+            ("shooterAimAngle", None),
+        ),
+        MotorDevice(
+            "shooterTopMotor",
+            8,
+            SHOOTER_TOP_MOTOR_GEARING,
+            ("shooterTopMotorVolts", None),
+            ("shooterTopMotorAngle", None),
+        ),
+        MotorDevice(
+            "shooterBottomMotor",
+            9,
+            SHOOTER_BOTTOM_MOTOR_GEARING,
+            ("shooterBottomMotorVolts", None),
+            ("shooterBottomMotorAngle", None),
+        ),
+    )
+    DEVICE_INDEX: dict[str, int] = {d.name: i for i, d in enumerate(DEVICES)}
+
+    # sampleInBackground moves every sensor read onto a SensorSampler thread
+    # update then copies the latest sample instead of waiting on the reads
+    def __init__(
+        self, sampleInBackground: bool = False, samplePeriod: float = SAMPLE_PERIOD
+    ) -> None:
+        self.history = RobotHALBufferPair()
+
+        self.motors: list[rev.CANSparkMax] = [
+            rev.CANSparkMax(d.canId, d.motorType) for d in self.DEVICES
         ]
-
-        self.leftDriveEncoders: list[rev.SparkRelativeEncoder] = [
-            x.getEncoder() for x in self.leftDriveMotors
+        self.encoders: list[rev.SparkRelativeEncoder] = [
+            m.getEncoder() for m in self.motors
         ]
-        [x.setPosition(0) for x in self.leftDriveEncoders]
-        self.rightDriveEncoders: list[rev.SparkRelativeEncoder] = [
-            x.getEncoder() for x in self.rightDriveMotors
+        for e in self.encoders:
+            e.setPosition(0)
+        self.motorWriters: list[Callable[[float], None]] = [
+            m.set if d.dutyCycle else m.setVoltage
+            for m, d in zip(self.motors, self.DEVICES)
         ]
-        [x.setPosition(0) for x in self.rightDriveEncoders]
-
-        self.intakePivot: rev.CANSparkMax = rev.CANSparkMax(
-            4, rev.CANSparkMax.MotorType.kBrushless
-        )
-        self.intakePivotEncoder: rev.SparkRelativeEncoder = (
-            self.intakePivot.getEncoder()
-        )
-        self.intakePivotEncoder.setPosition(0)
-
-        self.intakeFeed: rev.CANSparkMax = rev.CANSparkMax(
-            5, rev.CANSparkMax.MotorType.kBrushless
-        )
-        self.intakeFeedEncoder: rev.SparkRelativeEncoder = self.intakeFeed.getEncoder()
-        self.intakeFeedEncoder.setPosition(0)
 
-        self.shooterFeed: rev.CANSparkMax = rev.CANSparkMax(
-            6, rev.CANSparkMax.MotorType.kBrushless
-        )
-        self.shooterFeedEncoder: rev.SparkRelativeEncoder = (
-            self.shooterFeed.getEncoder()
-        )
-        self.shooterFeedEncoder.setPosition(0)
+        self.gyro: navx.AHRS = navx.AHRS(wpilib.SerialPort.Port.kUSB1)
 
-        self.shooterAim: rev.CANSparkMax = rev.CANSparkMax(
-            7, rev.CANSparkMax.MotorType.kBrushless
+        # one slot per controller, in DEVICES order
+        self.outputs = MotorOutputCache(len(self.DEVICES))
+        self.outputTable = ntcore.NetworkTableInstance.getDefault().getTable(
+            "canOutputs"
         )
-        self.shooterAimEncoder: rev.SparkRelativeEncoder = self.shooterAim.getEncoder()
-        self.shooterAimEncoder.setPosition(0)
 
-        self.shooterTopMotor: rev.CANSparkMax = rev.CANSparkMax(
-            8, rev.CANSparkMax.MotorType.kBrushless
-        )
-        self.shooterTopMotorEncoder: rev.SparkRelativeEncoder = (
-            self.shooterTopMotor.getEncoder()
+        # every raw sensor reading in one flat layout: encoder positions, encoder velocities, gyro
+        # with the factor that converts it and the buffer slot it goes to
+        self.sensorNames: list[str] = []
+        self.sensorReaders: list[Callable[[], float]] = []
+        factors: list[float] = []
+        self.sensorTargets: list[BufferSlot] = []
+        for d, e in zip(self.DEVICES, self.encoders):
+            self.sensorNames.append(d.name + "Position")
+            self.sensorReaders.append(e.getPosition)
+            factors.append(d.positionFactor)
+            self.sensorTargets.append(d.position)
+        for d, e in zip(self.DEVICES, self.encoders):
+            if d.velocity is not None:
+                self.sensorNames.append(d.name + "Velocity")
+                self.sensorReaders.append(e.getVelocity)
+                factors.append(d.velocityFactor)
+                self.sensorTargets.append(d.velocity)
+        # navx degrees are CW, the buffer is CCW radians
+        self.sensorNames.append("gyroAngle")
+        self.sensorReaders.append(self.gyro.getAngle)
+        factors.append(-math.pi / 180)
+        self.sensorTargets.append(("yaw", None))
+
+        n = len(self.sensorReaders)
+        self.sensorFactors: np.ndarray = np.array(factors)
+        self.sensorConverted: np.ndarray = np.zeros(n)
+        self.sensorValues: np.ndarray = np.zeros(n)
+        # scalar fields are set one by one, runs of one list field are assigned as a slice
+        self._scalarTargets: list[tuple[str, int]] = []
+        self._listTargets: list[tuple[str, int, int, int]] = []
+        for i, (field, index) in enumerate(self.sensorTargets):
+            if index is None:
+                self._scalarTargets.append((field, i))
+                continue
+            if len(self._listTargets) > 0:
+                f, first, start, stop = self._listTargets[-1]
+                if f == field and stop == i and index == first + stop - start:
+                    self._listTargets[-1] = (f, first, start, i + 1)
+                    continue
+            self._listTargets.append((field, index, i, i + 1))
+        self.sensorTimes: list[float] = [0.0] * n
+        # seconds between each sensor being read and the last update, all 0 when reading synchronously
+        self.sensorAges: list[float] = [0.0] * n
+        self.sampler: SensorSampler | None = (
+            SensorSampler(self.sensorReaders, samplePeriod)
+            if sampleInBackground
+            else None
         )
-        self.shooterTopMotorEncoder.setPosition(0)
-
-        self.shooterBottomMotor: rev.CANSparkMax = rev.CANSparkMax(
-            9, rev.CANSparkMax.MotorType.kBrushless
-        )
-        self.shooterBottomMotorEncoder: rev.SparkRelativeEncoder = (
-            self.shooterBottomMotor.getEncoder()
-        )
-        self.shooterBottomMotorEncoder.setPosition(0)
-
-        self.gyro: navx.AHRS = navx.AHRS(wpilib.SerialPort.Port.kUSB1)
 
     # angle expected in CCW radians
     def resetGyroToAngle(self, angleRads: float) -> None:
@@ -140,84 +565,50 @@ class RobotHAL:
         self.gyro.setAngleAdjustment(-math.degrees(angleRads))
 
     def update(self, buf: RobotHALBuffer, time: TimeData) -> None:
-        prev = self.prev
-        self.prev = copy.deepcopy(buf)
-
-        for m, s in zip(self.leftDriveMotors, buf.leftDriveVolts):
-            m.set(s)
-
-        for m, s in zip(self.rightDriveMotors, buf.rightDriveVolts):
-            m.set(s)
-
-        for i in range(2):
-            e = self.leftDriveEncoders[i]
-            buf.leftDrivePositions[i] = (
-                math.radians((e.getPosition() / self.DRIVE_GEARING) * 360)
-                * self.WHEEL_RADIUS
-            )
-            buf.leftDriveSpeedMeasured[i] = (
-                math.radians((e.getVelocity() / self.DRIVE_GEARING) * 360)
-                * self.WHEEL_RADIUS
-                / 60
-            )
-
-        for i in range(2):
-            e = self.rightDriveEncoders[i]
-            buf.rightDrivePositions[i] = (
-                math.radians((e.getPosition() / self.DRIVE_GEARING) * 360)
-                * self.WHEEL_RADIUS
-            )
-            buf.rightDriveSpeedMeasured[i] = (
-                math.radians((e.getVelocity() / self.DRIVE_GEARING) * 360)
-                * self.WHEEL_RADIUS
-                / 60
-            )
-
-        self.intakePivot.setVoltage(buf.intakePivotVolts)
-        buf.intakePivotAngle = (
-            self.intakePivotEncoder.getPosition()
-            * math.pi
-            * 2
-            / self.INTAKE_PIVOT_GEARING
-        )
-
-        self.intakeFeed.setVoltage(buf.intakeFeedVolts)
-        buf.intakeFeedAngle = (
-            self.intakeFeedEncoder.getPosition()
-            * math.pi
-            * 2
-            / self.INTAKE_FEED_GEARING
-        )
-
-        self.shooterFeed.setVoltage(buf.shooterFeedVolts)
-        buf.shooterFeedAngle = (
-            self.shooterFeedEncoder.getPosition()
-            * math.pi
-            * 2
-            / self.SHOOTER_FEED_GEARING
-        )
-
-        self.shooterAim.setVoltage(buf.shooterAimVolts)
-        buf.shooterAimAngle = (
-            self.shooterAimEncoder.getPosition()
-            * math.pi
-            * 2
-            / self.SHOOTER_AIM_GEARING
-        )
-
-        self.shooterTopMotor.setVoltage(buf.shooterTopMotorVolts)
-        self.shooterBottomMotor.setVoltage(buf.shooterBottomMotorVolts)
-        buf.shooterTopMotorAngle = (
-            self.shooterTopMotorEncoder.getPosition()
-            * math.pi
-            * 2
-            / self.SHOOTER_TOP_MOTOR_GEARING
-        )
-        buf.shooterBottomMotorAngle = (
-            self.shooterBottomMotorEncoder.getPosition()
-            * math.pi
-            * 2
-            / self.SHOOTER_BOTTOM_MOTOR_GEARING
-        )
-
-        buf.yaw = math.radians(-self.gyro.getAngle())
+        prev = self.history.swap(buf)
+
+        now = time.prevTime
+        outputs = self.outputs
+        for i, d in enumerate(self.DEVICES):
+            field, index = d.command
+            value = getattr(buf, field)
+            if index is not None:
+                value = value[index]
+            if outputs.shouldSend(i, value, now):
+                self.motorWriters[i](value)
+        outputs.publish(self.outputTable, now)
+
+        self._readSensors(now)
+        self._convertSensors(buf)
+
+    # one multiply converts every raw reading, then each lands in its buffer slot
+    def _convertSensors(self, buf: RobotHALBuffer) -> None:
+        converted = np.multiply(
+            self.sensorValues, self.sensorFactors, out=self.sensorConverted
+        ).tolist()
+        for field, i in self._scalarTargets:
+            setattr(buf, field, converted[i])
+        for field, first, start, stop in self._listTargets:
+            getattr(buf, field)[first : first + stop - start] = converted[start:stop]
+
+    # fills sensorValues and sensorAges, from the sampler's latest snapshot if there is one
+    def _readSensors(self, now: float) -> None:
+        values = self.sensorValues
+        ages = self.sensorAges
+        if self.sampler is None:
+            for i, read in enumerate(self.sensorReaders):
+                values[i] = read()
+            return
+        times = self.sensorTimes
+        self.sampler.copyInto(values, times)
+        for i in range(len(times)):
+            ages[i] = now - times[i]
+
+    # seconds since the named sensor (see sensorNames) was read, as of the last update
+    def sensorAge(self, name: str) -> float:
+        return self.sensorAges[self.sensorNames.index(name)]
+
+    def close(self) -> None:
+        if self.sampler is not None:
+            self.sampler.close()
+            self.sampler = None
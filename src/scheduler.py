@@ -0,0 +1,191 @@
+import math
+import weakref
+from typing import Callable
+
+import profiler
+import timing
+import wpilib
+from ntcore import DoubleArrayPublisher, NetworkTableInstance
+
+# tasks that run at their own rates alongside the TimedRobot loop
+# on the robot attach() puts each one on its own addPeriodic callback, in sim and benchmarks call runDue after each loop
+# low priority tasks are deferred when running them now could push the next main loop late
+
+# lower numbers are more important
+PRIORITY_CONTROL: int = 0
+PRIORITY_NORMAL: int = 1
+PRIORITY_LOW: int = 2
+
+# time kept clear before the next main loop when deciding whether a low priority task fits
+DEFER_MARGIN: float = 0.002
+# a task deferred this many times in a row runs anyway, so telemetry can't starve forever
+MAX_DEFERRALS: int = 5
+# how often the utilization report goes to NT
+REPORT_PERIOD: float = 1.0
+
+
+class Task:
+    # order of the values in each task's published array
+    STAT_NAMES: tuple[str, ...] = (
+        "utilization",
+        "meanMs",
+        "maxMs",
+        "runs",
+        "deferred",
+        "overBudget",
+    )
+
+    def __init__(
+        self,
+        name: str,
+        fn: Callable[[], object],
+        period: float,
+        offset: float,
+        priority: int,
+        budget: float | None,
+    ) -> None:
+        self.name = name
+        self.fn = fn
+        self.period = period
+        # from the start of the main loop, spreads tasks with the same period over different loops
+        self.offset = offset
+        self.priority = priority
+        # expected worst case run time, runs longer than this are counted in overBudget
+        self.budget = budget
+        self.nextRun: float = 0
+
+        self.runs: int = 0
+        self.deferred: int = 0
+        self.deferredInARow: int = 0
+        self.overBudget: int = 0
+        self.totalTime: float = 0
+        self.maxTime: float = 0
+        self.publisher: DoubleArrayPublisher | None = None
+
+    # what the task is expected to take, its budget or the longest run seen so far
+    @property
+    def expectedTime(self) -> float:
+        return self.maxTime if self.budget is None else self.budget
+
+    @property
+    def meanTime(self) -> float:
+        return self.totalTime / self.runs if self.runs > 0 else 0
+
+    # fraction of its period the task spends running
+    @property
+    def utilization(self) -> float:
+        return self.meanTime / self.period
+
+    def stats(self) -> list[float]:
+        return [
+            self.utilization,
+            self.meanTime * 1000,
+            self.maxTime * 1000,
+            float(self.runs),
+            float(self.deferred),
+            float(self.overBudget),
+        ]
+
+
+class Scheduler:
+    def __init__(
+        self,
+        startTime: float,
+        loopPeriod: float = timing.LOOP_PERIOD,
+        deferMargin: float = DEFER_MARGIN,
+        deferPriority: int = PRIORITY_LOW,
+    ) -> None:
+        # main loops start at startTime plus a multiple of loopPeriod, TimedRobot's grid starts when it's constructed
+        self.startTime = startTime
+        self.loopPeriod = loopPeriod
+        self.deferMargin = deferMargin
+        # tasks at this priority or less important can be deferred
+        self.deferPriority = deferPriority
+        self.tasks: list[Task] = []
+        self.attached: bool = False
+        self.table = NetworkTableInstance.getDefault().getTable("scheduler")
+        self.add("schedulerReport", self.publish, REPORT_PERIOD, priority=PRIORITY_LOW)
+
+    def add(
+        self,
+        name: str,
+        fn: Callable[[], object],
+        period: float,
+        offset: float = 0,
+        priority: int = PRIORITY_NORMAL,
+        budget: float | None = None,
+    ) -> Task:
+        assert not self.attached, "add every task before attach"
+        task = Task(name, fn, period, offset, priority, budget)
+        task.nextRun = self.startTime + offset
+        self.tasks.append(task)
+        # most important first, that's the order runDue runs tasks that are due together
+        self.tasks.sort(key=lambda t: t.priority)
+        return task
+
+    # runs every task from its own addPeriodic callback instead of runDue, only for the real TimedRobot loop
+    # the robot keeps the callbacks alive and the tasks usually reference the robot, so the callbacks
+    # only hold a weakref and an index, anything stronger is a cycle through C++ that never gets collected
+    def attach(self, robot: wpilib.TimedRobot) -> None:
+        self.attached = True
+        ref = weakref.ref(self)
+        for i, task in enumerate(self.tasks):
+            robot.addPeriodic(_periodicCallback(ref, i), task.period, task.offset)
+
+    # seconds until the next main loop starts
+    def timeToNextLoop(self, now: float) -> float:
+        loops = math.floor((now - self.startTime) / self.loopPeriod + 1e-9) + 1
+        return self.startTime + loops * self.loopPeriod - now
+
+    def runDue(self, now: float | None = None) -> None:
+        now = timing.now() if now is None else now
+        for task in self.tasks:
+            if task.nextRun <= now + 1e-9:
+                self._run(task, now)
+
+    def _run(self, task: Task, now: float) -> None:
+        # the next run stays on the task's grid, skipping runs that were missed entirely
+        task.nextRun += task.period
+        if task.nextRun <= now:
+            task.nextRun += math.ceil((now - task.nextRun) / task.period) * task.period
+
+        if (
+            task.priority >= self.deferPriority
+            and task.deferredInARow < MAX_DEFERRALS
+            and task.expectedTime + self.deferMargin > self.timeToNextLoop(now)
+        ):
+            task.deferred += 1
+            task.deferredInARow += 1
+            return
+        task.deferredInARow = 0
+
+        start = profiler.clock()
+        task.fn()
+        duration = profiler.clock() - start
+        task.runs += 1
+        task.totalTime += duration
+        if duration > task.maxTime:
+            task.maxTime = duration
+        if task.budget is not None and duration > task.budget:
+            task.overBudget += 1
+
+    # summed utilization of every task, as a fraction of one core
+    @property
+    def utilization(self) -> float:
+        return sum(t.utilization for t in self.tasks)
+
+    def publish(self) -> None:
+        for t in self.tasks:
+            if t.publisher is None:
+                t.publisher = self.table.getDoubleArrayTopic(t.name).publish()
+            t.publisher.set(t.stats())
+        self.table.putNumber("utilization", self.utilization)
+
+
+def _periodicCallback(ref: "weakref.ref[Scheduler]", index: int) -> Callable[[], None]:
+    def callback() -> None:
+        scheduler = ref()
+        if scheduler is not None:
+            scheduler._run(scheduler.tasks[index], timing.now())
+
+    return callback
@@ -1,31 +1,68 @@
-import copy
 import math
 
 from ntcore import NetworkTableInstance
 from real import angleWrap, lerp
-from robotHAL import RobotHALBuffer
+from robotHAL import RobotHALBuffer, RobotHALBufferPair
+from simPhysics import MECHANISM_INDEX, RobotPhysics
 from timing import TimeData
 from wpimath.geometry import Rotation2d, Translation2d
 
 
 class RobotSimHAL:
-    def __init__(self):
-        self.prev = RobotHALBuffer()
-        self.drivePositions = [0.0, 0.0, 0.0, 0.0]
-        self.driveVels = [0.0, 0.0, 0.0, 0.0]
-        self.steerEncoderPositions = [0.0, 0.0, 0.0, 0.0]
-        self.steerVels = [0.0, 0.0, 0.0, 0.0]
-        self.yaw = 0.0
-
-        self.shooterAngVel = 0.0
-        self.shooterAimVel = 0.0
-        self.shooterAimPos = 0.0
+    def __init__(self, physics: RobotPhysics | None = None, index: int = 0):
+        self.history = RobotHALBufferPair()
+        # one robot out of a possibly batched physics sim, the owner of a shared sim is responsible for stepping it
+        self.ownsPhysics = physics is None
+        self.physics = RobotPhysics() if physics is None else physics
+        self.index = index
 
         self.table = NetworkTableInstance.getDefault().getTable("sim")
 
         self.ringPos = 0
         self.ringTransitionStart = -1
 
+    # angle expected in CCW radians
+    def resetGyroToAngle(self, angleRads: float) -> None:
+        self.physics.yaw[self.index] = angleRads
+
     def update(self, buf: RobotHALBuffer, time: TimeData) -> None:
-        # prev = self.prev
-        self.prev = copy.deepcopy(buf)
+        self.history.swap(buf)
+        p = self.physics
+        i = self.index
+
+        # both motors on a side share a gearbox, so the side sees their average
+        p.driveDuty[i, 0] = (buf.leftDriveVolts[0] + buf.leftDriveVolts[1]) / 2
+        p.driveDuty[i, 1] = (buf.rightDriveVolts[0] + buf.rightDriveVolts[1]) / 2
+        volts = p.mechVolts[i]
+        volts[MECHANISM_INDEX["intakePivot"]] = buf.intakePivotVolts
+        volts[MECHANISM_INDEX["intakeFeed"]] = buf.intakeFeedVolts
+        volts[MECHANISM_INDEX["shooterFeed"]] = buf.shooterFeedVolts
+        volts[MECHANISM_INDEX["shooterAim"]] = buf.shooterAimVolts
+        volts[MECHANISM_INDEX["shooterTopMotor"]] = buf.shooterTopMotorVolts
+        volts[MECHANISM_INDEX["shooterBottomMotor"]] = buf.shooterBottomMotorVolts
+
+        if self.ownsPhysics:
+            p.step(time.dt)
+
+        left = p.drivePos[i, 0].item()
+        right = p.drivePos[i, 1].item()
+        buf.leftDrivePositions[0] = left
+        buf.leftDrivePositions[1] = left
+        buf.rightDrivePositions[0] = right
+        buf.rightDrivePositions[1] = right
+        left = p.driveVel[i, 0].item()
+        right = p.driveVel[i, 1].item()
+        buf.leftDriveSpeedMeasured[0] = left
+        buf.leftDriveSpeedMeasured[1] = left
+        buf.rightDriveSpeedMeasured[0] = right
+        buf.rightDriveSpeedMeasured[1] = right
+
+        pos = p.mechPos[i]
+        buf.intakePivotAngle = pos[MECHANISM_INDEX["intakePivot"]].item()
+        buf.intakeFeedAngle = pos[MECHANISM_INDEX["intakeFeed"]].item()
+        buf.shooterFeedAngle = pos[MECHANISM_INDEX["shooterFeed"]].item()
+        buf.shooterAimAngle = pos[MECHANISM_INDEX["shooterAim"]].item()
+        buf.shooterTopMotorAngle = pos[MECHANISM_INDEX["shooterTopMotor"]].item()
+        buf.shooterBottomMotorAngle = pos[MECHANISM_INDEX["shooterBottomMotor"]].item()
+
+        buf.yaw = p.yaw[i].item()
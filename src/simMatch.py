@@ -0,0 +1,82 @@
+import random
+
+import gcControl
+import numpy as np
+import profiler
+from timing import LOOP_PERIOD, setDefaultTimeSource, SteppedClock
+
+# runs Robot through simulated matches on stepped time, no wall clock, driver station or TimedRobot loop
+# every clock the robot code reads is the same SteppedClock, so a seeded run repeats exactly
+# use as a context manager so the real clocks are put back afterwards:
+#     with SimMatch() as match:
+#         match.run("teleop", 2.0)
+
+MODES: tuple[str, ...] = ("disabled", "autonomous", "teleop")
+
+# the phases of a real match, mode and seconds
+MATCH_PHASES: tuple[tuple[str, float], ...] = (
+    ("disabled", 1.0),
+    ("autonomous", 15.0),
+    ("disabled", 0.5),
+    ("teleop", 135.0),
+    ("disabled", 1.0),
+)
+
+
+class SimMatch:
+    def __init__(self, seed: int = 4536, step: float = LOOP_PERIOD) -> None:
+        random.seed(seed)
+        np.random.seed(seed)
+        self.clock = SteppedClock(0, step)
+        setDefaultTimeSource(self.clock)
+        profiler.setClock(self.clock)
+        profiler.reset()
+
+        from robot import Robot
+
+        self.robot = Robot()
+        self.robot.robotInit()
+        self.mode: str | None = None
+        self.ticks: int = 0
+
+    def __enter__(self) -> "SimMatch":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def close(self) -> None:
+        setDefaultTimeSource(None)
+        profiler.setClock(profiler.time.perf_counter)
+        gcControl.reset()
+
+    # calls the mode's init like TimedRobot does on a transition, a mode that is already running isn't restarted
+    def setMode(self, mode: str) -> None:
+        if mode not in MODES:
+            raise ValueError(f"unknown mode {mode}")
+        if mode == self.mode:
+            return
+        if self.mode is not None:
+            getattr(self.robot, self.mode + "Exit")()
+        self.mode = mode
+        getattr(self.robot, mode + "Init")()
+
+    # one loop: advance the clock, then the mode periodic and robotPeriodic in TimedRobot's order
+    def tick(self, count: int = 1) -> None:
+        assert self.mode is not None, "setMode first"
+        periodic = getattr(self.robot, self.mode + "Periodic")
+        for _ in range(count):
+            self.clock.advance()
+            periodic()
+            self.robot.robotPeriodic()
+            # nothing runs TimedRobot's notifier here, so the scheduled tasks run once the loop is done
+            self.robot.scheduler.runDue()
+            self.ticks += 1
+
+    def run(self, mode: str, seconds: float) -> None:
+        self.setMode(mode)
+        self.tick(round(seconds / self.clock.step))
+
+    def runMatch(self, phases: tuple[tuple[str, float], ...] = MATCH_PHASES) -> None:
+        for mode, seconds in phases:
+            self.run(mode, seconds)
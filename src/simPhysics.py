@@ -0,0 +1,193 @@
+import math
+
+import numpy as np
+from real import clampArray
+from robotHAL import RobotHAL
+
+# DC motor physics for the robot's mechanisms, stepped for many independent robots at once
+# every state array has one row per simulated robot, so one step() call advances all of them
+
+BATTERY_VOLTAGE: float = 12.0
+
+
+# a DC motor described by its datasheet numbers at BATTERY_VOLTAGE
+class DCMotor:
+    def __init__(
+        self,
+        stallTorque: float,
+        stallCurrent: float,
+        freeCurrent: float,
+        freeSpeedRPM: float,
+        count: int = 1,
+    ) -> None:
+        self.count = count
+        self.resistance = BATTERY_VOLTAGE / stallCurrent
+        # torque per amp and rad/s per volt of back emf
+        self.kt = stallTorque / stallCurrent
+        self.kv = (freeSpeedRPM * math.tau / 60) / (
+            BATTERY_VOLTAGE - self.resistance * freeCurrent
+        )
+
+    # torque = count * kt / R * (V - w / kv), split into the voltage and speed terms
+    @property
+    def torquePerVolt(self) -> float:
+        return self.count * self.kt / self.resistance
+
+    @property
+    def torquePerRadPerSec(self) -> float:
+        return self.count * self.kt / (self.resistance * self.kv)
+
+
+def neo(count: int = 1) -> DCMotor:
+    return DCMotor(2.6, 105, 1.8, 5676, count)
+
+
+# a motor driving a rotating load through a gearbox, position and velocity at the output in rad and rad/s
+class Mechanism:
+    def __init__(
+        self,
+        name: str,
+        motor: DCMotor,
+        gearing: float,
+        inertia: float,
+        damping: float = 0.0,
+    ) -> None:
+        self.name = name
+        self.motor = motor
+        self.gearing = gearing
+        self.inertia = inertia
+        self.damping = damping
+
+    # dw/dt = a * V - b * w
+    @property
+    def a(self) -> float:
+        return self.gearing * self.motor.torquePerVolt / self.inertia
+
+    @property
+    def b(self) -> float:
+        return (
+            self.gearing**2 * self.motor.torquePerRadPerSec + self.damping
+        ) / self.inertia
+
+
+# order of the columns in RobotPhysics.mechPos/mechVel/mechVolts
+MECHANISMS: tuple[Mechanism, ...] = (
+    Mechanism("intakePivot", neo(), RobotHAL.INTAKE_PIVOT_GEARING, 0.05, 0.01),
+    Mechanism("intakeFeed", neo(), RobotHAL.INTAKE_FEED_GEARING, 0.0005, 0.0001),
+    Mechanism("shooterFeed", neo(), RobotHAL.SHOOTER_FEED_GEARING, 0.0005, 0.0001),
+    Mechanism("shooterAim", neo(), RobotHAL.SHOOTER_AIM_GEARING, 0.05, 0.01),
+    Mechanism(
+        "shooterTopMotor", neo(), RobotHAL.SHOOTER_TOP_MOTOR_GEARING, 0.002, 0.0001
+    ),
+    Mechanism(
+        "shooterBottomMotor",
+        neo(),
+        RobotHAL.SHOOTER_BOTTOM_MOTOR_GEARING,
+        0.002,
+        0.0001,
+    ),
+)
+MECHANISM_INDEX: dict[str, int] = {m.name: i for i, m in enumerate(MECHANISMS)}
+
+ROBOT_MASS: float = 55.0  # kg, with bumpers and battery
+TRACK_WIDTH: float = 0.55  # m between the left and right wheels
+DRIVE_MOTOR = neo(2)  # per side
+
+
+class RobotPhysics:
+    def __init__(self, count: int = 1) -> None:
+        self.count = count
+        columns = 2 + len(MECHANISMS)
+        # drive sides and mechanisms side by side so one step is a handful of whole array ops
+        # the named arrays below are views into these, write into them rather than rebinding them
+        self.pos = np.zeros((count, columns))
+        self.vel = np.zeros((count, columns))
+        self.command = np.zeros((count, columns))
+
+        # [robot, side] with side 0 left and 1 right, meters and m/s of the wheels
+        self.drivePos = self.pos[:, :2]
+        self.driveVel = self.vel[:, :2]
+        # duty cycle -1 to 1, the drive motors are driven with set() on the real robot
+        self.driveDuty = self.command[:, :2]
+        # [robot, mechanism] in the order of MECHANISMS, rad, rad/s and volts
+        self.mechPos = self.pos[:, 2:]
+        self.mechVel = self.vel[:, 2:]
+        self.mechVolts = self.command[:, 2:]
+        # acceleration from outside the motors held over each step, e.g. gravity on an arm, same units as vel per second
+        self.accel = np.zeros((count, columns))
+        self.mechAccel = self.accel[:, 2:]
+        # CCW radians
+        self.yaw = np.zeros(count)
+
+        self.time: float = 0
+
+        # a and b of dv/dt = a * V - b * v for every column
+        radius = RobotHAL.WHEEL_RADIUS
+        gearing = RobotHAL.DRIVE_GEARING
+        sideMass = ROBOT_MASS / 2
+        driveA = gearing * DRIVE_MOTOR.torquePerVolt / (radius * sideMass)
+        driveB = gearing**2 * DRIVE_MOTOR.torquePerRadPerSec / (radius**2 * sideMass)
+        self.a = np.array([driveA, driveA] + [m.a for m in MECHANISMS])
+        self.b = np.array([driveB, driveB] + [m.b for m in MECHANISMS])
+        # commands are clamped to these, then scaled to volts
+        self.commandLimit = np.array([1.0, 1.0] + [BATTERY_VOLTAGE] * len(MECHANISMS))
+        self._negCommandLimit = -self.commandLimit
+        self.voltsPerCommand = np.array(
+            [BATTERY_VOLTAGE, BATTERY_VOLTAGE] + [1.0] * len(MECHANISMS)
+        )
+
+        self._coefficientDt: float = -1
+        self._steady = np.zeros(columns)
+        self._invB = 1 / self.b
+        self._decay = np.zeros(columns)
+        self._posGain = np.zeros(columns)
+        self._u = np.zeros((count, columns))
+        self._tmp = np.zeros((count, columns))
+        self._delta = np.zeros((count, columns))
+
+    # exact solution of the linear velocity ODE over dt, so large steps stay stable
+    # the coefficients only depend on dt, so they're cached for fixed step sizes
+    def _updateCoefficients(self, dt: float) -> None:
+        self._coefficientDt = dt
+        # steady state velocity per unit of command
+        self._steady = self.voltsPerCommand * self.a / self.b
+        self._decay = np.exp(-self.b * dt)
+        self._posGain = (1 - self._decay) / self.b
+
+    def step(self, dt: float) -> None:
+        if dt <= 0:
+            return
+        if dt != self._coefficientDt:
+            self._updateCoefficients(dt)
+
+        u = clampArray(
+            self.command, self._negCommandLimit, self.commandLimit, out=self._u
+        )
+        tmp = self._tmp
+        delta = self._delta
+
+        # the velocity the command and outside acceleration would settle at, in place of the command
+        u *= self._steady
+        np.multiply(self.accel, self._invB, out=tmp)
+        u += tmp
+
+        # the position moves by the steady state distance plus whatever the velocity error decays away
+        np.subtract(self.vel, u, out=tmp)
+        tmp *= self._posGain
+        np.multiply(u, dt, out=delta)
+        delta += tmp
+        self.pos += delta
+
+        self.vel -= u
+        self.vel *= self._decay
+        self.vel += u
+
+        # yaw follows the difference in distance between the sides
+        self.yaw += (delta[:, 1] - delta[:, 0]) / TRACK_WIDTH
+        self.time += dt
+
+    # steps in fixed increments without looking at the wall clock, returns the simulated time reached
+    def run(self, seconds: float, dt: float = 0.005) -> float:
+        for _ in range(round(seconds / dt)):
+            self.step(dt)
+        return self.time
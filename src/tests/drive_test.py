@@ -0,0 +1,67 @@
+import math
+
+from drive import Drive
+from robotHAL import RobotHALBuffer
+
+
+def driveArc(
+    d: Drive, buf: RobotHALBuffer, ticks: int, t0: float, speed: float, turnRate: float
+) -> list:
+    # feeds the odometry a constant speed arc, returns the true pose at every tick
+    truth = []
+    x, y, heading = d.x, d.y, d.heading
+    for i in range(ticks):
+        t = t0 + (i + 1) * 0.02
+        dist = speed * 0.02
+        x += dist * math.cos(heading + turnRate * 0.01)
+        y += dist * math.sin(heading + turnRate * 0.01)
+        heading += turnRate * 0.02
+        for side in (buf.leftDrivePositions, buf.rightDrivePositions):
+            side[0] += dist
+            side[1] += dist
+        buf.yaw += turnRate * 0.02
+        d.updateOdom(buf, t)
+        truth.append((t, x, y, heading))
+    return truth
+
+
+def test_odometry_follows_arc():
+    d = Drive()
+    buf = RobotHALBuffer()
+    d.updateOdom(buf, 0)
+    truth = driveArc(d, buf, 60, 0, 2, 1)
+    _, x, y, heading = truth[-1]
+    assert math.isclose(d.x, x, abs_tol=1e-9)
+    assert math.isclose(d.y, y, abs_tol=1e-9)
+    assert math.isclose(d.heading, heading, abs_tol=1e-9)
+
+
+def test_late_vision_is_applied_at_capture_time():
+    d = Drive()
+    buf = RobotHALBuffer()
+    d.updateOdom(buf, 0)
+    truth = driveArc(d, buf, 50, 0, 2, 0.5)
+    # odometry thinks it started at the origin, the robot actually started a meter over
+    t, x, y, heading = truth[20]
+    assert d.addVisionMeasurement(x + 1, y, heading, t - 0.01, trust=1, headingTrust=1)
+
+    _, x, y, heading = truth[-1]
+    assert math.isclose(d.x, x + 1, abs_tol=0.02)
+    assert math.isclose(d.y, y, abs_tol=0.02)
+    past = d.poseAt(truth[30][0])
+    assert past is not None
+    assert math.isclose(past[0], truth[30][1] + 1, abs_tol=0.02)
+
+
+def test_history_is_a_ring():
+    d = Drive(historySize=10)
+    buf = RobotHALBuffer()
+    d.updateOdom(buf, 0)
+    driveArc(d, buf, 25, 0, 1, 0)
+    assert d.count == 10
+    assert d.poseAt(0.1) is None
+    assert not d.addVisionMeasurement(0, 0, 0, 0.1)
+    assert d.visionRejected == 1
+    pose = d.poseAt(0.41)
+    assert pose is not None
+    assert math.isclose(pose[0], 0.41, abs_tol=1e-9)
@@ -0,0 +1,81 @@
+import math
+
+import numpy as np
+from flywheel import FlywheelEstimator
+from simPhysics import MECHANISM_INDEX, MECHANISMS, RobotPhysics
+
+TOP = MECHANISM_INDEX["shooterTopMotor"]
+# the encoder position only moves in whole hall sensor counts
+COUNT = math.tau / 42
+DT = 0.02
+
+
+# spins the top flywheel up in the sim, takes 30% of its speed away at shotTick like a note going through
+# returns the true velocity, the estimate and a moving average of encoder deltas like the Spark's own
+def spinUp(ticks: int, volts: float, shotTick: int, est: FlywheelEstimator):
+    p = RobotPhysics()
+    true = np.zeros(ticks)
+    estimate = np.zeros(ticks)
+    averaged = np.zeros(ticks)
+    angles = [0.0] * 6
+    atSpeed = [False] * ticks
+    for k in range(ticks):
+        p.mechVolts[0, TOP] = volts
+        p.step(DT)
+        if k == shotTick:
+            p.mechVel[0, TOP] *= 0.7
+        angle = round(p.mechPos[0, TOP] / COUNT) * COUNT
+        est.update(angle, volts, DT)
+        angles = angles[1:] + [angle]
+        true[k] = p.mechVel[0, TOP]
+        estimate[k] = est.velocity
+        averaged[k] = (angles[-1] - angles[0]) / (DT * (len(angles) - 1))
+        atSpeed[k] = est.atSpeed
+    return true, estimate, averaged, atSpeed
+
+
+def test_tracks_the_simulated_flywheel():
+    m = MECHANISMS[TOP]
+    est = FlywheelEstimator(m)
+    est.target = 10 * m.a / m.b
+    true, estimate, averaged, atSpeed = spinUp(400, 10, 200, est)
+
+    spinning = slice(2, 200)
+    estError = np.sqrt(np.mean(np.square(estimate[spinning] - true[spinning])))
+    avgError = np.sqrt(np.mean(np.square(averaged[spinning] - true[spinning])))
+    assert estError < 4
+    assert estError < avgError / 2, "the estimate should lag less than the average"
+
+    # the speed dip from a shot shows up on the next tick and has settled within 120 ms
+    assert estimate[201] < true[199] - 100
+    assert np.all(np.abs(estimate[206:213] - true[206:213]) < 5)
+    shot = slice(201, 213)
+    estShotError = np.mean(np.abs(estimate[shot] - true[shot]))
+    avgShotError = np.mean(np.abs(averaged[shot] - true[shot]))
+    assert estShotError < avgShotError / 2
+    assert not atSpeed[201]
+    assert all(atSpeed[150:200]) and all(atSpeed[350:])
+    assert est.acceleration == est.a * 10 - est.b * est.velocity + est.disturbance
+
+
+def test_confidence_needs_the_target():
+    est = FlywheelEstimator(MECHANISMS[TOP])
+    est.velocity = 400
+    est.target = 400
+    assert est.atSpeedConfidence > 0.95
+    est.target = 370
+    assert est.atSpeedConfidence < 0.05
+    assert not est.atSpeed
+
+
+def test_late_loops_use_their_real_dt():
+    m = MECHANISMS[TOP]
+    steady = 10 * m.a / m.b
+    est = FlywheelEstimator(m)
+    est.update(0, 10, DT)
+    est.velocity = steady
+    angle = 0.0
+    for dt in (0.02, 0.05, 0.02, 0.035, 0.02) * 10:
+        angle += steady * dt
+        est.update(angle, 10, dt)
+    assert abs(est.velocity - steady) < 1
@@ -0,0 +1,60 @@
+import gc
+
+import gcControl
+from simMatch import SimMatch
+
+
+def makeGarbage(count: int) -> None:
+    for _ in range(count):
+        a: list = []
+        a.append(a)
+
+
+def test_enabled_only_collects_young_generations():
+    gcControl.freeze()
+    # the collection before freezing
+    assert gcControl.collections == [0, 0, 1]
+    gcControl.setEnabled(True)
+    assert not gc.isenabled()
+
+    makeGarbage(gc.get_threshold()[0] * 20)
+    assert gcControl.automaticWhileEnabled == 0
+    assert gcControl.collections == [0, 0, 1]
+
+    for _ in range(50):
+        gcControl.collectStep()
+        makeGarbage(gc.get_threshold()[0] + 1)
+    assert gcControl.collections[0] > 0
+    assert gcControl.collections[1] > 0
+    assert gcControl.collections[2] == 1
+    assert gcControl.lastGeneration in (0, 1)
+
+    # the full collection waits for disabled, and only runs once
+    gcControl.setEnabled(False)
+    assert gc.isenabled()
+    gcControl.collectStep()
+    gcControl.collectStep()
+    assert gcControl.collections[2] == 2
+
+    stats = gcControl.stats()
+    assert len(stats) == 12
+    assert stats[6] == 2
+    assert stats[9] == 0
+
+
+def test_reset_restores_the_collector():
+    gcControl.freeze()
+    gcControl.setEnabled(True)
+    gcControl.reset()
+    assert gc.isenabled()
+    assert gc.get_freeze_count() == 0
+    assert gcControl._onCollect not in gc.callbacks
+
+
+def test_match_has_no_automatic_collections_while_enabled():
+    with SimMatch() as match:
+        match.runMatch()
+        assert gcControl.automaticWhileEnabled == 0
+        assert gcControl.collections[0] > 0
+        # robotInit's and one for each time the match went back to disabled
+        assert gcControl.collections[2] >= 3
@@ -0,0 +1,212 @@
+import math
+
+from ntcore import NetworkTableInstance
+from robotHAL import (
+    MotorOutputCache,
+    RobotHAL,
+    RobotHALBuffer,
+    RobotHALBufferPair,
+    RobotHALBufferPublisher,
+    SensorSampler,
+)
+from timing import setDefaultTimeSource, SteppedClock, TimeData
+
+
+def test_copy_from_copies_every_field():
+    a = RobotHALBuffer()
+    b = RobotHALBuffer()
+    for i, name in enumerate(RobotHALBuffer.__slots__):
+        if isinstance(getattr(a, name), list):
+            setattr(a, name, [i + 0.5, i + 0.25])
+        else:
+            setattr(a, name, i + 0.5)
+
+    lists = [b.leftDriveVolts, b.rightDrivePositions]
+    b.copyFrom(a)
+
+    for name in RobotHALBuffer.__slots__:
+        assert getattr(b, name) == getattr(a, name), name
+    assert b.leftDriveVolts is lists[0], "lists should be copied in place"
+    assert b.rightDrivePositions is lists[1]
+    assert b.leftDriveVolts is not a.leftDriveVolts
+
+
+def test_pair_swap_keeps_previous_snapshot():
+    pair = RobotHALBufferPair()
+    buf = RobotHALBuffer()
+
+    buf.yaw = 1
+    pair.swap(buf)
+    buf.yaw = 2
+    older = pair.swap(buf)
+
+    assert older.yaw == 1
+    assert pair.prev.yaw == 2
+    assert older is not pair.prev
+
+
+def test_stop_motors_keeps_lists():
+    buf = RobotHALBuffer()
+    volts = buf.leftDriveVolts
+    buf.leftDriveVolts[0] = 3
+    buf.intakeFeedVolts = 2
+    buf.stopMotors()
+    assert volts is buf.leftDriveVolts
+    assert buf.leftDriveVolts == [0, 0]
+    assert buf.intakeFeedVolts == 0
+
+
+def test_publisher_sends_only_changes():
+    table = NetworkTableInstance.getDefault().getTable("halPublisherTest")
+    pub = RobotHALBufferPublisher(table, period=0.1)
+    buf = RobotHALBuffer()
+    total = len(pub.ARRAY_GROUPS) + len(pub.SCALARS)
+
+    pub.publish(buf, 0)
+    assert pub.valuesSent == total, "first publish sends everything"
+
+    buf.yaw = 1
+    pub.publish(buf, 0.05)
+    assert pub.valuesSent == total, "rate limited"
+
+    pub.publish(buf, 0.1)
+    assert pub.valuesSent == total + 1
+    assert table.getNumber("yaw", 0) == 1
+
+    buf.yaw = 1.0001
+    buf.leftDrivePositions[1] = 2
+    pub.publish(buf, 0.2)
+    assert pub.valuesSent == total + 2, "yaw change is under epsilon"
+    assert table.getEntry("drivePositions").getDoubleArray([]) == [0, 2, 0, 0]
+
+
+def test_output_cache_suppresses_repeats():
+    cache = MotorOutputCache(2, tolerance=0.01, refreshPeriod=0.1)
+    assert cache.shouldSend(0, 0.5, 0), "the first command always goes out"
+    assert not cache.shouldSend(0, 0.505, 0.02)
+    assert cache.shouldSend(0, 0.6, 0.04)
+    assert cache.shouldSend(1, 0.6, 0.04), "devices are tracked separately"
+
+    assert not cache.shouldSend(0, 0.6, 0.12)
+    assert cache.shouldSend(0, 0.6, 0.14), "refreshed once the period is up"
+
+    cache.shouldSend(1, 0.005, 0.2)
+    assert cache.shouldSend(1, 0, 0.22), "stopping is never suppressed"
+    assert not cache.shouldSend(1, 0, 0.24)
+
+    cache.invalidate()
+    assert cache.shouldSend(1, 0, 0.26)
+    assert cache.framesSent + cache.framesSuppressed == 10
+
+
+def test_robot_hal_skips_repeated_stops():
+    hal = RobotHAL()
+    buf = RobotHALBuffer()
+    clock = SteppedClock()
+    time = TimeData(None, clock)
+    for _ in range(50):
+        clock.advance()
+        time.update()
+        buf.stopMotors()
+        hal.update(buf, time)
+
+    outputs = hal.outputs
+    assert outputs.framesSent + outputs.framesSuppressed == 500
+    # the first tick plus a refresh every 50 ms
+    assert outputs.framesSent <= 10 * 20
+    assert outputs.framesSuppressed >= 300
+
+
+def test_sampler_keeps_timestamped_snapshot():
+    clock = SteppedClock(start=1)
+    readings = [0.0, 0.0]
+    sampler = SensorSampler(
+        [lambda: readings[0], lambda: readings[1]], period=1000, clock=clock
+    )
+    # the thread samples once at startup and then sleeps for the long period
+    while sampler.samples == 0:
+        pass
+    readings[0] = 5
+    readings[1] = 7
+    clock.advance(0.5)
+    sampler.sampleOnce()
+
+    values = [0.0, 0.0]
+    times = [0.0, 0.0]
+    sampler.copyInto(values, times)
+    assert values == [5, 7]
+    assert times == [1.5, 1.5]
+    sampler.close()
+    assert not sampler.thread.is_alive()
+
+
+def test_sampler_survives_failing_sensor():
+    def broken() -> float:
+        raise RuntimeError("sensor unplugged")
+
+    sampler = SensorSampler([lambda: 3.0, broken], period=1000)
+    sampler.close()
+    sampler.sampleOnce()
+    values = [0.0, 0.0]
+    times = [0.0, 0.0]
+    sampler.copyInto(values, times)
+    assert values[0] == 3 and sampler.errors >= 1
+    assert times[1] == -math.inf, "never read, infinitely stale"
+
+
+def test_background_sensors_match_synchronous():
+    clock = SteppedClock()
+    setDefaultTimeSource(clock)
+    try:
+        hal = RobotHAL(sampleInBackground=True, samplePeriod=0.001)
+    finally:
+        setDefaultTimeSource(None)
+    time = TimeData(None, clock)
+    assert hal.sampler is not None
+    hal.sampler.sampleOnce()
+    clock.advance()
+    time.update()
+
+    threaded = RobotHALBuffer()
+    hal.update(threaded, time)
+    assert 0 <= hal.sensorAge("gyroAngle") <= 0.02 + 1e-9
+    hal.close()
+
+    synchronous = RobotHALBuffer()
+    hal.update(synchronous, time)
+    for name in RobotHALBuffer.__slots__:
+        assert getattr(threaded, name) == getattr(synchronous, name), name
+
+
+def test_device_table_conversions_match_formulas():
+    hal = RobotHAL()
+    hal.close()
+    # distinct raw readings so a value landing in the wrong slot shows up
+    hal.sensorValues[:] = [i * 1.5 + 0.25 for i in range(len(hal.sensorValues))]
+    raw = dict(zip(hal.sensorNames, hal.sensorValues))
+    buf = RobotHALBuffer()
+    hal._convertSensors(buf)
+
+    def drivePosition(r: float) -> float:
+        return math.radians((r / RobotHAL.DRIVE_GEARING) * 360) * RobotHAL.WHEEL_RADIUS
+
+    for side in ("left", "right"):
+        for i in range(2):
+            name = f"{side}Drive{i}"
+            assert math.isclose(
+                getattr(buf, side + "DrivePositions")[i],
+                drivePosition(raw[name + "Position"]),
+            )
+            assert math.isclose(
+                getattr(buf, side + "DriveSpeedMeasured")[i],
+                drivePosition(raw[name + "Velocity"]) / 60,
+            )
+    for name, gearing in (
+        ("intakePivot", RobotHAL.INTAKE_PIVOT_GEARING),
+        ("shooterAim", RobotHAL.SHOOTER_AIM_GEARING),
+        ("shooterBottomMotor", RobotHAL.SHOOTER_BOTTOM_MOTOR_GEARING),
+    ):
+        assert math.isclose(
+            getattr(buf, name + "Angle"), raw[name + "Position"] * math.pi * 2 / gearing
+        )
+    assert math.isclose(buf.yaw, math.radians(-raw["gyroAngle"]))
@@ -0,0 +1,93 @@
+import wpilib
+from inputs import (
+    ABS_TOGGLE,
+    ARM_SHIFT,
+    AXIS_INDEX,
+    buttonBit,
+    GYRO_RESET,
+    PANEL_PORT,
+    PANEL_SHIFT,
+    RobotInputs,
+)
+from wpilib.simulation import DriverStationSim, GenericHIDSim, XboxControllerSim
+
+
+# the snapshot is set directly instead of read from the driver station
+class FakeInputs(RobotInputs):
+    def __init__(self) -> None:
+        super().__init__()
+        self.nextButtons = 0
+        self.nextAxes = [0.0] * len(self.axes)
+
+    def read(self) -> None:
+        self.buttons = self.nextButtons
+        self.axes[:] = self.nextAxes
+
+
+def test_reads_every_controller_into_one_snapshot():
+    drive = XboxControllerSim(0)
+    arm = XboxControllerSim(1)
+    panel = GenericHIDSim(PANEL_PORT)
+    for sim in (drive, arm):
+        sim.setButtonCount(10)
+        sim.setAxisCount(6)
+    panel.setButtonCount(32)
+    drive.setLeftY(-0.5)
+    drive.setStartButton(True)
+    arm.setAButton(True)
+    panel.setRawButton(20, True)
+    DriverStationSim.notifyNewData()
+
+    inputs = RobotInputs()
+    inputs.update()
+    assert inputs.axes[AXIS_INDEX["driveLeftY"]] == -0.5
+    assert inputs.buttons == (
+        GYRO_RESET
+        | buttonBit(ARM_SHIFT, wpilib.XboxController.Button.kA)
+        | buttonBit(PANEL_SHIFT, 20)
+    )
+    assert inputs.gyroReset
+    assert inputs.driveX > 0 and inputs.driveY == 0
+
+    drive.setLeftY(0)
+    drive.setStartButton(False)
+    arm.setAButton(False)
+    panel.setRawButton(20, False)
+    DriverStationSim.notifyNewData()
+
+
+def test_edges_come_from_the_previous_snapshot():
+    inputs = FakeInputs()
+    inputs.nextButtons = GYRO_RESET
+    inputs.update()
+    assert inputs.wasPressed(GYRO_RESET) and inputs.gyroReset
+    assert not inputs.absToggle
+
+    inputs.nextButtons = GYRO_RESET | ABS_TOGGLE
+    inputs.update()
+    assert not inputs.gyroReset, "held down isn't another press"
+    assert inputs.isDown(GYRO_RESET)
+    assert inputs.absToggle
+
+    inputs.nextButtons = ABS_TOGGLE
+    inputs.update()
+    assert inputs.wasReleased(GYRO_RESET)
+    assert inputs.released == GYRO_RESET
+    assert inputs.pressed == 0
+
+
+def test_scalars_are_applied_once_per_update():
+    inputs = FakeInputs()
+    inputs.nextAxes[AXIS_INDEX["driveLeftY"]] = -1
+    inputs.nextAxes[AXIS_INDEX["armLeftY"]] = 0.05
+    inputs.nextAxes[AXIS_INDEX["driveRightTrigger"]] = 0.25
+    inputs.update()
+    assert inputs.driveX == 1 and inputs.driveY == 0
+    assert inputs.manualAim == 0, "inside the dead zone"
+    assert inputs.speedCtrl == 0.25
+
+    # the scaled values stay put until the next update
+    inputs.nextAxes[AXIS_INDEX["driveLeftY"]] = 0
+    assert inputs.driveX == 1
+    inputs.update()
+    assert inputs.driveX == 0
@@ -0,0 +1,48 @@
+import ntcore
+import wpilib
+from limelight import PIPELINE_SUBWOOFER_RED, Limelight
+from ntcore import NetworkTableInstance
+
+
+def publishFrame(
+    pub, arrivalUs: int, x: float, latencyMs: float, tags: int = 1
+) -> None:
+    pub.set([x, 2.0, 0.0, 0.0, 0.0, 90.0, latencyMs, tags], arrivalUs)
+
+
+def test_poll_converts_timestamps_and_filters():
+    ll = Limelight("limelight-test", maxAge=0.5)
+    table = NetworkTableInstance.getDefault().getTable("limelight-test")
+    table.putNumber("getpipe", PIPELINE_SUBWOOFER_RED)
+    pub = table.getDoubleArrayTopic("botpose_wpiblue").publish(
+        ntcore.PubSubOptions(sendAll=True, keepDuplicates=True)
+    )
+
+    base = wpilib.RobotController.getFPGATime()
+    publishFrame(pub, base - 40_000, 1.0, 20)
+    publishFrame(pub, base - 20_000, 1.5, 20)
+    publishFrame(pub, base - 19_000, 1.6, 21)  # captured before the previous frame
+    publishFrame(pub, base - 10_000, 1.7, 20, tags=0)
+    publishFrame(pub, base - 5_000, 1.8, 900)  # too old by the time it arrives
+
+    # the robot clock is in a different time base than NT, only differences matter
+    now = 100.0
+    frames = ll.poll(now)
+    assert [f.x for f in frames] == [1.0, 1.5]
+    assert abs(frames[0].timestamp - (now - 0.06)) < 0.005
+    assert abs(frames[1].heading - 1.5707963) < 1e-6
+    assert frames[0].pipeline == PIPELINE_SUBWOOFER_RED
+    assert ll.duplicates == 1
+    assert ll.noTarget == 1
+    assert ll.stale == 1
+
+    assert ll.poll(now) == [], "frames are only handed out once"
+    assert abs(ll.fps - 50) < 5
+    mean, worst = ll.latencyStats
+    assert 0.03 < mean < worst < 0.07
+
+    stats = NetworkTableInstance.getDefault().getTable("vision")
+    ll.publish(stats)
+    assert stats.getNumber("limelight-testFps", 0) == ll.fps
+    assert stats.getNumber("limelight-testLatencyMax", 0) == worst
+    assert list(stats.getNumberArray("limelight-testCounts", [])) == [2, 1, 1, 1]
@@ -0,0 +1,26 @@
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "benchmarks"))
+
+import loopBench  # noqa: E402
+import timing  # noqa: E402
+import wpilib  # noqa: E402
+
+
+def test_loop_bench_runs_headless():
+    results = loopBench.runAll(20)
+    names = [r.name for r in results]
+    for mode in loopBench.MODES:
+        assert f"{mode}.{mode}Periodic" in names
+        assert f"{mode}.robotPeriodic" in names
+    assert all(0 < r.p50 <= r.p99 <= r.max for r in results)
+    assert timing.defaultTimeSource is wpilib.getTime, "the real clock is put back"
+
+    baseline = json.loads(json.dumps(loopBench.toJSON(results, 20)))
+    assert loopBench.regressions(results, baseline) == []
+
+    for m in baseline["methods"].values():
+        m["p99"] /= 10
+    assert len(loopBench.regressions(results, baseline)) == len(results)
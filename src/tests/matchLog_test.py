@@ -0,0 +1,133 @@
+import matchLog
+from inputs import AXIS_INDEX, GYRO_RESET, RobotInputs
+from robotHAL import RobotHALBuffer
+from timing import SteppedClock, TimeData
+
+LEFT_Y = AXIS_INDEX["driveLeftY"]
+
+
+# drives intakeFeedVolts from the raw left stick and reads yaw back, like a tiny Robot
+class StubRobot:
+    def __init__(self, gain: float) -> None:
+        self.gain = gain
+        self.hal = RobotHALBuffer()
+        self.yaws: list[float] = []
+        self.gyroResets: list[bool] = []
+        self.inits = 0
+
+    def teleopInit(self) -> None:
+        self.inits += 1
+
+    def teleopPeriodic(self) -> None:
+        self.input.update()
+        self.hal.stopMotors()
+        self.hal.intakeFeedVolts = -self.input.axes[LEFT_Y] * self.gain
+        self.hardware.update(self.hal, self.time)
+        self.yaws.append(self.hal.yaw)
+        self.gyroResets.append(self.input.gyroReset)
+
+    def robotPeriodic(self) -> None:
+        self.time.update()
+
+    disabledInit = autonomousInit = testInit = teleopInit
+    disabledPeriodic = autonomousPeriodic = testPeriodic = teleopPeriodic
+
+
+def writeLog(path: str, ticks: int) -> None:
+    clock = SteppedClock(start=1)
+    time = TimeData(timeSource=clock)
+    hal = RobotHALBuffer()
+    inputs = RobotInputs()
+    recorder = matchLog.MatchRecorder(path, queueSize=ticks)
+    for i in range(ticks):
+        clock.advance()
+        time.update()
+        inputs.axes[LEFT_Y] = -i / ticks
+        # held down for two ticks at a time
+        inputs.buttons = GYRO_RESET if i % 4 < 2 else 0
+        hal.intakeFeedVolts = i / ticks * 12
+        hal.leftDrivePositions[1] = i * 0.1
+        hal.yaw = i * 0.01
+        recorder.record(matchLog.MODE_TELEOP, time, hal, inputs)
+    recorder.close()
+    assert recorder.dropped == 0
+    assert recorder.written == ticks
+
+
+def test_round_trip(tmp_path):
+    path = str(tmp_path / "match.log")
+    writeLog(path, 100)
+
+    log = matchLog.MatchLog(path)
+    assert len(log) == 100
+    rec = log[42]
+    assert rec.mode == matchLog.MODE_TELEOP
+    assert abs(rec.time - (1 + 43 * 0.02)) < 1e-9
+    assert rec.get("leftDrivePositions[1]") == 42 * 0.1
+
+    buf = RobotHALBuffer()
+    rec.loadHAL(buf)
+    assert buf.yaw == 0.42
+    assert buf.intakeFeedVolts == 0.42 * 12
+
+    inputs = RobotInputs()
+    rec.loadInputs(inputs)
+    assert inputs.axes[LEFT_Y] == -0.42
+    assert inputs.buttons == 0
+    assert log[41].buttons == GYRO_RESET
+    log.close()
+
+
+def test_replay_diffs_commands(tmp_path):
+    path = str(tmp_path / "match.log")
+    writeLog(path, 50)
+    log = matchLog.MatchLog(path)
+
+    same = StubRobot(12)
+    assert matchLog.replay(same, log) == []
+    assert same.inits == 1
+    assert same.yaws[10] == 0.1, "sensors come from the log"
+    # edges are worked out again from the logged buttons
+    assert same.gyroResets[:8] == [True, False, False, False, True, False, False, False]
+
+    changed = StubRobot(6)
+    mismatches = matchLog.replay(changed, log)
+    # the stick is at 0 on the first tick, so both gains agree there
+    assert len(mismatches) == 49
+    tick, field, logged, replayed = mismatches[0]
+    assert (tick, field) == (1, "intakeFeedVolts")
+    assert abs(logged - 2 * replayed) < 1e-9
+    log.close()
+
+
+def test_new_log_path_keeps_the_newest_logs(tmp_path):
+    for n in (3, 7, 12):
+        (tmp_path / f"match{n:04}.log").write_bytes(b"")
+    (tmp_path / "notes.txt").write_bytes(b"")
+
+    path = matchLog.newLogPath(str(tmp_path), keep=3)
+    assert path == str(tmp_path / "match0013.log")
+    assert sorted(p.name for p in tmp_path.iterdir()) == [
+        "match0007.log",
+        "match0012.log",
+        "notes.txt",
+    ]
+    assert matchLog.newLogPath(str(tmp_path / "empty")).endswith("match0000.log")
+
+
+def test_recorder_stops_at_its_byte_budget(tmp_path):
+    path = str(tmp_path / "match.log")
+    recorder = matchLog.MatchRecorder(
+        path, maxBytes=matchLog.HEADER.size + 10 * matchLog.RECORD.size + 1
+    )
+    time = TimeData(timeSource=SteppedClock())
+    hal = RobotHALBuffer()
+    inputs = RobotInputs()
+    for _ in range(15):
+        recorder.record(matchLog.MODE_DISABLED, time, hal, inputs)
+    recorder.close()
+    assert recorder.written == 10
+    assert recorder.dropped == 5
+    log = matchLog.MatchLog(path)
+    assert len(log) == 10
+    log.close()
@@ -0,0 +1,77 @@
+import json
+import math
+import pathlib
+
+from navgrid import NavGrid
+
+GRID_PATH = str(
+    pathlib.Path(__file__).parent.parent / "deploy" / "pathplanner" / "navgrid.json"
+)
+grid = NavGrid(GRID_PATH)
+
+
+def blockedAt(x: float, y: float) -> bool:
+    row, col = grid.cellOf(x, y)
+    return grid.blocked[row * grid.cols + col]
+
+
+def test_packed_bitmap_matches_json():
+    with open(GRID_PATH) as f:
+        data = json.load(f)["grid"]
+    for r, row in enumerate(data):
+        for c, v in enumerate(row):
+            assert grid.isObstacle(r, c) == v
+
+
+def test_path_avoids_inflated_obstacles():
+    start = (1.5, 4.0)
+    goal = (15.0, 4.0)
+    path = grid.findPath(start, goal)
+    assert path is not None
+    assert path[0] == start and path[-1] == goal
+    for (ax, ay), (bx, by) in zip(path, path[1:]):
+        steps = int(math.hypot(bx - ax, by - ay) / 0.05) + 1
+        for k in range(1, steps):
+            t = k / steps
+            x = ax + (bx - ax) * t
+            y = ay + (by - ay) * t
+            row, col = grid.cellOf(x, y)
+            assert not grid.isObstacle(row, col), (x, y)
+
+
+def test_cache_and_budget():
+    grid.findPath((2.0, 2.0), (14.0, 6.0))
+    hits = grid.cacheInfo().hits
+    grid.findPath((2.0, 2.0), (14.0, 6.0))
+    assert grid.cacheInfo().hits == hits + 1
+
+    overBudget = grid.overBudget
+    assert grid.findPath((2.0, 6.0), (14.5, 2.0), budget=0) is None
+    assert grid.overBudget == overBudget + 1
+    assert grid.findPath((2.0, 6.0), (14.5, 2.0)) is not None, "failures aren't cached"
+
+
+def test_inflation_grows_with_footprint():
+    small = NavGrid(GRID_PATH, inflation=0)
+    assert sum(small.blocked) < sum(grid.blocked)
+    assert not blockedAt(8.27, 4.1)
+
+
+def test_clearance_matches_brute_force():
+    obstacles = [
+        (r, c)
+        for r in range(grid.rows)
+        for c in range(grid.cols)
+        if grid.isObstacle(r, c)
+    ]
+    half = grid.nodeSize / 2
+    for r in range(0, grid.rows, 3):
+        for c in range(0, grid.cols, 5):
+            nearest = min(
+                math.hypot(r - orow, c - ocol) * grid.nodeSize - half
+                for orow, ocol in obstacles
+            )
+            wall = (
+                min(r, c, grid.rows - 1 - r, grid.cols - 1 - c) * grid.nodeSize + half
+            )
+            assert abs(grid.clearance[r, c] - min(max(nearest, 0), wall)) < 1e-9
@@ -0,0 +1,69 @@
+import pidTuner
+from ntcore import NetworkTableInstance
+from PIDController import PIDControllerForArm, pidTable, updatePIDsInNT
+from pidTuner import Plant, StepTest, evaluate, tune, waitForConnection, writeGains
+from simPhysics import MECHANISM_INDEX, MECHANISMS
+
+aim = MECHANISMS[MECHANISM_INDEX["shooterAim"]]
+
+
+def test_evaluate_scores_step_response():
+    plant = Plant(aim)
+    test = StepTest(duration=2)
+    slow, good, none = evaluate(
+        PIDControllerForArm,
+        plant,
+        [{"kp": 2}, {"kp": 10, "kd": 2}, {}],
+        test,
+    )
+    assert none.settlingTime == 2, "never settles without output"
+    assert good.settlingTime < slow.settlingTime
+    assert good.score < slow.score < none.score
+
+
+def test_tune_in_parallel_beats_the_grid_corners():
+    plant = Plant(aim, gravity=5)
+    ranges = {"kp": (0.0, 20.0), "kd": (0.0, 3.0), "kg": (0.0, 2.0)}
+    test = StepTest(duration=2)
+    best = tune(
+        PIDControllerForArm,
+        plant,
+        ranges,
+        test,
+        gridSize=3,
+        refineRounds=1,
+        refineSamples=8,
+        workers=2,
+    )
+    corners = evaluate(PIDControllerForArm, plant, [{"kp": 20, "kd": 0, "kg": 0}], test)
+    assert best.score <= corners[0].score
+    assert best.steadyStateError < 0.05
+
+
+def test_write_gains_reaches_controller(remoteNT, monkeypatch):
+    c = PIDControllerForArm("tunerWriteBack")
+    updatePIDsInNT()
+    # the tuner runs on another computer, its pid table is on its own client
+    monkeypatch.setattr(pidTuner, "pidTable", remoteNT.getTable("pid"))
+    writeGains(PIDControllerForArm, "tunerWriteBack", {"kp": 3, "kg": 0.25})
+    remoteNT.sync()
+    updatePIDsInNT()
+    assert c.kp == 3
+    assert c.kg == 0.25
+    assert pidTable.getSubTable("tunerWriteBack").getNumber("Kg", 0) == 0.25
+
+
+def test_wait_for_connection():
+    server = NetworkTableInstance.create()
+    client = NetworkTableInstance.create()
+    try:
+        client.startClient4("pidTunerTest")
+        client.setServer("127.0.0.1", 5813)
+        assert not waitForConnection(client, 0.2)
+        server.startServer(listen_address="127.0.0.1", port4=5813)
+        assert waitForConnection(client, 5)
+    finally:
+        client.stopClient()
+        server.stopServer()
+        NetworkTableInstance.destroy(client)
+        NetworkTableInstance.destroy(server)
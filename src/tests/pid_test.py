@@ -0,0 +1,184 @@
+import math
+import random
+
+import numpy as np
+from PIDController import (
+    PIDBank,
+    PIDController,
+    PIDControllerForArm,
+    PIDControllerForCam,
+    _gainPoller,
+    pidTable,
+    updatePIDsInNT,
+)
+from real import signum
+
+
+def test_gains_published_once_then_follow_nt(remoteNT):
+    c = PIDControllerForArm("pidTestArm", kp=2, kg=0.5)
+    updatePIDsInNT()
+
+    t = pidTable.getSubTable("pidTestArm")
+    assert t.getNumber("Kp", 0) == 2
+    assert t.getNumber("Kg", 0) == 0.5
+
+    remote = remoteNT.getTable("pid").getSubTable("pidTestArm")
+    remote.putNumber("Kp", 4)
+    remote.putNumber("Kg", 1.5)
+    remoteNT.sync()
+    assert c.kp == 2, "gains only change when updatePIDsInNT runs"
+    updatePIDsInNT()
+    assert c.kp == 4
+    assert c.kg == 1.5
+
+    c.integral = 0.25
+    updatePIDsInNT()
+    assert t.getNumber("integral", 0) == 0.25
+
+
+def test_own_publishes_are_not_queued():
+    c = PIDController("pidTestLocal", kp=2)
+    updatePIDsInNT()
+    for i in range(10):
+        c.integral = i
+        updatePIDsInNT()
+    pidTable.getSubTable("pidTestLocal").putNumber("Kp", 5)
+    assert len(_gainPoller.readQueue()) == 0
+    assert c.kp == 2
+
+
+def test_existing_nt_gains_win():
+    pidTable.getSubTable("pidTestExisting").putNumber("Kp", 7)
+    c = PIDController("pidTestExisting", kp=1, kd=3)
+    updatePIDsInNT()
+    assert c.kp == 7
+    assert c.kd == 3
+
+
+def _legacyTick(gains: dict, state: dict, target: float, position: float, dt: float):
+    # the scalar math PIDController used before it became a PIDBank view
+    error = target - position
+    derivative = (error - state["prevErr"]) / dt
+    state["integral"] += gains["ki"] * error * dt
+    if abs(state["integral"]) > gains["integralZone"]:
+        state["integral"] = gains["integralZone"] * signum(state["integral"])
+    out = (
+        gains["kp"] * error
+        + state["integral"]
+        + gains["kd"] * derivative
+        + gains["kff"] * target
+    )
+    out += gains["kg"] * math.cos(position + gains["balanceAngle"])
+    out += gains["ks"] * signum(error)
+    state["prevErr"] = error
+    return out
+
+
+def test_bank_matches_scalar_controllers():
+    bank = PIDBank(capacity=2)
+    rng = random.Random(4536)
+    controllers = []
+    legacy = []
+    for i in range(9):
+        gains = {
+            "kp": rng.uniform(0, 3),
+            "ki": rng.uniform(0, 1),
+            "kd": rng.uniform(0, 0.2),
+            "kff": rng.uniform(0, 0.5),
+            "integralZone": rng.uniform(0, 0.5),
+            "kg": 0.0,
+            "balanceAngle": 0.0,
+            "ks": 0.0,
+        }
+        if i % 3 == 1:
+            gains["kg"] = rng.uniform(0, 1)
+            gains["balanceAngle"] = 0.1
+            c = PIDControllerForArm(
+                f"bankArm{i}",
+                gains["kp"],
+                gains["ki"],
+                gains["kd"],
+                gains["kff"],
+                gains["kg"],
+                bank=bank,
+            )
+        elif i % 3 == 2:
+            gains["ks"] = rng.uniform(0, 1)
+            gains["kd"] = gains["kff"] = 0.0
+            c = PIDControllerForCam(
+                f"bankCam{i}", gains["kp"], gains["ki"], gains["ks"], bank=bank
+            )
+        else:
+            c = PIDController(
+                f"bank{i}",
+                gains["kp"],
+                gains["ki"],
+                gains["kd"],
+                gains["kff"],
+                bank=bank,
+            )
+        c.integralZone = gains["integralZone"]
+        controllers.append(c)
+        legacy.append((gains, {"integral": 0.0, "prevErr": 0.0}))
+
+    # the same controllers outside a bank, ticking on their own float attributes
+    alone = [type(c)(c.name + "alone") for c in controllers]
+    for a, c in zip(alone, controllers):
+        for _, attr in c.NT_GAINS:
+            setattr(a, attr, getattr(c, attr))
+        a.balanceAngle = c.balanceAngle
+
+    assert bank.size == 9 and bank.capacity >= 9
+    assert bank.controllers == controllers
+    bank.load()
+
+    for _ in range(50):
+        targets = np.array([rng.uniform(-2, 2) for _ in controllers])
+        positions = np.array([rng.uniform(-2, 2) for _ in controllers])
+        out = bank.tick(targets, positions, 0.02)
+        bank.store()
+        for i, (gains, state) in enumerate(legacy):
+            target = float(targets[i])
+            position = float(positions[i])
+            expected = _legacyTick(gains, state, target, position, 0.02)
+            assert math.isclose(out[i], expected, rel_tol=1e-9, abs_tol=1e-9)
+            aloneOut = alone[i].tick(target, position, 0.02)
+            assert math.isclose(aloneOut, expected, rel_tol=1e-9, abs_tol=1e-9)
+            assert math.isclose(
+                controllers[i].integral, state["integral"], abs_tol=1e-12
+            )
+
+
+def test_bank_only_sees_gains_after_load():
+    bank = PIDBank()
+    c = PIDController("bankLoad", kp=1, bank=bank)
+    bank.load()
+    c.kp = 2
+    assert bank.tick(np.array([1.0]), np.array([0.0]), 0.02)[0] == 1
+    bank.load()
+    assert bank.tick(np.array([1.0]), np.array([0.0]), 0.02)[0] == 2
+
+    # the controller picks up where the bank left off
+    c.ki = 1
+    c.integralZone = 10
+    bank.load()
+    bank.tick(np.array([1.0]), np.array([0.0]), 0.02)
+    assert c.integral == 0
+    bank.store()
+    assert c.integral == 0.02
+    c.tick(1, 0, 0.02)
+    assert math.isclose(c.integral, 0.04)
+
+
+def test_zero_dt_skips_derivative_and_integral():
+    c = PIDController("zeroDt", kp=2, ki=1, kd=1)
+    c.integralZone = 10
+    assert c.tick(1, 0, 0) == 2
+    assert c.integral == 0
+
+    bank = PIDBank()
+    PIDController("zeroDtBank", kp=2, ki=1, kd=1, bank=bank).integralZone = 10
+    bank.load()
+    out = bank.tick(np.array([1.0]), np.array([0.0]), 0)
+    assert out[0] == 2
+    assert bank.integral[0] == 0
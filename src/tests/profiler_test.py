@@ -0,0 +1,92 @@
+import time
+
+import profiler
+
+
+class SteppedClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_nested_scopes_and_overruns():
+    clock = SteppedClock()
+    profiler.reset()
+    profiler.setClock(clock)
+    try:
+        for i in range(10):
+            with profiler.scope("teleopPeriodic"):
+                clock.now += 0.001
+                with profiler.scope("hardware.update"):
+                    # every fifth loop the hardware blows the budget
+                    clock.now += 0.03 if i % 5 == 4 else 0.002
+            with profiler.scope("robotPeriodic"):
+                clock.now += 0.001
+            profiler.endLoop()
+
+        outer = profiler.sections["teleopPeriodic"]
+        inner = profiler.sections["teleopPeriodic/hardware.update"]
+        assert outer.count == 10
+        assert inner.count == 10
+        assert profiler.loopOverruns == 2
+        assert outer.overruns == 2
+        assert inner.overruns == 2
+        assert profiler.sections["robotPeriodic"].overruns == 0, "it ran, but fast"
+
+        stats = dict(zip(profiler.Section.STAT_NAMES, inner.stats()))
+        assert abs(stats["min"] - 0.002) < 1e-9
+        assert abs(stats["max"] - 0.03) < 1e-9
+        assert abs(stats["p50"] - 0.002) < 1e-9
+        assert stats["count"] == 10
+    finally:
+        profiler.setClock(time.perf_counter)
+        profiler.reset()
+
+
+def test_overrun_stops_at_the_section_own_code():
+    clock = SteppedClock()
+    profiler.reset()
+    profiler.setClock(clock)
+    try:
+        with profiler.scope("teleopPeriodic"):
+            clock.now += 0.025
+            with profiler.scope("hardware.update"):
+                clock.now += 0.002
+            with profiler.scope("hardware.update"):
+                clock.now += 0.002
+        profiler.endLoop()
+
+        assert profiler.loopOverruns == 1
+        assert profiler.sections["teleopPeriodic"].overruns == 1
+        assert profiler.sections["teleopPeriodic/hardware.update"].overruns == 0
+        assert (
+            abs(profiler.sections["teleopPeriodic/hardware.update"].loopTime - 0.004)
+            < 1e-9
+        )
+    finally:
+        profiler.setClock(time.perf_counter)
+        profiler.reset()
+
+
+def test_ring_buffer_keeps_latest_samples():
+    s = profiler.Section("ring", size=4)
+    for d in (5.0, 5.0, 1.0, 2.0, 3.0, 4.0):
+        s.add(d)
+    stats = s.stats()
+    assert stats[0] == 1.0
+    assert stats[5] == 4.0
+    assert stats[6] == 6
+
+
+def test_profiled_decorator():
+    profiler.reset()
+
+    @profiler.profiled()
+    def work() -> int:
+        return 3
+
+    assert work() == 3
+    assert profiler.sections["work"].count == 1
+    profiler.reset()
@@ -0,0 +1,105 @@
+import math
+import random
+
+import numpy as np
+from real import (
+    angleDiff,
+    angleDiffArray,
+    angleWrap,
+    angleWrapArray,
+    clamp,
+    clampArray,
+    invLerp,
+    invLerpArray,
+    lerp,
+    lerpArray,
+    signum,
+    signumArray,
+)
+
+# randomized properties, each test checks the fast versions against a reference over many seeded samples
+
+
+# the loop angleWrap used to be
+def loopWrap(a: float) -> float:
+    while a > math.pi:
+        a -= math.pi * 2
+    while a < -math.pi:
+        a += math.pi * 2
+    return a
+
+
+def angles(n: int = 2000) -> list[float]:
+    rng = random.Random(4536)
+    out = [0.0, math.pi, -math.pi, 2 * math.pi, -3 * math.pi, 1e-12, -1e-12]
+    out += [rng.uniform(-50, 50) for _ in range(n)]
+    out += [rng.uniform(-1e4, 1e4) for _ in range(n // 10)]
+    return out
+
+
+# equal as angles, so pi and -pi count as the same
+def sameAngle(a: float, b: float, tol: float) -> bool:
+    return abs(math.remainder(a - b, math.pi * 2)) <= tol
+
+
+def test_angle_wrap_matches_loop():
+    for a in angles():
+        w = angleWrap(a)
+        assert -math.pi <= w <= math.pi
+        # the loop piles up rounding error with every turn it subtracts
+        assert sameAngle(w, loopWrap(a), 1e-12 * max(1, abs(a)))
+        if -math.pi <= a <= math.pi:
+            assert w == a
+
+
+def test_angle_wrap_array_matches_scalar():
+    a = np.array(angles())
+    out = angleWrapArray(a)
+    assert np.all(out >= -math.pi) and np.all(out <= math.pi)
+    for x, w in zip(a, out):
+        assert sameAngle(w, angleWrap(x), 1e-12 * max(1, abs(x)))
+
+    buf = np.zeros(len(a))
+    assert angleWrapArray(a, out=buf) is buf
+
+
+def test_angle_diff():
+    rng = random.Random(4536)
+    a = np.array([rng.uniform(-20, 20) for _ in range(1000)])
+    b = np.array([rng.uniform(-20, 20) for _ in range(1000)])
+    diffs = angleDiffArray(a, b)
+    for x, y, d in zip(a, b, diffs):
+        assert -math.pi <= angleDiff(x, y) <= math.pi
+        assert sameAngle(angleDiff(x, y) + y, x, 1e-9)
+        assert sameAngle(d, angleDiff(x, y), 1e-9)
+    assert angleDiff(-3, 3) == -angleDiff(3, -3)
+
+
+def test_lerp_and_inverse():
+    rng = random.Random(4536)
+    a = np.array([rng.uniform(-10, 10) for _ in range(500)])
+    b = a + np.array([rng.uniform(0.1, 10) for _ in range(500)])
+    t = np.array([rng.uniform(-1, 2) for _ in range(500)])
+    points = lerpArray(a, b, t)
+    back = invLerpArray(a, b, points)
+    for i in range(len(a)):
+        assert points[i] == lerp(a[i], b[i], t[i])
+        assert math.isclose(back[i], invLerp(a[i], b[i], points[i]))
+        assert math.isclose(back[i], t[i], abs_tol=1e-9)
+
+
+def test_signum_and_clamp():
+    rng = random.Random(4536)
+    x = np.array([0.0, -0.0] + [rng.uniform(-5, 5) for _ in range(500)])
+    signs = signumArray(x)
+    clamped = clampArray(x, -1, 2)
+    for v, s, c in zip(x, signs, clamped):
+        assert s == signum(float(v))
+        assert c == clamp(v, -1, 2)
+        assert -1 <= c <= 2
+
+    # per element bounds, like the PID integral zones
+    zone = np.abs(x[::-1])
+    out = np.zeros(len(x))
+    assert clampArray(x, -zone, zone, out=out) is out
+    assert np.all(np.abs(out) <= zone)
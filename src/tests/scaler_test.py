@@ -1,4 +1,9 @@
-from utils import Scalar
+import math
+import random
+
+import numpy
+from utils import CircularScalar, Scalar, expoCurve, exponentCurve, piecewiseCurve
+from wpimath.geometry import Rotation2d, Translation2d
 
 
 def test_scaler_default():
@@ -21,3 +26,86 @@ def test_scaler_default():
 
     assert s(1) == 1
     assert s(-1) == -1
+
+
+class LegacyScalar:
+    # the shaping math before the rewrite
+    def __init__(self, deadZone, exponent):
+        self.deadZone = deadZone
+        self.exponent = exponent
+
+    def scale(self, input):
+        if abs(input) <= self.deadZone:
+            return 0
+        delta = abs(input) - self.deadZone
+        return math.copysign(1, input) * (delta / (1 - self.deadZone)) ** self.exponent
+
+    def circular(self, x, y):
+        angle = math.atan2(y, x)
+        scaled = Translation2d(self.scale(math.hypot(x, y)), 0).rotateBy(
+            Rotation2d(angle)
+        )
+        return scaled.x, scaled.y
+
+
+def samples():
+    rng = random.Random(4536)
+    values = [0, 0.1, -0.1, 0.06, 1, -1, 0.5, -0.5]
+    values += [rng.uniform(-1, 1) for _ in range(200)]
+    return values
+
+
+def test_scaler_matches_legacy():
+    for deadzone, exponent in ((0.1, 1), (0.06, 2), (0.2, 3), (0, 1.5)):
+        s = Scalar(deadzone, exponent)
+        legacy = LegacyScalar(deadzone, exponent)
+        for v in samples():
+            assert math.isclose(s(v), legacy.scale(v), abs_tol=1e-12), (v, exponent)
+
+
+def test_circular_scaler_matches_legacy():
+    for deadzone, exponent in ((0.06, 1), (0.1, 2)):
+        c = CircularScalar(deadzone, exponent)
+        legacy = LegacyScalar(deadzone, exponent)
+        vs = samples()
+        for x, y in zip(vs, reversed(vs)):
+            ax, ay = c.Scale(x, y)
+            bx, by = legacy.circular(x, y)
+            assert math.isclose(ax, bx, abs_tol=1e-12)
+            assert math.isclose(ay, by, abs_tol=1e-12)
+
+
+def test_lookup_table_matches_curve():
+    s = Scalar(0.1)
+    s.setCurve(exponentCurve(2), 1025)
+    legacy = LegacyScalar(0.1, 2)
+    for v in samples():
+        assert math.isclose(s(v), legacy.scale(v), abs_tol=1e-5)
+    assert s(1) == 1 and s(-1) == -1
+
+    s.setCurve(piecewiseCurve([(0, 0), (0.5, 0.2), (1, 1)]))
+    assert math.isclose(s(0.55), 0.2, abs_tol=1e-9)
+    s.setCurve(expoCurve(0.5))
+    assert math.isclose(s(0.55), 0.5 * 0.5 + 0.5 * 0.125, abs_tol=1e-4)
+
+    s.setCurve(None)
+    assert math.isclose(s(0.55), 0.5)
+
+
+def test_array_api_matches_scalar():
+    values = numpy.array(samples())
+    for curve in (None, expoCurve(0.3)):
+        s = Scalar(0.1, 2)
+        s.setCurve(curve)
+        out = s.scaleArray(values)
+        for v, o in zip(values, out):
+            assert math.isclose(o, s(float(v)), abs_tol=1e-12)
+
+    c = CircularScalar(0.06, 1)
+    xs = values
+    ys = values[::-1].copy()
+    outX, outY = c.scaleArrays(xs, ys)
+    for x, y, ox, oy in zip(xs, ys, outX, outY):
+        ex, ey = c.Scale(float(x), float(y))
+        assert math.isclose(ox, ex, abs_tol=1e-12)
+        assert math.isclose(oy, ey, abs_tol=1e-12)
@@ -0,0 +1,83 @@
+import gc
+import weakref
+
+import profiler
+import timing
+import wpilib
+from scheduler import PRIORITY_CONTROL, PRIORITY_LOW, Scheduler
+from simMatch import SimMatch
+from timing import SteppedClock
+
+
+def makeScheduler(clock: SteppedClock) -> Scheduler:
+    timing.setDefaultTimeSource(clock)
+    profiler.setClock(clock)
+    return Scheduler(clock.now)
+
+
+def teardown_function() -> None:
+    timing.setDefaultTimeSource(None)
+    profiler.setClock(profiler.time.perf_counter)
+
+
+def test_tasks_run_at_their_rates():
+    clock = SteppedClock()
+    s = makeScheduler(clock)
+    runs = {"fast": 0, "slow": 0}
+    s.add("fast", lambda: runs.__setitem__("fast", runs["fast"] + 1), 0.02)
+    s.add("slow", lambda: runs.__setitem__("slow", runs["slow"] + 1), 0.2, offset=0.01)
+
+    for _ in range(100):
+        s.runDue()
+        clock.advance()
+    assert runs["fast"] == 100
+    assert runs["slow"] == 10
+
+
+def test_low_priority_defers_near_the_next_loop():
+    clock = SteppedClock()
+    s = makeScheduler(clock)
+    ran = []
+    low = s.add(
+        "low", lambda: ran.append("low"), 0.02, priority=PRIORITY_LOW, budget=0.005
+    )
+    s.add("control", lambda: ran.append("control"), 0.02, priority=PRIORITY_CONTROL)
+
+    # 3 ms before the next loop, the low priority task doesn't fit
+    clock.advance(0.017)
+    s.runDue()
+    assert ran == ["control"]
+    assert low.deferred == 1
+
+    # deferring is bounded so it can't starve
+    for _ in range(10):
+        s.runDue(clock.advance(0.02))
+    assert low.runs > 0
+
+
+def test_loop_phase_comes_from_start_time():
+    s = Scheduler(10.0)
+    assert abs(s.timeToNextLoop(10.005) - 0.015) < 1e-9
+    assert abs(s.timeToNextLoop(10.02) - 0.02) < 1e-9
+
+
+# the robot and scheduler only live in here, so nothing outside refers to them once it returns
+def attachedRobot() -> weakref.ref:
+    robot = wpilib.TimedRobot()
+    s = Scheduler(timing.now())
+    s.add("task", lambda: robot.getPeriod(), 0.1)
+    s.attach(robot)
+    return weakref.ref(robot)
+
+
+def test_attached_robot_is_collected():
+    robotRef = attachedRobot()
+    gc.collect()
+    assert robotRef() is None
+
+
+def test_sim_match_runs_the_tasks():
+    with SimMatch() as match:
+        assert not match.robot.scheduler.attached
+        match.run("disabled", 1.0)
+        assert all(t.runs > 0 for t in match.robot.scheduler.tasks)
@@ -0,0 +1,99 @@
+import itertools
+import math
+import time
+
+import profiler
+import pytest
+import timing
+import wpilib
+from PIDController import createdControllers, PIDController
+from robotHAL import RobotHALBuffer
+from simHAL import RobotSimHAL
+from simMatch import MODES, SimMatch
+from timing import SteppedClock, TimeData
+
+
+def snapshot(match: SimMatch) -> tuple:
+    hal = match.robot.hal
+    drive = match.robot.drive
+    return (
+        tuple(
+            tuple(v) if isinstance(v, list) else v
+            for v in (getattr(hal, name) for name in RobotHALBuffer.__slots__)
+        ),
+        (drive.x, drive.y, drive.heading),
+        match.robot.time.prevTime,
+        profiler.loopCount,
+    )
+
+
+def test_full_match_is_fast_and_exact():
+    start = time.perf_counter()
+    with SimMatch() as match:
+        match.runMatch()
+        assert match.ticks == round(152.5 / timing.LOOP_PERIOD)
+        assert math.isclose(
+            match.robot.time.timeSinceInit, match.ticks * timing.LOOP_PERIOD
+        )
+        assert profiler.loopOverruns == 0, "no simulated time passes inside a loop"
+    assert time.perf_counter() - start < 3
+    assert timing.defaultTimeSource is wpilib.getTime
+    assert profiler.clock is time.perf_counter
+
+
+def test_match_repeats_exactly():
+    runs = []
+    for _ in range(2):
+        with SimMatch(seed=7) as match:
+            match.run("autonomous", 1)
+            match.robot.hardware.resetGyroToAngle(0.3)
+            match.run("teleop", 1)
+            runs.append(snapshot(match))
+    assert runs[0] == runs[1]
+
+
+# every order of three mode transitions, each mode running for a few loops
+@pytest.mark.parametrize("modes", list(itertools.product(MODES, repeat=3)))
+def test_mode_transitions(modes):
+    with SimMatch() as match:
+        for mode in modes:
+            match.run(mode, 0.1)
+        assert match.ticks == 15
+        assert match.mode == modes[-1]
+
+
+@pytest.mark.parametrize("angle", [-3, -math.pi / 2, 0, 1, math.pi])
+def test_gyro_reset(angle):
+    with SimMatch() as match:
+        match.run("teleop", 0.1)
+        match.robot.hardware.resetGyroToAngle(angle)
+        match.tick()
+        assert match.robot.hal.yaw == angle
+
+
+def test_unknown_mode():
+    with SimMatch() as match:
+        with pytest.raises(ValueError):
+            match.setMode("practice")
+
+
+# a PID holding a sequence of setpoints against the sim, on stepped time
+@pytest.mark.parametrize("setpoints", [(0.5, 1.0), (1.0, 0.2), (-0.5, 0.5, 0.0)])
+def test_pid_setpoint_changes(setpoints):
+    clock = SteppedClock()
+    time = TimeData(None, clock)
+    sim = RobotSimHAL()
+    buf = RobotHALBuffer()
+    pid = PIDController("simMatchPivot", 10, 0, 1)
+    try:
+        for target in setpoints:
+            for _ in range(150):
+                clock.advance()
+                time.update()
+                buf.intakePivotVolts = max(
+                    min(pid.tick(target, buf.intakePivotAngle, time.dt), 12), -12
+                )
+                sim.update(buf, time)
+            assert abs(buf.intakePivotAngle - target) < 0.02, target
+    finally:
+        createdControllers.remove(pid)
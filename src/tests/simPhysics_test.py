@@ -0,0 +1,72 @@
+import math
+
+import numpy as np
+from robotHAL import RobotHALBuffer
+from simHAL import RobotSimHAL
+from simPhysics import MECHANISM_INDEX, MECHANISMS, RobotPhysics
+from timing import SteppedClock, TimeData
+
+
+def test_flywheel_reaches_free_speed():
+    p = RobotPhysics()
+    top = MECHANISM_INDEX["shooterTopMotor"]
+    m = MECHANISMS[top]
+    p.mechVolts[0, top] = 12
+    p.run(10)
+    assert math.isclose(p.mechVel[0, top], 12 * m.a / m.b, rel_tol=1e-6)
+    assert p.mechVel[0, top] > 0
+
+
+def test_step_size_does_not_change_the_answer():
+    coarse = RobotPhysics()
+    fine = RobotPhysics()
+    for p in (coarse, fine):
+        p.mechVolts[0] = 6
+        p.driveDuty[0] = [0.5, 0.25]
+    coarse.run(1, dt=0.02)
+    fine.run(1, dt=0.001)
+    assert np.allclose(coarse.mechPos, fine.mechPos)
+    assert np.allclose(coarse.drivePos, fine.drivePos)
+    assert np.allclose(coarse.yaw, fine.yaw)
+
+
+def test_batched_robots_are_independent():
+    p = RobotPhysics(3)
+    p.driveDuty[1] = [0.5, 0.5]
+    p.driveDuty[2] = [-0.5, 0.5]
+    p.run(1)
+    assert np.all(p.drivePos[0] == 0)
+    assert p.drivePos[1, 0] > 0 and p.yaw[1] == 0
+    assert p.yaw[2] > 0, "right side forward turns CCW"
+
+
+def test_sim_hal_fills_buffer():
+    clock = SteppedClock()
+    time = TimeData(timeSource=clock)
+    hal = RobotSimHAL()
+    buf = RobotHALBuffer()
+    buf.leftDriveVolts[:] = [1, 1]
+    buf.rightDriveVolts[:] = [1, 1]
+    buf.shooterAimVolts = 3
+    for _ in range(50):
+        clock.advance()
+        time.update()
+        hal.update(buf, time)
+    assert buf.leftDrivePositions[0] > 0
+    assert buf.leftDrivePositions[0] == buf.rightDrivePositions[1]
+    assert buf.shooterAimAngle > 0
+    assert buf.intakePivotAngle == 0
+    assert abs(buf.yaw) < 1e-9
+
+
+def test_outside_acceleration_settles_against_damping():
+    p = RobotPhysics()
+    aim = MECHANISM_INDEX["shooterAim"]
+    m = MECHANISMS[aim]
+    p.mechAccel[0, aim] = -m.a * 3
+    p.mechVolts[0, aim] = 3
+    p.run(1)
+    assert abs(p.mechVel[0, aim]) < 1e-9, "3 V holds against the same acceleration"
+    p.mechVolts[0, aim] = 0
+    p.run(100, dt=0.1)
+    assert math.isclose(p.mechVel[0, aim], -3 * m.a / m.b, rel_tol=1e-6)
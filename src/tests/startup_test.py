@@ -0,0 +1,16 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "benchmarks"))
+
+import startupBench  # noqa: E402
+
+# generous for a loaded CI box, a cold start on the rio is slower but this catches a heavy import creeping back in
+FIRST_PERIODIC_BUDGET = 3.0  # s
+
+
+def test_time_to_first_robot_periodic():
+    profile = startupBench.measureStartup()
+    assert profile.lazyLoaded == [], "vendor libraries should load with their devices"
+    assert 0 < profile.importSeconds < profile.firstPeriodicSeconds
+    assert profile.firstPeriodicSeconds < FIRST_PERIODIC_BUDGET, str(profile)
@@ -0,0 +1,48 @@
+import timing
+from timing import SteppedClock, TimeData
+
+
+def test_stepped_time_data():
+    clock = SteppedClock(start=10)
+    t = TimeData(timeSource=clock)
+    assert t.dt == 0
+    assert t.controlDt > 0, "controllers must never see a zero dt"
+
+    clock.advance()
+    t.update()
+    assert abs(t.dt - 0.02) < 1e-9
+    assert abs(t.timeSinceInit - 0.02) < 1e-9
+    assert t.controlDt == t.dt
+    assert t.lateLoops == 0
+
+    clock.advance(0.05)
+    t.update()
+    assert t.lateLoops == 1
+    assert abs(t.maxDt - 0.05) < 1e-9
+    assert abs(t.windowMaxDt - 0.05) < 1e-9
+    assert abs(t.jitter - 0.03) < 1e-9
+
+    for _ in range(timing.WINDOW_SIZE):
+        clock.advance()
+        t.update()
+    assert abs(t.windowMaxDt - 0.02) < 1e-9, "late tick has left the window"
+    assert abs(t.maxDt - 0.05) < 1e-9
+    assert t.windowJitter < 1e-9
+
+
+def test_prev_chaining_still_works():
+    clock = SteppedClock()
+    first = TimeData(None, clock)
+    clock.advance(0.5)
+    second = TimeData(first, clock)
+    assert second.dt == 0.5
+    assert second.initTime == first.initTime
+
+
+def test_default_time_source():
+    clock = SteppedClock(start=3)
+    timing.setDefaultTimeSource(clock)
+    try:
+        assert TimeData().initTime == 3
+    finally:
+        timing.setDefaultTimeSource(None)
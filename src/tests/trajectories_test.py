@@ -0,0 +1,123 @@
+import math
+import os
+import shutil
+
+import numpy as np
+import pytest
+import trajectories
+from trajectories import (
+    COL_HEADING,
+    COL_TIME,
+    COL_VELOCITY,
+    COL_X,
+    COL_Y,
+    PATHPLANNER_DIR,
+    Trajectory,
+)
+from wpimath.trajectory import TrajectoryGenerator, TrajectoryParameterizer
+
+EXIT_PATH = os.path.join(PATHPLANNER_DIR, "exit.path")
+
+
+def test_pathplanner_path_compiles(tmp_path):
+    assert trajectories.compileFile(EXIT_PATH, str(tmp_path))
+    traj = Trajectory(trajectories.outputPath(EXIT_PATH, str(tmp_path)))
+    s = traj.samples
+    assert s[0, COL_X] == pytest.approx(1.325730468864645)
+    assert s[0, COL_Y] == pytest.approx(7.0)
+    assert s[-1, COL_X] == pytest.approx(2.83)
+    assert s[-1, COL_Y] == pytest.approx(6.99)
+    assert np.all(np.diff(s[:, COL_TIME]) > 0)
+    assert np.all(np.abs(s[:, COL_VELOCITY]) <= 3.0 + 1e-9)
+    assert s[-1, COL_VELOCITY] == pytest.approx(0, abs=1e-6)
+    del s
+    traj.close()
+
+
+def test_unchanged_paths_are_not_rebuilt(tmp_path):
+    source = tmp_path / "exit.path"
+    shutil.copy(EXIT_PATH, source)
+    out = tmp_path / "out"
+    assert trajectories.compileFile(str(source), str(out))
+    assert not trajectories.compileFile(str(source), str(out))
+
+    source.write_text(
+        source.read_text().replace('"maxVelocity": 3.0', '"maxVelocity": 2.0')
+    )
+    assert trajectories.compileFile(str(source), str(out))
+
+
+def test_lookup_matches_the_parameterized_trajectory(tmp_path):
+    source = trajectories.readPath(os.path.join(PATHPLANNER_DIR, "middle.path"))
+    expected = TrajectoryParameterizer.timeParameterizeTrajectory(
+        TrajectoryGenerator.splinePointsFromSplines(source.segments),
+        [],
+        0,
+        source.endVelocity,
+        source.maxVelocity,
+        source.maxAcceleration,
+        source.reversed,
+    )
+    path = str(tmp_path / "middle.traj")
+    trajectories.writeTrajectory(path, b"\0" * 32, trajectories.compilePath(source))
+    traj = Trajectory(path)
+    assert traj.duration == pytest.approx(expected.totalTime())
+
+    out = np.empty(len(trajectories.SAMPLE_FIELDS))
+    for t in np.linspace(0, traj.duration, 97):
+        e = expected.sample(t)
+        s = traj.sample(t, out)
+        assert s[COL_TIME] == t
+        assert math.hypot(s[COL_X] - e.pose.X(), s[COL_Y] - e.pose.Y()) < 1e-3
+        assert abs(s[COL_HEADING] - e.pose.rotation().radians()) < 1e-2
+        assert s[COL_VELOCITY] == pytest.approx(e.velocity, abs=0.05)
+
+    # clamped to the ends
+    assert traj.sample(-1)[COL_X] == traj.samples[0, COL_X]
+    assert traj.sample(traj.duration + 1)[COL_X] == traj.samples[-1, COL_X]
+    traj.close()
+
+
+def test_load_rebuilds_a_stale_path(tmp_path):
+    paths = tmp_path / "pathplanner" / "paths"
+    paths.mkdir(parents=True)
+    shutil.copy(EXIT_PATH, paths / "exit.path")
+    traj = trajectories.load("exit", str(tmp_path))
+    assert len(traj) > 0
+    assert traj.sourceHash == trajectories.sourceHash(str(paths / "exit.path"))
+    traj.close()
+
+
+def test_deployed_trajectories_are_up_to_date():
+    for name in os.listdir(PATHPLANNER_DIR):
+        source = os.path.join(PATHPLANNER_DIR, name)
+        stored = trajectories.storedHash(trajectories.outputPath(source))
+        assert stored == trajectories.sourceHash(
+            source
+        ), f"{name} changed, run python trajectories.py"
+
+
+def test_pathweaver_without_tangent_uses_its_neighbors(tmp_path):
+    source = tmp_path / "bad.path"
+    source.write_text(
+        "X,Y,Tangent X,Tangent Y,Fixed Theta,Reversed,Name\n"
+        "1.0,-5.0,3.0,0.0,true,false,\n"
+        "5.0,-3.0,0.0,0.0,true,false,\n"
+        "8.0,-5.0,0.0,0.0,true,false,\n"
+    )
+    path = trajectories.readPath(str(source))
+    feet = trajectories.PATHWEAVER_UNITS
+    middle, end = path.segments
+    # the middle waypoint goes from its neighbor before to its neighbor after, the end along the last chord
+    assert np.isclose(middle.getFinalControlVector().x[1], 3.5 * feet)
+    assert np.isclose(middle.getFinalControlVector().y[1], 0)
+    assert np.isclose(end.getFinalControlVector().x[1], 3 * feet)
+    assert np.isclose(end.getFinalControlVector().y[1], -2 * feet)
+
+    source.write_text(
+        "X,Y,Tangent X,Tangent Y,Fixed Theta,Reversed,Name\n"
+        "1.0,-5.0,0.0,0.0,true,false,\n"
+        "1.0,-5.0,0.0,0.0,true,false,\n"
+    )
+    with pytest.raises(ValueError):
+        trajectories.readPath(str(source))
@@ -1,17 +1,105 @@
+from typing import Callable
+
 import wpilib
 
+# the period TimedRobot runs the robot loop at
+LOOP_PERIOD: float = 0.02
+# a tick whose dt is more than this past LOOP_PERIOD counts as late
+LATE_MARGIN: float = 0.005
+# number of recent dts kept for the sliding window stats
+WINDOW_SIZE: int = 50
+
+
+# a time source that only moves when told to, for running the robot against simulated time
+class SteppedClock:
+    def __init__(self, start: float = 0, step: float = LOOP_PERIOD) -> None:
+        self.now = start
+        self.step = step
+
+    def advance(self, dt: float | None = None) -> float:
+        self.now += self.step if dt is None else dt
+        return self.now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+# used by every TimeData that isn't handed its own source
+defaultTimeSource: Callable[[], float] = wpilib.getTime
+
+
+def setDefaultTimeSource(source: Callable[[], float] | None) -> None:
+    global defaultTimeSource
+    defaultTimeSource = wpilib.getTime if source is None else source
 
+
+# current time from the default source, use this instead of calling wpilib.getTime directly
+def now() -> float:
+    return defaultTimeSource()
+
+
+# loop clock, create it once and call update() at the start of every loop
+# passing a previous TimeData still works and continues its timeline
 class TimeData:
-    def __init__(self, prev) -> None:
-        time = wpilib.getTime()
+    def __init__(
+        self,
+        prev: "TimeData | None" = None,
+        timeSource: Callable[[], float] | None = None,
+        period: float = LOOP_PERIOD,
+    ) -> None:
+        self.timeSource: Callable[[], float] = (
+            defaultTimeSource if timeSource is None else timeSource
+        )
+        self.period = period
 
+        # dts of the last WINDOW_SIZE ticks, ring buffer
+        self.window: list[float] = [period] * WINDOW_SIZE
+        self.windowIndex: int = 0
+        self.ticks: int = 0
+        self.lateLoops: int = 0
+        self.maxDt: float = 0
+        # how far the last dt was from the loop period
+        self.jitter: float = 0
+
+        time = self.timeSource()
         if prev is None:
             self.initTime = time
             self.prevTime = time
             self.dt = 0
             self.timeSinceInit = 0
+            # always > 0, safe to divide by in controllers, falls back to the loop period
+            self.controlDt = period
         else:
-            self.dt = time - prev.prevTime
-            self.timeSinceInit = time - prev.initTime
-            self.prevTime = time
             self.initTime = prev.initTime
+            self.prevTime = prev.prevTime
+            self.update(time)
+
+    def update(self, time: float | None = None) -> None:
+        if time is None:
+            time = self.timeSource()
+        self.dt = time - self.prevTime
+        self.timeSinceInit = time - self.initTime
+        self.prevTime = time
+        self.controlDt = self.dt if self.dt > 0 else self.period
+
+        self.jitter = self.dt - self.period
+        if self.jitter > LATE_MARGIN:
+            self.lateLoops += 1
+        if self.dt > self.maxDt:
+            self.maxDt = self.dt
+        self.window[self.windowIndex] = self.dt
+        self.windowIndex = (self.windowIndex + 1) % WINDOW_SIZE
+        self.ticks += 1
+
+    # worst dt over the last WINDOW_SIZE ticks
+    @property
+    def windowMaxDt(self) -> float:
+        return max(self.window[: min(self.ticks, WINDOW_SIZE)], default=0)
+
+    # mean absolute difference from the loop period over the last WINDOW_SIZE ticks
+    @property
+    def windowJitter(self) -> float:
+        n = min(self.ticks, WINDOW_SIZE)
+        if n == 0:
+            return 0
+        return sum(abs(dt - self.period) for dt in self.window[:n]) / n
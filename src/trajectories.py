@@ -0,0 +1,368 @@
+import argparse
+import csv
+import hashlib
+import json
+import math
+import mmap
+import os
+import struct
+import sys
+
+import numpy as np
+import wpilib
+from real import angleDiff
+from wpimath.geometry import Pose2d
+from wpimath.spline import CubicHermiteSpline
+from wpimath.trajectory import TrajectoryGenerator, TrajectoryParameterizer
+
+# compiles PathWeaver and PathPlanner paths into densely sampled trajectories ahead of time
+# generating and time parameterizing splines takes seconds on the rio, reading a compiled file is a mmap
+# run from src/ before deploying: python trajectories.py
+# a compiled file remembers a hash of its source, so unchanged paths are not rebuilt
+
+SRC_DIR = os.path.dirname(os.path.abspath(__file__))
+PATHWEAVER_DIR = os.path.join(os.path.dirname(SRC_DIR), "PathWeaver", "Paths")
+PATHPLANNER_DIR = os.path.join(SRC_DIR, "deploy", "pathplanner", "paths")
+OUTPUT_DIR = os.path.join(SRC_DIR, "deploy", "trajectories")
+
+# seconds between stored samples
+SAMPLE_PERIOD: float = 0.01
+
+# PathWeaver paths are in feet with y measured down from the top of the field image
+PATHWEAVER_UNITS: float = 0.3048
+PATHWEAVER_FIELD_HEIGHT: float = 26.9375
+# limits for PathWeaver paths, they keep theirs in the project settings rather than the path
+DEFAULT_MAX_VELOCITY: float = 3.0
+DEFAULT_MAX_ACCELERATION: float = 3.0
+
+MAGIC = b"TRAJECTR"
+VERSION = 1
+HEADER = struct.Struct("<8sI32sI")  # magic, version, source hash, sample count
+
+# the doubles in each sample, in order
+SAMPLE_FIELDS: tuple[str, ...] = (
+    "time",
+    "x",
+    "y",
+    "heading",
+    "velocity",
+    "acceleration",
+    "curvature",
+)
+COL_TIME = 0
+COL_X = 1
+COL_Y = 2
+COL_HEADING = 3
+COL_VELOCITY = 4
+COL_ACCELERATION = 5
+COL_CURVATURE = 6
+
+
+# one path from either tool, as cubic hermite segments and the limits to follow it with
+class PathSource:
+    def __init__(
+        self,
+        name: str,
+        segments: list[CubicHermiteSpline],
+        maxVelocity: float,
+        maxAcceleration: float,
+        endVelocity: float = 0,
+        reversed: bool = False,
+    ) -> None:
+        self.name = name
+        self.segments = segments
+        self.maxVelocity = maxVelocity
+        self.maxAcceleration = maxAcceleration
+        self.endVelocity = endVelocity
+        self.reversed = reversed
+
+
+def _segment(
+    start: tuple[float, float],
+    startTangent: tuple[float, float],
+    end: tuple[float, float],
+    endTangent: tuple[float, float],
+) -> CubicHermiteSpline:
+    return CubicHermiteSpline(
+        (start[0], startTangent[0]),
+        (end[0], endTangent[0]),
+        (start[1], startTangent[1]),
+        (end[1], endTangent[1]),
+    )
+
+
+# a Catmull-Rom tangent for waypoint i, half the chord between its neighbors, or the one chord at an end
+def _chordTangent(positions: list[tuple[float, float]], i: int) -> tuple[float, float]:
+    before = positions[max(i - 1, 0)]
+    after = positions[min(i + 1, len(positions) - 1)]
+    scale = 0.5 if 0 < i < len(positions) - 1 else 1
+    return ((after[0] - before[0]) * scale, (after[1] - before[1]) * scale)
+
+
+# X, Y, Tangent X, Tangent Y, Fixed Theta, Reversed, Name
+# PathWeaver saves a zero tangent for a waypoint that was never dragged, it gets one from its neighbors
+def readPathWeaver(path: str) -> PathSource:
+    positions = []
+    tangents = []
+    reversed = False
+    with open(path, newline="") as f:
+        for row in csv.DictReader(f):
+            x = float(row["X"]) * PATHWEAVER_UNITS
+            y = (float(row["Y"]) + PATHWEAVER_FIELD_HEIGHT) * PATHWEAVER_UNITS
+            positions.append((x, y))
+            tangents.append(
+                (
+                    float(row["Tangent X"]) * PATHWEAVER_UNITS,
+                    float(row["Tangent Y"]) * PATHWEAVER_UNITS,
+                )
+            )
+            reversed = reversed or row["Reversed"].strip().lower() == "true"
+    if len(positions) < 2:
+        raise ValueError("fewer than two waypoints")
+    for i, tangent in enumerate(tangents):
+        if tangent == (0, 0):
+            tangents[i] = _chordTangent(positions, i)
+            if tangents[i] == (0, 0):
+                raise ValueError(f"waypoint {i} has no tangent and no neighbors apart")
+    points = list(zip(positions, tangents))
+    segments = [
+        _segment(a[0], a[1], b[0], b[1]) for a, b in zip(points[:-1], points[1:])
+    ]
+    name = os.path.splitext(os.path.basename(path))[0]
+    return PathSource(
+        name,
+        segments,
+        DEFAULT_MAX_VELOCITY,
+        DEFAULT_MAX_ACCELERATION,
+        reversed=reversed,
+    )
+
+
+# PathPlanner segments are cubic beziers, anchor to nextControl to the next prevControl to the next anchor
+# a bezier's end tangents are 3 times its control offsets, which makes it the same curve as a cubic hermite
+def readPathPlanner(path: str) -> PathSource:
+    with open(path) as f:
+        data = json.load(f)
+    waypoints = data["waypoints"]
+    if len(waypoints) < 2:
+        raise ValueError("fewer than two waypoints")
+
+    def point(p: dict) -> tuple[float, float]:
+        return (p["x"], p["y"])
+
+    segments = []
+    for a, b in zip(waypoints[:-1], waypoints[1:]):
+        p0 = point(a["anchor"])
+        p1 = point(a["nextControl"])
+        p2 = point(b["prevControl"])
+        p3 = point(b["anchor"])
+        segments.append(
+            _segment(
+                p0,
+                (3 * (p1[0] - p0[0]), 3 * (p1[1] - p0[1])),
+                p3,
+                (3 * (p3[0] - p2[0]), 3 * (p3[1] - p2[1])),
+            )
+        )
+    constraints = data["globalConstraints"]
+    name = os.path.splitext(os.path.basename(path))[0]
+    return PathSource(
+        name,
+        segments,
+        constraints["maxVelocity"],
+        constraints["maxAcceleration"],
+        endVelocity=data["goalEndState"]["velocity"],
+        reversed=data["reversed"],
+    )
+
+
+# both tools use .path, PathPlanner's are JSON and PathWeaver's are CSV
+def readPath(path: str) -> PathSource:
+    with open(path) as f:
+        isJSON = f.read(1) == "{"
+    return readPathPlanner(path) if isJSON else readPathWeaver(path)
+
+
+# samples every SAMPLE_PERIOD, one row per sample with the columns in SAMPLE_FIELDS
+def compilePath(source: PathSource) -> np.ndarray:
+    points = TrajectoryGenerator.splinePointsFromSplines(source.segments)
+    trajectory = TrajectoryParameterizer.timeParameterizeTrajectory(
+        points,
+        [],
+        0,
+        source.endVelocity,
+        source.maxVelocity,
+        source.maxAcceleration,
+        source.reversed,
+    )
+    duration = trajectory.totalTime()
+    count = math.ceil(duration / SAMPLE_PERIOD) + 1
+    samples = np.empty((count, len(SAMPLE_FIELDS)))
+    for i in range(count):
+        s = trajectory.sample(min(i * SAMPLE_PERIOD, duration))
+        samples[i] = (
+            s.t,
+            s.pose.X(),
+            s.pose.Y(),
+            s.pose.rotation().radians(),
+            s.velocity,
+            s.acceleration,
+            s.curvature,
+        )
+    return samples
+
+
+# the hash a compiled file is keyed by, changes when the source or anything about how it's compiled does
+def sourceHash(path: str) -> bytes:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        h.update(f.read())
+    h.update(struct.pack("<Id", VERSION, SAMPLE_PERIOD))
+    return h.digest()
+
+
+def outputPath(source: str, outputDir: str = OUTPUT_DIR) -> str:
+    name = os.path.splitext(os.path.basename(source))[0]
+    return os.path.join(outputDir, name + ".traj")
+
+
+# the source hash a compiled file was built from, None when it's missing or not a trajectory file
+def storedHash(path: str) -> bytes | None:
+    try:
+        with open(path, "rb") as f:
+            header = f.read(HEADER.size)
+    except OSError:
+        return None
+    if len(header) < HEADER.size:
+        return None
+    magic, version, digest, _ = HEADER.unpack(header)
+    if magic != MAGIC or version != VERSION:
+        return None
+    return digest
+
+
+def writeTrajectory(path: str, digest: bytes, samples: np.ndarray) -> None:
+    # written beside it and renamed, a reader never sees half a file
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, digest, len(samples)))
+        f.write(np.ascontiguousarray(samples, dtype="<f8").tobytes())
+    os.replace(tmp, path)
+
+
+# compiles source into outputDir unless the file there was already built from the same source, returns whether it did
+def compileFile(source: str, outputDir: str = OUTPUT_DIR) -> bool:
+    out = outputPath(source, outputDir)
+    digest = sourceHash(source)
+    if storedHash(out) == digest:
+        return False
+    os.makedirs(outputDir, exist_ok=True)
+    writeTrajectory(out, digest, compilePath(readPath(source)))
+    return True
+
+
+def sourceFiles() -> list[str]:
+    out = []
+    for directory in (PATHWEAVER_DIR, PATHPLANNER_DIR):
+        if os.path.isdir(directory):
+            out += [
+                os.path.join(directory, name)
+                for name in sorted(os.listdir(directory))
+                if name.endswith(".path")
+            ]
+    return out
+
+
+# memory maps a compiled trajectory, samples are read straight out of the map
+class Trajectory:
+    def __init__(self, path: str) -> None:
+        self.path = path
+        with open(path, "rb") as f:
+            self.map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.sourceHash, count = HEADER.unpack_from(self.map, 0)
+        if (
+            magic != MAGIC
+            or version != VERSION
+            or len(self.map) < HEADER.size + count * len(SAMPLE_FIELDS) * 8
+        ):
+            self.map.close()
+            raise ValueError(f"{path} is not a version {VERSION} trajectory")
+        self.samples: np.ndarray = np.frombuffer(
+            self.map, dtype="<f8", count=count * len(SAMPLE_FIELDS), offset=HEADER.size
+        ).reshape(count, len(SAMPLE_FIELDS))
+        self.times: np.ndarray = self.samples[:, COL_TIME]
+        self.duration: float = float(self.times[-1])
+
+    def __len__(self) -> int:
+        return len(self.samples)
+
+    # the state at time t, linearly interpolated between the two samples around it, found by binary search
+    # times before the start or past the end give the first or last sample
+    def sample(self, t: float, out: np.ndarray | None = None) -> np.ndarray:
+        if out is None:
+            out = np.empty(len(SAMPLE_FIELDS))
+        i = int(np.searchsorted(self.times, t, side="right"))
+        if i <= 0 or i >= len(self.samples):
+            out[:] = self.samples[0 if i <= 0 else -1]
+            out[COL_TIME] = t
+            return out
+        a = self.samples[i - 1]
+        b = self.samples[i]
+        k = (t - a[COL_TIME]) / (b[COL_TIME] - a[COL_TIME])
+        np.subtract(b, a, out=out)
+        out *= k
+        out += a
+        out[COL_HEADING] = (
+            a[COL_HEADING] + angleDiff(b[COL_HEADING], a[COL_HEADING]) * k
+        )
+        out[COL_TIME] = t
+        return out
+
+    def pose(self, t: float) -> Pose2d:
+        s = self.sample(t)
+        return Pose2d(s[COL_X], s[COL_Y], s[COL_HEADING])
+
+    def close(self) -> None:
+        # the numpy views point into the map, they have to go first
+        del self.samples, self.times
+        self.map.close()
+
+
+# opens a compiled trajectory by path name from the deploy directory
+# a PathPlanner path that changed since it was compiled is rebuilt here, slowly, with a warning
+def load(name: str, deployDir: str | None = None) -> Trajectory:
+    deployDir = wpilib.getDeployDirectory() if deployDir is None else deployDir
+    outputDir = os.path.join(deployDir, "trajectories")
+    source = os.path.join(deployDir, "pathplanner", "paths", name + ".path")
+    if os.path.exists(source) and compileFile(source, outputDir):
+        wpilib.reportWarning(f"trajectory {name} was out of date and was rebuilt")
+    return Trajectory(os.path.join(outputDir, name + ".traj"))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="compile paths into trajectories")
+    parser.add_argument(
+        "paths", nargs="*", help="defaults to every PathWeaver and PathPlanner path"
+    )
+    parser.add_argument("--output", default=OUTPUT_DIR, help="where compiled files go")
+    parser.add_argument(
+        "--strict", action="store_true", help="exit 1 if any path fails to compile"
+    )
+    args = parser.parse_args()
+
+    failed = False
+    for source in args.paths if len(args.paths) > 0 else sourceFiles():
+        try:
+            built = compileFile(source, args.output)
+        except (ValueError, RuntimeError) as e:
+            print(f"failed    {source}: {e}")
+            failed = True
+            continue
+        print(f"{'compiled ' if built else 'unchanged'} {source}")
+    # one bad path shouldn't hold up deploying the rest
+    if failed and args.strict:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
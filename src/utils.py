@@ -1,27 +1,87 @@
 import math
-from wpimath.geometry import Rotation2d, Translation2d
-import wpilib
+from typing import Callable
+
 import numpy
 
-from wpimath.geometry import Rotation2d, Translation2d
+
+# response curves map the stick travel past the deadzone, 0 to 1, onto the output, 0 to 1
+def exponentCurve(exponent: float) -> Callable[[float], float]:
+    return lambda t: t**exponent
+
+
+# blends a linear response with a cubic one, 0 is linear and 1 is fully cubic
+def expoCurve(blend: float) -> Callable[[float], float]:
+    return lambda t: (1 - blend) * t + blend * t**3
+
+
+# straight lines between (input, output) points, the points should cover 0 to 1
+def piecewiseCurve(points: list[tuple[float, float]]) -> Callable[[float], float]:
+    xs = [p[0] for p in points]
+    ys = [p[1] for p in points]
+    return lambda t: float(numpy.interp(t, xs, ys))
 
 
 class Scalar:
     def __init__(self, deadZone=0.1, exponent=1):
         self.deadzone = deadZone
         self.exponent = exponent
+        # precomputed curve, see setCurve
+        self._table: list[float] | None = None
+        self._tableArray: numpy.ndarray | None = None
+        self._tableGrid: numpy.ndarray | None = None
 
     def scale(self, input):
-        if abs(input) <= self._deadZone:
+        a = abs(input)
+        if a <= self._deadZone:
             return 0
+        t = (a - self._deadZone) / self._scale
+        if self._table is not None:
+            out = self._lookup(t)
+        elif self._exponent == 1:
+            out = t
         else:
-            delta = abs(input) - self._deadZone
-            sign = math.copysign(1, input)
-            return sign * (delta / self._scale) ** self._exponent
+            out = t**self._exponent
+        return out if input > 0 else -out
 
     def __call__(self, input):
         return self.scale(input)
 
+    # scales every element of an array at once
+    def scaleArray(self, inputs: numpy.ndarray) -> numpy.ndarray:
+        a = numpy.abs(inputs)
+        t = numpy.maximum(a - self._deadZone, 0) / self._scale
+        if self._tableArray is not None:
+            out = numpy.interp(t, self._tableGrid, self._tableArray)  # type: ignore
+        elif self._exponent == 1:
+            out = t
+        else:
+            out = t**self._exponent
+        out[a <= self._deadZone] = 0
+        return out * numpy.sign(inputs)
+
+    # replaces the exponent with an arbitrary response curve, sampled once into a lookup table
+    # the table covers full stick travel, inputs past 1 are clamped, pass None to go back to the exponent
+    def setCurve(
+        self, curve: Callable[[float], float] | None, tableSize: int = 257
+    ) -> None:
+        if curve is None:
+            self._table = None
+            self._tableArray = None
+            self._tableGrid = None
+            return
+        self._table = [curve(i / (tableSize - 1)) for i in range(tableSize)]
+        self._tableArray = numpy.array(self._table)
+        self._tableGrid = numpy.linspace(0, 1, tableSize)
+
+    def _lookup(self, t: float) -> float:
+        table = self._table
+        f = t * (len(table) - 1)  # type: ignore
+        i = int(f)
+        if i >= len(table) - 1:  # type: ignore
+            return table[-1]  # type: ignore
+        lo = table[i]  # type: ignore
+        return lo + (table[i + 1] - lo) * (f - i)  # type: ignore
+
     @property
     def deadzone(self):
         return self._deadZone
@@ -48,13 +108,18 @@ class CircularScalar:
     def __init__(self, deadzone: float, exponent: int):
         self.scalar = Scalar(deadzone, exponent)
 
+    # shapes the stick vector's length and keeps its direction
     def Scale(self, x: float, y: float):
-        angle = math.atan2(y, x)
         mag = math.hypot(x, y)
-
-        ScaledMag = self.scalar.scale(mag)
-
-        stickXY = Translation2d(ScaledMag, 0)
-        stickXY = stickXY.rotateBy(Rotation2d(angle))
-
-        return stickXY.x, stickXY.y
+        if mag == 0:
+            return 0.0, 0.0
+        k = self.scalar.scale(mag) / mag
+        return x * k, y * k
+
+    def scaleArrays(
+        self, xs: numpy.ndarray, ys: numpy.ndarray
+    ) -> tuple[numpy.ndarray, numpy.ndarray]:
+        mag = numpy.hypot(xs, ys)
+        k = numpy.zeros_like(mag)
+        numpy.divide(self.scalar.scaleArray(mag), mag, out=k, where=mag > 0)
+        return xs * k, ys * k